@@ -4,20 +4,89 @@ Script to check AWS configuration for the Intelligent LLM Agent project.
 """
 
 import os
+import shutil
 import sys
+import threading
 import boto3
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from botocore.exceptions import ClientError, NoCredentialsError
 
+# Actions used to verify the permissions for each service
+PERMISSION_ACTIONS = {
+    'lambda': 'lambda:ListFunctions',
+    'dynamodb': 'dynamodb:ListTables',
+    'logs': 'logs:DescribeLogGroups'
+}
+
+# boto3 clients shared by all checks, keyed by service name
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _get_session():
+    """Get the boto3 session shared by all checks."""
+    return boto3.Session()
+
+
+def _get_client(service):
+    """Get a boto3 client for the given service from the shared session."""
+    client = _clients.get(service)
+    
+    if client is None:
+        # Clients are thread-safe once created, but creation is not, so guard it
+        with _clients_lock:
+            client = _clients.get(service)
+            if client is None:
+                client = _clients[service] = _get_session().client(service)
+    
+    return client
+
+
+@lru_cache(maxsize=None)
+def _get_caller_identity():
+    """Get the identity of the caller for the shared session."""
+    return _get_client('sts').get_caller_identity()
+
+
+@lru_cache(maxsize=None)
+def _simulate_permissions():
+    """
+    Evaluate all required permissions with a single IAM policy simulation.
+    
+    Returns a dictionary mapping each action to whether it is allowed, or None
+    if the policy could not be simulated and the checks should call the APIs.
+    """
+    try:
+        response = _get_client('iam').simulate_principal_policy(
+            PolicySourceArn=_get_caller_identity()['Arn'],
+            ActionNames=list(PERMISSION_ACTIONS.values())
+        )
+    except (ClientError, NoCredentialsError):
+        return None
+    
+    return {
+        result['EvalActionName']: result['EvalDecision'] == 'allowed'
+        for result in response['EvaluationResults']
+    }
+
+
+def _is_permission_denied(service):
+    """Check the simulated permission for a service, or None if unavailable."""
+    permissions = _simulate_permissions()
+    if permissions is None:
+        return None
+    
+    return not permissions.get(PERMISSION_ACTIONS[service], False)
+
 
 def check_aws_credentials():
     """Check if AWS credentials are configured."""
     try:
-        # Create a boto3 session
-        session = boto3.Session()
-        
         # Get the credentials
-        credentials = session.get_credentials()
+        credentials = _get_session().get_credentials()
         
         if credentials is None:
             print("❌ AWS credentials not found.")
@@ -26,8 +95,7 @@ def check_aws_credentials():
             return False
         
         # Get the caller identity to verify credentials
-        sts = session.client('sts')
-        identity = sts.get_caller_identity()
+        identity = _get_caller_identity()
         
         print(f"✅ AWS credentials found.")
         print(f"   Account: {identity['Account']}")
@@ -48,11 +116,10 @@ def check_aws_credentials():
 def check_aws_region():
     """Check if AWS region is configured."""
     try:
-        # Create a boto3 session
-        session = boto3.Session()
-        
-        # Get the region
-        region = session.region_name
+        # Get the region from the shared session, falling back to the environment
+        region = (_get_session().region_name
+                  or os.environ.get('AWS_REGION')
+                  or os.environ.get('AWS_DEFAULT_REGION'))
         
         if region is None:
             print("❌ AWS region not configured.")
@@ -71,14 +138,16 @@ def check_aws_region():
 def check_lambda_permissions():
     """Check if the user has permissions to create Lambda functions."""
     try:
-        # Create a boto3 session
-        session = boto3.Session()
+        denied = _is_permission_denied('lambda')
         
-        # Create a Lambda client
-        lambda_client = session.client('lambda')
+        if denied:
+            print("❌ No permissions to access Lambda.")
+            print("   Please ensure your AWS user has the necessary permissions.")
+            return False
         
-        # List Lambda functions to check permissions
-        lambda_client.list_functions(MaxItems=1)
+        if denied is None:
+            # Fall back to calling the API when the policy cannot be simulated
+            _get_client('lambda').list_functions(MaxItems=1)
         
         print("✅ Lambda permissions verified.")
         return True
@@ -100,14 +169,16 @@ def check_lambda_permissions():
 def check_dynamodb_permissions():
     """Check if the user has permissions to create DynamoDB tables."""
     try:
-        # Create a boto3 session
-        session = boto3.Session()
+        denied = _is_permission_denied('dynamodb')
         
-        # Create a DynamoDB client
-        dynamodb_client = session.client('dynamodb')
+        if denied:
+            print("❌ No permissions to access DynamoDB.")
+            print("   Please ensure your AWS user has the necessary permissions.")
+            return False
         
-        # List DynamoDB tables to check permissions
-        dynamodb_client.list_tables(Limit=1)
+        if denied is None:
+            # Fall back to calling the API when the policy cannot be simulated
+            _get_client('dynamodb').list_tables(Limit=1)
         
         print("✅ DynamoDB permissions verified.")
         return True
@@ -129,14 +200,16 @@ def check_dynamodb_permissions():
 def check_cloudwatch_permissions():
     """Check if the user has permissions to create CloudWatch logs."""
     try:
-        # Create a boto3 session
-        session = boto3.Session()
+        denied = _is_permission_denied('logs')
         
-        # Create a CloudWatch client
-        cloudwatch_client = session.client('logs')
+        if denied:
+            print("❌ No permissions to access CloudWatch.")
+            print("   Please ensure your AWS user has the necessary permissions.")
+            return False
         
-        # List log groups to check permissions
-        cloudwatch_client.describe_log_groups(limit=1)
+        if denied is None:
+            # Fall back to calling the API when the policy cannot be simulated
+            _get_client('logs').describe_log_groups(limit=1)
         
         print("✅ CloudWatch permissions verified.")
         return True
@@ -155,28 +228,26 @@ def check_cloudwatch_permissions():
         return False
 
 
+@lru_cache(maxsize=None)
+def _find_terraform():
+    """Locate the Terraform binary on the PATH."""
+    return shutil.which('terraform')
+
+
 def check_terraform_installed():
     """Check if Terraform is installed."""
     try:
-        import subprocess
-        
-        # Run terraform version command
-        result = subprocess.run(['terraform', '--version'], capture_output=True, text=True)
+        # Look up the binary instead of spawning a terraform process
+        path = _find_terraform()
         
-        if result.returncode == 0:
-            version = result.stdout.split('\n')[0]
-            print(f"✅ Terraform installed: {version}")
+        if path and os.path.isfile(path):
+            print(f"✅ Terraform installed: {path}")
             return True
         else:
             print("❌ Terraform not installed or not in PATH.")
             print("   Please install Terraform: https://www.terraform.io/downloads.html")
             return False
     
-    except FileNotFoundError:
-        print("❌ Terraform not installed or not in PATH.")
-        print("   Please install Terraform: https://www.terraform.io/downloads.html")
-        return False
-    
     except Exception as e:
         print(f"❌ Error checking Terraform installation: {e}")
         return False
@@ -200,15 +271,28 @@ def main():
         print("\n❌ AWS region check failed. Please configure AWS region.")
         return
     
-    # Check permissions
-    print("\n=== AWS Permissions Check ===")
-    lambda_ok = check_lambda_permissions()
-    dynamodb_ok = check_dynamodb_permissions()
-    cloudwatch_ok = check_cloudwatch_permissions()
+    # Evaluate all permissions with a single IAM call before fanning out
+    _simulate_permissions()
+    
+    # Check permissions and Terraform concurrently, since each check is I/O bound
+    print("\n=== AWS Permissions and Terraform Check ===")
+    checks = [
+        (check_lambda_permissions, 'lambda'),
+        (check_dynamodb_permissions, 'dynamodb'),
+        (check_cloudwatch_permissions, 'cloudwatch'),
+        (check_terraform_installed, 'terraform')
+    ]
+    results = {}
+    
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = {executor.submit(check): name for check, name in checks}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
     
-    # Check Terraform
-    print("\n=== Terraform Check ===")
-    terraform_ok = check_terraform_installed()
+    lambda_ok = results['lambda']
+    dynamodb_ok = results['dynamodb']
+    cloudwatch_ok = results['cloudwatch']
+    terraform_ok = results['terraform']
     
     # Summary
     print("\n=== Summary ===")
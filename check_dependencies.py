@@ -3,17 +3,25 @@
 Script to check the installed dependencies and their versions.
 """
 
-import importlib
 import importlib.metadata
+import re
 import sys
 
 
-def get_package_version(package_name):
-    """Get the version of an installed package."""
-    try:
-        return importlib.metadata.version(package_name)
-    except importlib.metadata.PackageNotFoundError:
-        return "Not installed"
+def normalize_package_name(package_name):
+    """Normalize a package name as described in PEP 503."""
+    return re.sub(r'[-_.]+', '-', package_name).lower()
+
+
+def get_installed_versions():
+    """Get the versions of all installed packages, keyed by normalized name."""
+    installed = {}
+    for distribution in importlib.metadata.distributions():
+        name = distribution.metadata['Name']
+        if name:
+            installed.setdefault(normalize_package_name(name), distribution.version)
+    
+    return installed
 
 
 def main():
@@ -38,9 +46,12 @@ def main():
         "isort"
     ]
     
+    # Look up all installed versions in a single pass
+    installed = get_installed_versions()
+    
     # Check each package
     for package in packages:
-        version = get_package_version(package)
+        version = installed.get(normalize_package_name(package), "Not installed")
         print(f"{package}: {version}")
     
     print("\n=== Dependency Check Complete ===")
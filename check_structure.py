@@ -5,12 +5,28 @@ Script to check the project structure of the Intelligent LLM Agent.
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Root directory of the project
+ROOT_DIR = Path(__file__).resolve().parent
 
-def check_directory(directory, expected_subdirs=None, expected_files=None):
+
+def scan_directory(directory):
+    """Scan a directory once and return its entries keyed by name, or None if missing."""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name: entry for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def check_directory(directory, expected_subdirs=None, expected_files=None, entries=None):
     """Check if a directory exists and contains expected subdirectories and files."""
-    if not os.path.isdir(directory):
+    if entries is None:
+        entries = scan_directory(directory)
+    
+    if entries is None:
         print(f"❌ Directory not found: {directory}")
         return False
     
@@ -20,8 +36,8 @@ def check_directory(directory, expected_subdirs=None, expected_files=None):
     
     if expected_subdirs:
         for subdir in expected_subdirs:
-            subdir_path = os.path.join(directory, subdir)
-            if not os.path.isdir(subdir_path):
+            entry = entries.get(subdir)
+            if entry is None or not entry.is_dir():
                 print(f"  ❌ Subdirectory not found: {subdir}")
                 all_ok = False
             else:
@@ -29,8 +45,8 @@ def check_directory(directory, expected_subdirs=None, expected_files=None):
     
     if expected_files:
         for file in expected_files:
-            file_path = os.path.join(directory, file)
-            if not os.path.isfile(file_path):
+            entry = entries.get(file)
+            if entry is None or not entry.is_file():
                 print(f"  ❌ File not found: {file}")
                 all_ok = False
             else:
@@ -44,9 +60,20 @@ def main():
     print("=== Project Structure Check ===")
     
     # Check root directory
-    root_dir = os.path.dirname(os.path.abspath(__file__))
+    root_dir = ROOT_DIR
     print(f"Root directory: {root_dir}")
     
+    src_dir = root_dir / "src"
+    tests_dir = root_dir / "tests"
+    infra_dir = root_dir / "infrastructure"
+    docs_dir = root_dir / "docs"
+    cicd_dir = root_dir / "ci-cd"
+    
+    # Scan all directories concurrently, then report on them in order
+    directories = [root_dir, src_dir, tests_dir, infra_dir, docs_dir, cicd_dir]
+    with ThreadPoolExecutor(max_workers=len(directories)) as executor:
+        scans = dict(zip(directories, executor.map(scan_directory, directories)))
+    
     # Expected root files
     expected_root_files = [
         "README.md",
@@ -68,10 +95,10 @@ def main():
     ]
     
     # Check root directory
-    root_ok = check_directory(root_dir, expected_root_dirs, expected_root_files)
+    root_ok = check_directory(root_dir, expected_root_dirs, expected_root_files,
+                              entries=scans[root_dir])
     
     # Check src directory
-    src_dir = os.path.join(root_dir, "src")
     expected_src_dirs = [
         "agents",
         "tools",
@@ -79,10 +106,9 @@ def main():
         "aws",
         "utils"
     ]
-    src_ok = check_directory(src_dir, expected_src_dirs)
+    src_ok = check_directory(src_dir, expected_src_dirs, entries=scans[src_dir])
     
     # Check tests directory
-    tests_dir = os.path.join(root_dir, "tests")
     expected_tests_dirs = [
         "test_agents",
         "test_tools",
@@ -90,10 +116,9 @@ def main():
         "test_aws",
         "test_utils"
     ]
-    tests_ok = check_directory(tests_dir, expected_tests_dirs)
+    tests_ok = check_directory(tests_dir, expected_tests_dirs, entries=scans[tests_dir])
     
     # Check infrastructure directory
-    infra_dir = os.path.join(root_dir, "infrastructure")
     expected_infra_files = [
         "main.tf",
         "variables.tf",
@@ -102,23 +127,24 @@ def main():
     expected_infra_dirs = [
         "modules"
     ]
-    infra_ok = check_directory(infra_dir, expected_infra_dirs, expected_infra_files)
+    infra_ok = check_directory(infra_dir, expected_infra_dirs, expected_infra_files,
+                              entries=scans[infra_dir])
     
     # Check docs directory
-    docs_dir = os.path.join(root_dir, "docs")
     expected_docs_files = [
         "api.md",
         "architecture.md",
         "usage.md"
     ]
-    docs_ok = check_directory(docs_dir, expected_files=expected_docs_files)
+    docs_ok = check_directory(docs_dir, expected_files=expected_docs_files,
+                              entries=scans[docs_dir])
     
     # Check ci-cd directory
-    cicd_dir = os.path.join(root_dir, "ci-cd")
     expected_cicd_files = [
         "github-actions-workflow.yml"
     ]
-    cicd_ok = check_directory(cicd_dir, expected_files=expected_cicd_files)
+    cicd_ok = check_directory(cicd_dir, expected_files=expected_cicd_files,
+                              entries=scans[cicd_dir])
     
     # Summary
     print("\n=== Summary ===")
@@ -6,23 +6,58 @@ This includes code statistics, test coverage, and documentation status.
 
 import os
 import subprocess
+import sys
 import datetime
+import io
 import json
-from pathlib import Path
+import re
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+
+# Matches the coverage percentage on the TOTAL line of a coverage report
+COVERAGE_TOTAL_PATTERN = re.compile(r'^TOTAL\s+\S+\s+\S+\s+(\S+)', re.MULTILINE)
+
+# Directories that never contain project sources
+EXCLUDED_DIRS = frozenset(['__pycache__', 'node_modules', 'build', 'dist'])
+
+
+def _count_file_lines(file_path):
+    """Count the number of lines in a file without decoding it."""
+    lines = 0
+    last_chunk = b''
+    
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            lines += chunk.count(b'\n')
+            last_chunk = chunk
+    
+    # Count a trailing line that has no newline, as readlines() would
+    if last_chunk and not last_chunk.endswith(b'\n'):
+        lines += 1
+    
+    return lines
 
 
 def count_lines(directory, file_extension):
-    """Count the number of lines in files with the given extension."""
+    """
+    Count the number of lines in files with the given extension.
+    
+    The extension may also be a tuple of extensions, e.g. ('.py', '.pyi').
+    Hidden directories and build artifacts are skipped.
+    """
     total_lines = 0
     file_count = 0
+    pending = [directory]
     
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith(file_extension):
-                file_path = os.path.join(root, file)
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                    total_lines += len(lines)
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith('.') and entry.name not in EXCLUDED_DIRS:
+                        pending.append(entry.path)
+                elif entry.name.endswith(file_extension) and entry.is_file(follow_symlinks=False):
+                    total_lines += _count_file_lines(entry.path)
                     file_count += 1
     
     return total_lines, file_count
@@ -39,38 +74,102 @@ def run_command(command):
         return ""
 
 
+def _get_coverage_from_data_file(data_file=".coverage"):
+    """Get the coverage percentage from an existing coverage data file."""
+    if not os.path.isfile(data_file):
+        return None
+    
+    try:
+        import coverage
+    except ImportError:
+        return None
+    
+    try:
+        cov = coverage.Coverage(data_file=data_file)
+        cov.load()
+        percentage = cov.report(file=io.StringIO())
+    except coverage.CoverageException:
+        return None
+    
+    return f"{percentage:.0f}%"
+
+
+def _get_coverage_from_xml(xml_file="coverage.xml"):
+    """Get the coverage percentage from an existing coverage XML report."""
+    if not os.path.isfile(xml_file):
+        return None
+    
+    try:
+        line_rate = ElementTree.parse(xml_file).getroot().get("line-rate")
+    except ElementTree.ParseError:
+        return None
+    
+    if line_rate is None:
+        return None
+    
+    return f"{float(line_rate) * 100:.0f}%"
+
+
 def get_test_coverage():
     """Get the test coverage percentage."""
-    coverage_output = run_command("python -m pytest --cov=src tests/ --cov-report=term-missing")
+    # Prefer existing coverage artifacts over re-running the test suite
+    coverage_percentage = _get_coverage_from_data_file() or _get_coverage_from_xml()
+    if coverage_percentage:
+        return coverage_percentage
+    
+    coverage_output = run_command(
+        "python -m pytest -p no:cacheprovider --no-header -q "
+        "--cov=src tests/ --cov-report=term-missing"
+    )
     
     # Extract coverage percentage
-    for line in coverage_output.split('\n'):
-        if "TOTAL" in line:
-            parts = line.split()
-            if len(parts) >= 4:
-                return parts[3]
+    match = COVERAGE_TOTAL_PATTERN.search(coverage_output)
     
-    return "Unknown"
+    return match.group(1) if match else "Unknown"
 
 
-def get_documentation_status():
+def get_documentation_status(docs_dir="docs"):
     """Get the documentation status."""
-    docs_dir = Path("docs")
-    docs_files = list(docs_dir.glob("*.md"))
+    docs_files = []
+    pending = [(docs_dir, "")]
+    
+    # Walk the docs tree, including subdirectories, reporting paths relative to it
+    while pending:
+        directory, prefix = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        pending.append((entry.path, f"{prefix}{entry.name}/"))
+                    elif entry.name.endswith(".md") and entry.is_file():
+                        docs_files.append(f"{prefix}{entry.name}")
+        except FileNotFoundError:
+            continue
     
     return {
         "total_docs": len(docs_files),
-        "docs_files": [f.name for f in docs_files]
+        "docs_files": docs_files
     }
 
 
 def get_git_info():
     """Get information from git."""
-    last_commit = run_command("git log -1 --pretty=format:'%h - %s (%an, %ad)'")
-    branch = run_command("git rev-parse --abbrev-ref HEAD").strip()
+    # Read the last commit and the refs pointing at it with a single git call
+    output = subprocess.run(
+        ['git', 'log', '-1', '--format=%h%x1f%s%x1f%an%x1f%ad%x1f%D', 'HEAD'],
+        check=True, capture_output=True, text=True
+    ).stdout
+    commit_hash, subject, author, date, refs = output.rstrip('\n').split('\x1f')
+    
+    # Derive the branch from "HEAD -> branch"; a detached HEAD is reported as HEAD
+    branch = 'HEAD'
+    for ref in refs.split(', '):
+        if ref.startswith('HEAD -> '):
+            branch = ref[len('HEAD -> '):]
+            break
     
     return {
-        "last_commit": last_commit.strip("'"),
+        "last_commit": f"{commit_hash} - {subject} ({author}, {date})",
         "branch": branch
     }
 
@@ -86,9 +185,12 @@ def generate_report():
         "git_info": {}
     }
     
-    # Code statistics
-    python_lines, python_files = count_lines("src", ".py")
-    test_lines, test_files = count_lines("tests", ".py")
+    # Code statistics, scanning the source and test trees concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        src_future = executor.submit(count_lines, "src", ".py")
+        tests_future = executor.submit(count_lines, "tests", ".py")
+        python_lines, python_files = src_future.result()
+        test_lines, test_files = tests_future.result()
     
     report["code_statistics"] = {
         "python_lines": python_lines,
@@ -126,42 +228,53 @@ def generate_report():
 
 def save_report(report, output_file="project_report.json"):
     """Save the report to a file."""
-    with open(output_file, 'w') as f:
-        json.dump(report, f, indent=2)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, separators=(',', ': '))
     
     print(f"Report saved to {output_file}")
 
 
 def print_report(report):
     """Print the report to the console."""
-    print("=" * 50)
-    print(f"Project Report: {report['project_name']}")
-    print(f"Date: {report['report_date']}")
-    print("=" * 50)
-    
-    print("\nCode Statistics:")
-    print(f"  Python Files: {report['code_statistics']['python_files']}")
-    print(f"  Python Lines: {report['code_statistics']['python_lines']}")
-    print(f"  Test Files: {report['code_statistics']['test_files']}")
-    print(f"  Test Lines: {report['code_statistics']['test_lines']}")
-    print(f"  Total Files: {report['code_statistics']['total_files']}")
-    print(f"  Total Lines: {report['code_statistics']['total_lines']}")
-    
-    print("\nTest Statistics:")
-    print(f"  Coverage: {report['test_statistics'].get('coverage', 'Unknown')}")
-    
-    print("\nDocumentation Status:")
-    print(f"  Total Docs: {report['documentation_status']['total_docs']}")
-    print("  Docs Files:")
-    for doc in report['documentation_status']['docs_files']:
-        print(f"    - {doc}")
-    
-    if "last_commit" in report['git_info']:
-        print("\nGit Info:")
-        print(f"  Branch: {report['git_info'].get('branch', 'Unknown')}")
-        print(f"  Last Commit: {report['git_info'].get('last_commit', 'Unknown')}")
-    
-    print("\n" + "=" * 50)
+    code_statistics = report['code_statistics']
+    documentation_status = report['documentation_status']
+    git_info = report['git_info']
+    
+    lines = [
+        "=" * 50,
+        f"Project Report: {report['project_name']}",
+        f"Date: {report['report_date']}",
+        "=" * 50,
+        "",
+        "Code Statistics:",
+        f"  Python Files: {code_statistics['python_files']}",
+        f"  Python Lines: {code_statistics['python_lines']}",
+        f"  Test Files: {code_statistics['test_files']}",
+        f"  Test Lines: {code_statistics['test_lines']}",
+        f"  Total Files: {code_statistics['total_files']}",
+        f"  Total Lines: {code_statistics['total_lines']}",
+        "",
+        "Test Statistics:",
+        f"  Coverage: {report['test_statistics'].get('coverage', 'Unknown')}",
+        "",
+        "Documentation Status:",
+        f"  Total Docs: {documentation_status['total_docs']}",
+        "  Docs Files:"
+    ]
+    lines.extend(f"    - {doc}" for doc in documentation_status['docs_files'])
+    
+    if "last_commit" in git_info:
+        lines.extend([
+            "",
+            "Git Info:",
+            f"  Branch: {git_info.get('branch', 'Unknown')}",
+            f"  Last Commit: {git_info.get('last_commit', 'Unknown')}"
+        ])
+    
+    lines.extend(["", "=" * 50])
+    
+    # Write the whole report in a single call
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -4,6 +4,7 @@ Local test script for the Intelligent LLM Agent System.
 This script simulates a Lambda invocation locally.
 """
 
+import copy
 import json
 import os
 import sys
@@ -17,11 +18,54 @@ from src.aws.lambda_handler import lambda_handler
 # Load environment variables from .env file
 load_dotenv()
 
+# Environment variables that must be set to run locally
+REQUIRED_ENV_VARS = ("LLM_PROVIDER", "LLM_MODEL")
+
+# Sample feedback text used when none is provided
+SAMPLE_FEEDBACK_TEXT = (
+    "I really love your product! The quality is excellent and it has made my life so much "
+    "easier. However, the delivery was a bit delayed which was frustrating."
+)
+
+# Template for the sample event, built once and copied for each invocation
+EVENT_TEMPLATE = {
+    "feedback": [
+        {
+            "feedback_id": None,
+            "feedback_text": SAMPLE_FEEDBACK_TEXT,
+            "customer_name": "John Doe",
+            "timestamp": None,
+            "instructions": "Analyze the sentiment and provide a summary."
+        }
+    ]
+}
+
+
+def get_missing_env_vars():
+    """Get the required environment variables that are not set."""
+    return [var for var in REQUIRED_ENV_VARS if not os.environ.get(var)]
+
+
+def create_event(feedback_text=SAMPLE_FEEDBACK_TEXT):
+    """Create a sample event from the template."""
+    event = copy.deepcopy(EVENT_TEMPLATE)
+    feedback = event["feedback"][0]
+    feedback["feedback_id"] = "test-" + str(int(time.time()))
+    feedback["feedback_text"] = feedback_text
+    feedback["timestamp"] = datetime.now().isoformat()
+    
+    return event
+
+
+def run_once(feedback_text=SAMPLE_FEEDBACK_TEXT):
+    """Invoke the Lambda handler once with a sample event."""
+    return lambda_handler(create_event(feedback_text), {})
+
+
 def main():
     """Main function to run the local test."""
     # Check if environment variables are set
-    required_env_vars = ["LLM_PROVIDER", "LLM_MODEL"]
-    missing_vars = [var for var in required_env_vars if not os.getenv(var)]
+    missing_vars = get_missing_env_vars()
     
     if missing_vars:
         print(f"Error: Missing required environment variables: {', '.join(missing_vars)}")
@@ -29,17 +73,7 @@ def main():
         sys.exit(1)
     
     # Create a sample event
-    event = {
-        "feedback": [
-            {
-                "feedback_id": "test-" + str(int(time.time())),
-                "feedback_text": "I really love your product! The quality is excellent and it has made my life so much easier. However, the delivery was a bit delayed which was frustrating.",
-                "customer_name": "John Doe",
-                "timestamp": datetime.now().isoformat(),
-                "instructions": "Analyze the sentiment and provide a summary."
-            }
-        ]
-    }
+    event = create_event()
     
     # Print the event
     print("Input event:")
@@ -56,7 +90,7 @@ def main():
         print("Response:")
         print(json.dumps(response, indent=2))
         print(f"\nExecution time: {end_time - start_time:.2f} seconds")
-        
+    
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
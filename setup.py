@@ -11,10 +11,12 @@ setup(
         "boto3>=1.28.0",
         "pydantic>=2.0.0",
         "python-dotenv>=1.0.0",
-        "openai>=1.0.0",
-        "anthropic>=0.5.0",
+        "openai>=1.40.0",
+        "anthropic>=0.42.0",
         "groq>=0.4.0",
         "aws-lambda-powertools>=2.0.0",
+        "orjson>=3.9.0",
+        "httpx>=0.23.0",
     ],
     python_requires=">=3.9",
     classifiers=[
@@ -11,6 +11,20 @@ from typing import Dict, Any, Optional
 from .interaction_agent import InteractionAgent
 from .tool_agent import ToolAgent
 
+# Environment variables holding the API key for each provider.
+# Bedrock is not listed because AWS credentials are handled by boto3.
+_PROVIDER_API_KEY_ENV_VARS = {
+    'openai': 'OPENAI_API_KEY',
+    'anthropic': 'ANTHROPIC_API_KEY',
+    'groq': 'GROQ_API_KEY'
+}
+
+# Agent classes by agent type
+_AGENT_CLASSES = {
+    'interaction': InteractionAgent,
+    'tool': ToolAgent
+}
+
 
 class AgentFactory:
     """Factory class for creating different types of agents."""
@@ -30,26 +44,18 @@ class AgentFactory:
         Raises:
             ValueError: If an unsupported agent type is requested
         """
-        if config is None:
-            config = {}
+        # Resolve the agent class first so unsupported types fail fast
+        agent_class = _AGENT_CLASSES.get(agent_type.lower())
+        if agent_class is None:
+            raise ValueError(f"Unsupported agent type: {agent_type}")
+
+        config = config or {}
 
         # Get LLM API keys from environment variables if not provided in config
         if 'api_key' not in config:
             # Try to get from environment variables based on provider
-            provider = config.get('provider', 'openai')
-            if provider == 'openai':
-                config['api_key'] = os.environ.get('OPENAI_API_KEY')
-            elif provider == 'anthropic':
-                config['api_key'] = os.environ.get('ANTHROPIC_API_KEY')
-            elif provider == 'bedrock':
-                # AWS credentials are handled by boto3
-                pass
-            elif provider == 'groq':
-                config['api_key'] = os.environ.get('GROQ_API_KEY')
-
-        if agent_type.lower() == 'interaction':
-            return InteractionAgent(**config)
-        elif agent_type.lower() == 'tool':
-            return ToolAgent(**config)
-        else:
-            raise ValueError(f"Unsupported agent type: {agent_type}")
+            env_var = _PROVIDER_API_KEY_ENV_VARS.get(config.get('provider', 'openai'))
+            if env_var:
+                config['api_key'] = os.environ.get(env_var)
+
+        return agent_class(**config)
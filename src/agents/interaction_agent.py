@@ -5,17 +5,127 @@ This module implements the interaction agent that handles user interactions
 and applies guardrails to ensure safe and appropriate responses.
 """
 
-import json
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+import re
+import threading
+from typing import Dict, Any, List, Optional, Pattern, Tuple
 
-import openai
-import anthropic
-import boto3
-import groq
+import orjson
+
+from ..tools.base_llm_tool import JSON_RESPONSE_FORMAT
+from ..utils.llm_client import get_llm_client, supports_structured_outputs
 
 logger = logging.getLogger(__name__)
 
+# Patterns for potential PII and secrets, keyed by label.
+# This is a very simplified example - in production, use a proper PII detection service.
+PII_PATTERNS = {
+    'ssn': r'\b\d{3}[-.\s]?\d{2}[-.\s]?\d{4}\b',
+    'credit_card': r'\b\d{13,19}\b',
+    'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b',
+    'phone': r'(?<!\w)(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b',
+    'aws_access_key': r'\bAKIA[0-9A-Z]{16}\b',
+    'github_token': r'\bgh[pousr]_[A-Za-z0-9]{36,}\b',
+    'openai_key': r'\bsk-[A-Za-z0-9_-]{20,}',
+    'ssn_keyword': r'(?i:\bssn\b|social security)',
+    'credit_card_keyword': r'(?i:credit card)',
+    'password_keyword': r'(?i:password)'
+}
+
+# All PII patterns merged into one alternation so the text is scanned once
+PII_PATTERN = re.compile(
+    '|'.join(f'(?P<{label}>{pattern})' for label, pattern in PII_PATTERNS.items())
+)
+
+# Sum of the digits of each digit doubled, indexed by the digit, for the Luhn checksum
+LUHN_DOUBLED_DIGIT_SUMS = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+# Tools available for execution, in the order they are reported
+AVAILABLE_TOOLS = ['sentiment_analysis', 'topic_categorization',
+                   'keyword_contextualization', 'summarization']
+
+# Keywords in the instructions that unambiguously select a tool, keyed by tool
+TOOL_KEYWORD_PATTERN = re.compile(
+    r'\b(?:(?P<sentiment_analysis>sentiment)'
+    r'|(?P<topic_categorization>topic|categor)'
+    r'|(?P<keyword_contextualization>keyword)'
+    r'|(?P<summarization>summar))',
+    re.IGNORECASE
+)
+
+# Words that make keyword matching ambiguous, e.g. "everything except the summary"
+NEGATION_PATTERN = re.compile(
+    r"\b(?:not?|don'?t|do not|without|except|exclude|excluding|skip|ignore|other than)\b",
+    re.IGNORECASE
+)
+
+TOOL_SELECTION_PROMPT_TEMPLATE = """
+        You are an AI assistant tasked with determining which tools to execute
+        based on the following instructions.
+        
+        Available tools:
+        1. sentiment_analysis: Perform sentiment scoring (positive, negative, neutral)
+        2. topic_categorization: Categorize feedback into predefined topics (e.g., Product Quality, Delivery, Support)
+        3. keyword_contextualization: Extract context-aware keywords with relevance scores
+        4. summarization: Generate concise summaries and actionable recommendations
+        
+        Instructions: "{instructions}"
+        
+        Based on the instructions, which tools should be executed?
+        Respond with a JSON object containing a "tools" array of tool names,
+        e.g., {{"tools": ["sentiment_analysis", "summarization"]}}.
+        If the instructions are unclear or don't specify any tools, include all tools.
+        """
+
+# JSON schema the tool selection response is constrained to
+TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tools": {
+            "type": "array",
+            "items": {"type": "string", "enum": AVAILABLE_TOOLS}
+        }
+    },
+    "required": ["tools"],
+    "additionalProperties": False
+}
+
+# Structured output format for the OpenAI-compatible chat completion APIs
+TOOL_SELECTION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "tools", "schema": TOOL_SCHEMA, "strict": True}
+}
+
+# Tool definition forcing Claude models to answer through the schema
+TOOL_SELECTION_TOOL = {
+    "name": "select_tools",
+    "description": "Select the tools to execute for the feedback.",
+    "input_schema": TOOL_SCHEMA
+}
+TOOL_SELECTION_TOOL_CHOICE = {"type": "tool", "name": "select_tools"}
+
+# Upper bound on completion tokens for a tool selection response
+TOOL_SELECTION_MAX_TOKENS = 64
+
+# Maximum number of distinct instructions whose tool selection is cached
+TOOL_SELECTION_CACHE_SIZE = 4096
+
+
+def _passes_luhn_check(number: str) -> bool:
+    """
+    Check whether a digit string passes the Luhn checksum used by payment card numbers.
+    
+    Args:
+        number: String of decimal digits
+        
+    Returns:
+        True if the checksum is valid
+    """
+    digits = [int(digit) for digit in reversed(number)]
+    total = sum(digits[0::2]) + sum(LUHN_DOUBLED_DIGIT_SUMS[digit] for digit in digits[1::2])
+    return total % 10 == 0
+
 
 class InteractionAgent:
     """
@@ -34,16 +144,18 @@ class InteractionAgent:
             provider: LLM provider ('openai', 'anthropic', 'bedrock', or 'groq')
             model: Model name to use
             api_key: API key for the provider
-            **kwargs: Additional configuration options
+            **kwargs: Additional configuration options, including 'router_model'
+                for the smaller model used to select tools
         """
         self.provider = provider.lower()
         self.model = model
+        self.router_model = kwargs.get('router_model')
         self.api_key = api_key
         
         # Set default models based on provider
         if not self.model:
             if self.provider == 'openai':
-                self.model = 'gpt-4'
+                self.model = 'gpt-4o'
             elif self.provider == 'anthropic':
                 self.model = 'claude-3-opus-20240229'
             elif self.provider == 'bedrock':
@@ -51,33 +163,33 @@ class InteractionAgent:
             elif self.provider == 'groq':
                 self.model = 'llama3-70b-8192'
         
+        # Tool selection is a constrained classification, so default to a cheaper model
+        if not self.router_model:
+            if self.provider == 'openai':
+                self.router_model = 'gpt-4o-mini'
+            elif self.provider == 'anthropic':
+                self.router_model = 'claude-3-5-haiku-latest'
+            elif self.provider == 'bedrock':
+                self.router_model = 'anthropic.claude-3-haiku-20240307-v1:0'
+            elif self.provider == 'groq':
+                self.router_model = 'llama-3.1-8b-instant'
+        
         # Initialize the client based on the provider
         self._initialize_client()
         
         # Load guardrails configuration
         self.guardrails = kwargs.get('guardrails', self._default_guardrails())
+        
+        # Prohibited topics and the pattern compiled from them, rebuilt when the topics change
+        self._prohibited_topics_matcher = ((), (), None)
+        
+        # Tool selections from the LLM, keyed by a hash of the instructions
+        self._tool_selection_cache = {}
+        self._tool_selection_cache_lock = threading.Lock()
 
     def _initialize_client(self):
-        """Initialize the appropriate LLM client based on the provider."""
-        if self.provider == 'openai':
-            if self.api_key:
-                self.client = openai.OpenAI(api_key=self.api_key)
-            else:
-                self.client = openai.OpenAI()
-        elif self.provider == 'anthropic':
-            if self.api_key:
-                self.client = anthropic.Anthropic(api_key=self.api_key)
-            else:
-                self.client = anthropic.Anthropic()
-        elif self.provider == 'bedrock':
-            self.client = boto3.client('bedrock-runtime')
-        elif self.provider == 'groq':
-            if self.api_key:
-                self.client = groq.Groq(api_key=self.api_key)
-            else:
-                self.client = groq.Groq()
-        else:
-            raise ValueError(f"Unsupported provider: {self.provider}")
+        """Get the shared LLM client for the provider."""
+        self.client = get_llm_client(self.provider, self.api_key)
 
     def _default_guardrails(self) -> Dict[str, Any]:
         """
@@ -107,8 +219,10 @@ class InteractionAgent:
         Returns:
             Processed input data with guardrails applied
         """
-        # Log the incoming request
-        logger.info(f"Processing input: {json.dumps(input_data, default=str)}")
+        # Log the incoming request, only serializing it when debug logging is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            input_json = orjson.dumps(input_data, default=str, option=orjson.OPT_NON_STR_KEYS)
+            logger.debug("Processing input: %s", input_json.decode())
         
         # Apply guardrails to the input
         sanitized_input = self._apply_guardrails(input_data)
@@ -132,25 +246,34 @@ class InteractionAgent:
         """
         Apply guardrails to the input data.
         
+        The input is only copied by a guardrail that actually changes it, so
+        unmodified input is returned as is.
+        
         Args:
             input_data: Dictionary containing the input data
             
         Returns:
             Sanitized input data
         """
-        sanitized_input = input_data.copy()
+        sanitized_input = input_data
+        modified = False
         
         # Check for PII if enabled
         if self.guardrails.get('pii_detection', False):
-            sanitized_input = self._detect_and_redact_pii(sanitized_input)
+            sanitized_input, redacted = self._detect_and_redact_pii(sanitized_input)
+            modified = modified or redacted
         
         # Check for prohibited topics if enabled
         if self.guardrails.get('content_filtering', False):
-            sanitized_input = self._filter_prohibited_content(sanitized_input)
+            sanitized_input, filtered = self._filter_prohibited_content(sanitized_input)
+            modified = modified or filtered
+        
+        if modified:
+            logger.info("Guardrails modified the input")
         
         return sanitized_input
 
-    def _detect_and_redact_pii(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _detect_and_redact_pii(self, input_data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
         """
         Detect and redact personally identifiable information (PII).
         
@@ -158,34 +281,24 @@ class InteractionAgent:
             input_data: Dictionary containing the input data
             
         Returns:
-            Input data with PII redacted
+            Tuple of the input data with PII redacted, which is a new dictionary
+            only if something was redacted, and whether anything was redacted
         """
         # In a real implementation, this would use a PII detection service
         # For now, we'll implement a simple placeholder
         
-        redacted_data = input_data.copy()
-        
         # Simple check for potential PII in feedback text
-        if 'feedback_text' in redacted_data:
-            # This is a very simplified example - in production, use a proper PII detection service
-            pii_patterns = [
-                r'\b\d{3}[-.\s]?\d{2}[-.\s]?\d{4}\b',  # SSN
-                r'\b\d{16}\b',  # Credit card
-                r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'  # Email
-            ]
-            
-            feedback_text = redacted_data['feedback_text']
-            
-            # In a real implementation, we would use regex or a dedicated service
-            # For this example, we'll just check for some keywords
-            pii_keywords = ['ssn', 'social security', 'credit card', 'password']
-            for keyword in pii_keywords:
-                if keyword in feedback_text.lower():
-                    logger.warning(f"Potential PII detected in feedback: {keyword}")
-        
-        return redacted_data
+        if 'feedback_text' in input_data:
+            feedback_text = input_data['feedback_text']
+            # Card number candidates only count when they pass the Luhn checksum
+            detected = {match.lastgroup for match in PII_PATTERN.finditer(feedback_text)
+                        if match.lastgroup != 'credit_card' or _passes_luhn_check(match.group())}
+            for label in sorted(detected):
+                logger.warning(f"Potential PII detected in feedback: {label}")
+        
+        return input_data, False
 
-    def _filter_prohibited_content(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _filter_prohibited_content(self, input_data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
         """
         Filter out prohibited content.
         
@@ -193,21 +306,52 @@ class InteractionAgent:
             input_data: Dictionary containing the input data
             
         Returns:
-            Input data with prohibited content filtered
+            Tuple of the input data with prohibited content filtered, which is a
+            new dictionary only if something was filtered, and whether anything was filtered
         """
-        filtered_data = input_data.copy()
-        
         # Check feedback text for prohibited topics
-        if 'feedback_text' in filtered_data:
-            feedback_text = filtered_data['feedback_text']
-            prohibited_topics = self.guardrails.get('prohibited_topics', [])
+        if 'feedback_text' in input_data:
+            topics, lowered_topics, pattern = self._get_prohibited_topics_matcher()
             
-            for topic in prohibited_topics:
-                if topic.lower() in feedback_text.lower():
-                    logger.warning(f"Prohibited topic detected: {topic}")
-                    # In a real implementation, we might redact or flag this content
+            if pattern is not None:
+                # Scan the text once for all topics. A topic shadowed by a longer
+                # match at the same position is a prefix of that match.
+                feedback_text = input_data['feedback_text'].lower()
+                hits = {match.group(1) for match in pattern.finditer(feedback_text)}
+                for topic, lowered_topic in zip(topics, lowered_topics):
+                    if any(lowered_topic in hit for hit in hits):
+                        logger.warning(f"Prohibited topic detected: {topic}")
+                        # In a real implementation, we might redact or flag this content
+        
+        return input_data, False
+
+    def _get_prohibited_topics_matcher(
+            self) -> Tuple[Tuple[str, ...], Tuple[str, ...], Optional[Pattern]]:
+        """
+        Get the pattern matching the configured prohibited topics.
         
-        return filtered_data
+        The pattern is compiled once and only rebuilt when the configured topics change.
+        
+        Returns:
+            Tuple of the prohibited topics, the lowercased topics, and a pattern
+            capturing every lowercased topic occurrence, or None if there are no topics
+        """
+        topics = tuple(self.guardrails.get('prohibited_topics', []))
+        matcher = self._prohibited_topics_matcher
+        if matcher[0] == topics:
+            return matcher
+        
+        lowered_topics = tuple(topic.lower() for topic in topics)
+        pattern = None
+        if topics:
+            # Longest topics first so the alternation prefers the longest match at each position
+            longest_first = sorted(set(lowered_topics), key=len, reverse=True)
+            alternation = '|'.join(re.escape(topic) for topic in longest_first)
+            pattern = re.compile(f'(?=({alternation}))')
+        
+        matcher = (topics, lowered_topics, pattern)
+        self._prohibited_topics_matcher = matcher
+        return matcher
 
     def _determine_tools(self, instructions: str, input_data: Dict[str, Any]) -> List[str]:
         """
@@ -221,15 +365,27 @@ class InteractionAgent:
             List of tools to execute
         """
         # Default tools to execute if no specific instructions
-        default_tools = ['sentiment_analysis', 'topic_categorization', 
-                        'keyword_contextualization', 'summarization']
+        default_tools = list(AVAILABLE_TOOLS)
         
         # If no instructions, return default tools
         if not instructions:
             return default_tools
         
+        # Skip the LLM when the instructions name the tools unambiguously
+        tools = self._match_tools_from_keywords(instructions)
+        if tools:
+            logger.info(f"Selected tools from instruction keywords: {tools}")
+            return tools
+        
+        # Reuse the selection made for identical instructions
+        cache_key = hashlib.blake2b(instructions.encode('utf-8'), digest_size=16).hexdigest()
+        with self._tool_selection_cache_lock:
+            cached_tools = self._tool_selection_cache.get(cache_key)
+        if cached_tools is not None:
+            return list(cached_tools)
+        
         # Use LLM to interpret instructions and determine which tools to execute
-        prompt = self._create_tool_selection_prompt(instructions, input_data)
+        prompt = self._create_tool_selection_prompt(instructions)
         tools = self._query_llm_for_tool_selection(prompt)
         
         # If LLM fails to determine tools, fall back to default
@@ -237,45 +393,94 @@ class InteractionAgent:
             logger.warning("Failed to determine tools from instructions, using default tools")
             return default_tools
         
+        # Cache the selection, evicting the oldest entry when full
+        with self._tool_selection_cache_lock:
+            if len(self._tool_selection_cache) >= TOOL_SELECTION_CACHE_SIZE:
+                del self._tool_selection_cache[next(iter(self._tool_selection_cache))]
+            self._tool_selection_cache[cache_key] = tuple(tools)
+        
         return tools
 
-    def _create_tool_selection_prompt(self, instructions: str, 
-                                     input_data: Dict[str, Any]) -> str:
+    def _read_tool_selection_stream(self, stream: Any) -> Dict[str, Any]:
         """
-        Create a prompt for the LLM to determine which tools to execute.
+        Read the tool selection from a Bedrock response stream.
+        
+        The JSON is accumulated from the streamed chunks and parsed after each one,
+        so the stream is closed as soon as the selection is complete.
         
         Args:
-            instructions: Instructions provided in the input
-            input_data: Dictionary containing the input data
+            stream: Event stream from invoke_model_with_response_stream
             
         Returns:
-            Prompt for the LLM
+            Tool selection matching TOOL_SCHEMA
         """
-        feedback_text = input_data.get('feedback_text', '')
-        
-        prompt = f"""
-        You are an AI assistant tasked with determining which tools to execute based on the following instructions and feedback text.
+        buffer = bytearray()
         
-        Available tools:
-        1. sentiment_analysis: Perform sentiment scoring (positive, negative, neutral)
-        2. topic_categorization: Categorize feedback into predefined topics (e.g., Product Quality, Delivery, Support)
-        3. keyword_contextualization: Extract context-aware keywords with relevance scores
-        4. summarization: Generate concise summaries and actionable recommendations
+        try:
+            for event in stream:
+                chunk = orjson.loads(event['chunk']['bytes'])
+                
+                # Extract the streamed text based on the model
+                if 'claude' in self.router_model:
+                    delta = chunk.get('delta', {})
+                    if delta.get('type') != 'input_json_delta':
+                        continue
+                    buffer += delta['partial_json'].encode('utf-8')
+                else:
+                    # Generic extraction - would need to be adjusted for specific models
+                    buffer += chunk.get('completion', '').encode('utf-8')
+                
+                try:
+                    return orjson.loads(buffer)
+                except orjson.JSONDecodeError:
+                    continue
+        finally:
+            stream.close()
+        
+        # The stream ended without a complete selection, so parse whatever was received
+        return orjson.loads(buffer)
+
+    def _match_tools_from_keywords(self, instructions: str) -> List[str]:
+        """
+        Match tools from keywords in the instructions without querying the LLM.
         
-        Instructions: "{instructions}"
+        Args:
+            instructions: Instructions provided in the input
+            
+        Returns:
+            List of tools to execute, or an empty list if the instructions are ambiguous
+        """
+        # Negations can invert the meaning of a keyword, so leave those to the LLM
+        if NEGATION_PATTERN.search(instructions):
+            return []
         
-        Feedback text: "{feedback_text}"
+        matched = {match.lastgroup for match in TOOL_KEYWORD_PATTERN.finditer(instructions)}
         
-        Based on the instructions and feedback text, which tools should be executed? Respond with a JSON array containing the tool names, e.g., ["sentiment_analysis", "summarization"].
-        If the instructions are unclear or don't specify any tools, include all tools.
+        return [tool for tool in AVAILABLE_TOOLS if tool in matched]
+
+    def _create_tool_selection_prompt(self, instructions: str) -> str:
         """
+        Create a prompt for the LLM to determine which tools to execute.
         
-        return prompt
+        The feedback text is left out so that the selection depends only on the
+        instructions and can be cached per instructions.
+        
+        Args:
+            instructions: Instructions provided in the input
+            
+        Returns:
+            Prompt for the LLM
+        """
+        return TOOL_SELECTION_PROMPT_TEMPLATE.format(instructions=instructions)
 
     def _query_llm_for_tool_selection(self, prompt: str) -> List[str]:
         """
         Query the LLM to determine which tools to execute.
         
+        The response is constrained to TOOL_SCHEMA on the provider side, either
+        through structured outputs or a forced tool call, so it can be parsed
+        directly without scraping free text.
+        
         Args:
             prompt: Prompt for the LLM
             
@@ -283,105 +488,66 @@ class InteractionAgent:
             List of tools to execute
         """
         try:
-            if self.provider == 'openai':
+            if self.provider in ('openai', 'groq'):
+                # Models without structured outputs reject the schema and are only asked for JSON
+                if supports_structured_outputs(self.provider, self.router_model):
+                    response_format = TOOL_SELECTION_RESPONSE_FORMAT
+                else:
+                    response_format = JSON_RESPONSE_FORMAT
+                
                 response = self.client.chat.completions.create(
-                    model=self.model,
+                    model=self.router_model,
                     messages=[{"role": "system", "content": "You are a helpful assistant."}, 
                               {"role": "user", "content": prompt}],
-                    temperature=0.1
+                    temperature=0.1,
+                    max_tokens=TOOL_SELECTION_MAX_TOKENS,
+                    response_format=response_format
                 )
-                result = response.choices[0].message.content
+                selection = orjson.loads(response.choices[0].message.content)
             
             elif self.provider == 'anthropic':
                 response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=1000,
+                    model=self.router_model,
+                    max_tokens=TOOL_SELECTION_MAX_TOKENS,
                     temperature=0.1,
                     system="You are a helpful assistant.",
-                    messages=[{"role": "user", "content": prompt}]
+                    messages=[{"role": "user", "content": prompt}],
+                    tools=[TOOL_SELECTION_TOOL],
+                    tool_choice=TOOL_SELECTION_TOOL_CHOICE
                 )
-                result = response.content[0].text
+                selection = next(block.input for block in response.content
+                                 if block.type == 'tool_use')
             
             elif self.provider == 'bedrock':
                 # For Bedrock, we need to format the request based on the model
-                if 'claude' in self.model:
+                if 'claude' in self.router_model:
                     # Claude model format
                     payload = {
                         "anthropic_version": "bedrock-2023-05-31",
-                        "max_tokens": 1000,
+                        "max_tokens": TOOL_SELECTION_MAX_TOKENS,
                         "temperature": 0.1,
                         "system": "You are a helpful assistant.",
-                        "messages": [{"role": "user", "content": prompt}]
+                        "messages": [{"role": "user", "content": prompt}],
+                        "tools": [TOOL_SELECTION_TOOL],
+                        "tool_choice": TOOL_SELECTION_TOOL_CHOICE
                     }
                 else:
                     # Generic format - would need to be adjusted for specific models
                     payload = {
                         "prompt": prompt,
-                        "max_tokens": 1000,
+                        "max_tokens": TOOL_SELECTION_MAX_TOKENS,
                         "temperature": 0.1
                     }
                 
-                response = self.client.invoke_model(
-                    modelId=self.model,
-                    body=json.dumps(payload)
-                )
-                response_body = json.loads(response['body'].read())
-                
-                # Extract the result based on the model
-                if 'claude' in self.model:
-                    result = response_body['content'][0]['text']
-                else:
-                    # Generic extraction - would need to be adjusted for specific models
-                    result = response_body.get('completion', '')
-            
-            elif self.provider == 'groq':
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "system", "content": "You are a helpful assistant."}, 
-                              {"role": "user", "content": prompt}],
-                    temperature=0.1
+                # Stream the response so reading stops as soon as the selection is complete
+                response = self.client.invoke_model_with_response_stream(
+                    modelId=self.router_model,
+                    body=orjson.dumps(payload)
                 )
-                result = response.choices[0].message.content
+                selection = self._read_tool_selection_stream(response['body'])
             
-            # Parse the result to extract the tools
-            try:
-                # Try to parse as JSON
-                tools = json.loads(result)
-                if isinstance(tools, list):
-                    return tools
-                
-                # If the result is a dictionary with a key containing the tools
-                for key, value in tools.items():
-                    if isinstance(value, list):
-                        return value
-                
-                # If we couldn't find a list, try to extract from text
-                return self._extract_tools_from_text(result)
-            
-            except json.JSONDecodeError:
-                # If not valid JSON, try to extract tools from text
-                return self._extract_tools_from_text(result)
+            return [tool for tool in selection['tools'] if tool in AVAILABLE_TOOLS]
         
         except Exception as e:
             logger.error(f"Error querying LLM for tool selection: {str(e)}")
             return []
-
-    def _extract_tools_from_text(self, text: str) -> List[str]:
-        """
-        Extract tool names from text response.
-        
-        Args:
-            text: Text response from the LLM
-            
-        Returns:
-            List of tools extracted from the text
-        """
-        available_tools = ['sentiment_analysis', 'topic_categorization', 
-                          'keyword_contextualization', 'summarization']
-        
-        found_tools = []
-        for tool in available_tools:
-            if tool in text.lower():
-                found_tools.append(tool)
-        
-        return found_tools
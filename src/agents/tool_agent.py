@@ -5,20 +5,28 @@ This module implements the tool agent that is responsible for executing
 various tools based on the instructions and input data.
 """
 
-import json
+import asyncio
+import concurrent.futures
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
-
-import openai
-import anthropic
-import boto3
-import groq
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 
 from ..tools.tool_factory import ToolFactory
+from ..tools.combined_analysis import COMBINED_TOOL_TYPES, split_combined_result
+from ..tools.fused_analysis import FUSED_TOOL_TYPES, split_fused_result
 from ..cache.cache_manager import CacheManager
+from ..utils.llm_client import get_llm_client
 
 logger = logging.getLogger(__name__)
 
+# Tools answering several requested tools with one LLM query, in order of
+# preference, with the tool types they answer and how to split their results
+FOLDED_TOOLS = (
+    ('fused_analysis', FUSED_TOOL_TYPES, split_fused_result),
+    ('combined_analysis', COMBINED_TOOL_TYPES, split_combined_result)
+)
+
 
 class ToolAgent:
     """
@@ -48,7 +56,7 @@ class ToolAgent:
         # Set default models based on provider
         if not self.model:
             if self.provider == 'openai':
-                self.model = 'gpt-4'
+                self.model = 'gpt-4o'
             elif self.provider == 'anthropic':
                 self.model = 'claude-3-opus-20240229'
             elif self.provider == 'bedrock':
@@ -59,41 +67,45 @@ class ToolAgent:
         # Initialize the client based on the provider
         self._initialize_client()
         
-        # Initialize the tool factory
+        # Initialize the tool factory, whose tools analyze short texts with a
+        # lighter model by default only when no model was chosen explicitly
         self.tool_factory = ToolFactory(provider=self.provider, model=self.model, 
-                                       api_key=self.api_key)
+                                       api_key=self.api_key,
+                                       cascade=kwargs.get('cascade', model is None))
         
         # Initialize the cache manager if caching is enabled
         if self.use_cache:
             self.cache_manager = CacheManager(**kwargs.get('cache_config', {}))
+        
+        # Requests currently being processed, keyed by cache key
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
 
     def _initialize_client(self):
-        """Initialize the appropriate LLM client based on the provider."""
-        if self.provider == 'openai':
-            if self.api_key:
-                self.client = openai.OpenAI(api_key=self.api_key)
-            else:
-                self.client = openai.OpenAI()
-        elif self.provider == 'anthropic':
-            if self.api_key:
-                self.client = anthropic.Anthropic(api_key=self.api_key)
-            else:
-                self.client = anthropic.Anthropic()
-        elif self.provider == 'bedrock':
-            self.client = boto3.client('bedrock-runtime')
-        elif self.provider == 'groq':
-            if self.api_key:
-                self.client = groq.Groq(api_key=self.api_key)
-            else:
-                self.client = groq.Groq()
-        else:
-            raise ValueError(f"Unsupported provider: {self.provider}")
+        """Get the shared LLM client for the provider."""
+        self.client = get_llm_client(self.provider, self.api_key)
 
     def process_request(self, input_data: Dict[str, Any], 
                        tools_to_execute: List[str]) -> Dict[str, Any]:
         """
         Process the request by executing the specified tools.
         
+        This is a synchronous wrapper around process_request_async.
+        
+        Args:
+            input_data: Dictionary containing the input data
+            tools_to_execute: List of tools to execute
+            
+        Returns:
+            Dictionary containing the results of the tool executions
+        """
+        return self._run_in_own_loop(self.process_request_async(input_data, tools_to_execute))
+
+    async def process_request_async(self, input_data: Dict[str, Any], 
+                                    tools_to_execute: List[str]) -> Dict[str, Any]:
+        """
+        Process the request by executing the specified tools concurrently.
+        
         Args:
             input_data: Dictionary containing the input data
             tools_to_execute: List of tools to execute
@@ -102,41 +114,223 @@ class ToolAgent:
             Dictionary containing the results of the tool executions
         """
         # Log the incoming request
-        logger.info(f"Processing request with tools: {tools_to_execute}")
+        logger.debug("Processing request with tools: %s", tools_to_execute)
+        
+        cache_key = self._generate_cache_key(input_data, tools_to_execute)
         
         # Check cache if enabled
         if self.use_cache:
-            cache_key = self._generate_cache_key(input_data, tools_to_execute)
             cached_result = self.cache_manager.get(cache_key)
             
             if cached_result:
-                logger.info(f"Cache hit for key: {cache_key}")
+                logger.debug("Cache hit for key: %s", cache_key)
                 return cached_result
             
-            logger.info(f"Cache miss for key: {cache_key}")
+            logger.debug("Cache miss for key: %s", cache_key)
+        
+        return await self._process_uncached_request(input_data, tools_to_execute, cache_key)
+
+    def process_requests(self, requests: List[Tuple[Dict[str, Any], List[str]]]) -> List[Any]:
+        """
+        Process a batch of requests, looking them up in the cache together.
+        
+        This is a synchronous wrapper around process_requests_async.
+        
+        Args:
+            requests: List of (input data, tools to execute) pairs
+            
+        Returns:
+            List with the results of each request, or the exception it raised
+        """
+        return self._run_in_own_loop(self.process_requests_async(requests))
+
+    def _run_in_own_loop(self, coroutine: Any) -> Any:
+        """
+        Run a coroutine in an event loop of its own.
+        
+        The asynchronous clients the tools create for the loop are closed
+        before it ends, as their connections cannot be closed afterwards.
+        When called while an event loop is running, such as from a notebook
+        or an asynchronous handler, the loop is run in a worker thread, as
+        asyncio.run cannot be nested.
+        
+        Args:
+            coroutine: Coroutine to run
+            
+        Returns:
+            Result of the coroutine
+        """
+        async def run_and_close_clients():
+            try:
+                return await coroutine
+            finally:
+                await self.tool_factory.close_async_clients()
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(run_and_close_clients())
+        
+        # Run the loop in a worker thread, blocking the running loop until it ends
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, run_and_close_clients()).result()
+
+    async def process_requests_async(
+            self, requests: List[Tuple[Dict[str, Any], List[str]]]) -> List[Any]:
+        """
+        Process a batch of requests, looking them up in the cache together.
+        
+        All cache keys are fetched with one batched cache lookup, only the misses
+        are executed, concurrently, and their results are stored with one batched
+        cache write.
+        
+        Args:
+            requests: List of (input data, tools to execute) pairs
+            
+        Returns:
+            List with the results of each request, or the exception it raised
+        """
+        cache_keys = [self._generate_cache_key(input_data, tools_to_execute)
+                      for input_data, tools_to_execute in requests]
+        
+        # Check cache for the whole batch if enabled
+        cached_results = self.cache_manager.get_many(cache_keys) if self.use_cache else {}
+        
+        # Execute each distinct uncached request once, all of them concurrently
+        pending = {}
+        for (input_data, tools_to_execute), cache_key in zip(requests, cache_keys):
+            if cache_key not in cached_results and cache_key not in pending:
+                pending[cache_key] = self._process_uncached_request(input_data, tools_to_execute,
+                                                                    cache_key, cache_result=False)
+        
+        outcomes = dict(zip(pending, await asyncio.gather(*pending.values(),
+                                                          return_exceptions=True)))
+        new_results = {cache_key: outcome for cache_key, outcome in outcomes.items()
+                       if not isinstance(outcome, Exception)}
+        batch_results = [cached_results[cache_key] if cache_key in cached_results
+                         else outcomes[cache_key] for cache_key in cache_keys]
+        
+        # Cache the new results if caching is enabled
+        if self.use_cache and new_results:
+            self.cache_manager.set_many(new_results)
+        
+        return batch_results
+
+    async def _process_uncached_request(self, input_data: Dict[str, Any],
+                                        tools_to_execute: List[str], cache_key: str,
+                                        cache_result: bool = True) -> Dict[str, Any]:
+        """
+        Process a request that was not found in the cache.
+        
+        Args:
+            input_data: Dictionary containing the input data
+            tools_to_execute: List of tools to execute
+            cache_key: Cache key of the request
+            cache_result: Whether to cache the results if caching is enabled
+            
+        Returns:
+            Dictionary containing the results of the tool executions
+        """
+        # Share the result of an identical request that is already being processed
+        with self._inflight_lock:
+            inflight = self._inflight.get(cache_key)
+            if inflight is None:
+                future = self._inflight[cache_key] = concurrent.futures.Future()
         
+        if inflight is not None:
+            logger.debug("Waiting for in-flight request with key: %s", cache_key)
+            return await asyncio.wrap_future(inflight)
+        
+        try:
+            results = await self._execute_tools(input_data, tools_to_execute)
+            
+            # Cache the results if caching is enabled
+            if self.use_cache and cache_result:
+                self.cache_manager.set(cache_key, results)
+            
+            future.set_result(results)
+            return results
+        
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+
+    async def _execute_tools(self, input_data: Dict[str, Any], 
+                             tools_to_execute: List[str]) -> Dict[str, Any]:
+        """
+        Execute the specified tools concurrently.
+        
+        Args:
+            input_data: Dictionary containing the input data
+            tools_to_execute: List of tools to execute
+            
+        Returns:
+            Dictionary containing the results of the tool executions
+        """
         # Initialize results dictionary
         results = {
             'feedback_id': input_data.get('feedback_id', ''),
             'results': {}
         }
         
-        # Execute each tool
-        for tool_name in tools_to_execute:
-            try:
-                tool = self.tool_factory.create_tool(tool_name)
-                tool_result = tool.execute(input_data)
-                results['results'][tool_name] = tool_result
-            except Exception as e:
-                logger.error(f"Error executing tool {tool_name}: {str(e)}")
-                results['results'][tool_name] = {'error': str(e)}
-        
-        # Cache the results if caching is enabled
-        if self.use_cache:
-            self.cache_manager.set(cache_key, results)
+        # Query the LLM once for every analysis when all of them are requested,
+        # or for keywords and sentiment when both are
+        folded_name, folded_types, split_result = next(
+            (folded for folded in FOLDED_TOOLS
+             if all(tool_name in tools_to_execute for tool_name in folded[1])),
+            (None, (), None)
+        )
+        tool_names = [tool_name for tool_name in tools_to_execute if tool_name not in folded_types]
+        if folded_name and folded_name not in tool_names:
+            tool_names.append(folded_name)
+        
+        # Execute the tools concurrently, since each one waits on its own LLM call
+        tool_results = await asyncio.gather(
+            *(self._execute_tool(tool_name, input_data) for tool_name in tool_names),
+            return_exceptions=True
+        )
+        
+        executed = {}
+        for tool_name, tool_result in zip(tool_names, tool_results):
+            if isinstance(tool_result, Exception):
+                logger.error(f"Error executing tool {tool_name}: {str(tool_result)}")
+                tool_result = {'error': str(tool_result)}
+            
+            executed[tool_name] = tool_result
+            if tool_name == folded_name:
+                executed.update(split_result(tool_result))
+        
+        # Report the results in the requested order
+        results['results'] = {tool_name: executed[tool_name] for tool_name in tools_to_execute}
         
         return results
 
+    async def _execute_tool(self, tool_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute a single tool.
+        
+        Tools that provide an execute_async coroutine are awaited directly;
+        other tools are run in a worker thread so they do not block each other.
+        
+        Args:
+            tool_name: Name of the tool to execute
+            input_data: Dictionary containing the input data
+            
+        Returns:
+            Dictionary containing the result of the tool execution
+        """
+        tool = self.tool_factory.create_tool(tool_name)
+        
+        execute_async = getattr(tool, 'execute_async', None)
+        if asyncio.iscoroutinefunction(execute_async):
+            return await execute_async(input_data)
+        
+        return await asyncio.to_thread(tool.execute, input_data)
+
     def _generate_cache_key(self, input_data: Dict[str, Any], 
                            tools_to_execute: List[str]) -> str:
         """
@@ -150,20 +344,18 @@ class ToolAgent:
             Cache key as a string
         """
         # Extract the relevant parts of the input data for the cache key
-        cache_data = {
-            'feedback_text': input_data.get('feedback_text', ''),
-            'instructions': input_data.get('instructions', ''),
-            'tools': sorted(tools_to_execute)
-        }
-        
-        # Convert to JSON string and generate hash
-        cache_json = json.dumps(cache_data, sort_keys=True)
+        parts = [
+            input_data.get('feedback_text', ''),
+            input_data.get('instructions', ''),
+            *sorted(tools_to_execute)
+        ]
         
-        # In a real implementation, we would use a proper hashing function
-        # For simplicity, we'll just return the JSON string
-        # In production, use something like:
-        # import hashlib
-        # return hashlib.sha256(cache_json.encode()).hexdigest()
+        # Hash the length-prefixed parts directly, avoiding JSON serialization,
+        # where missing or null fields hash like empty ones
+        digest = hashlib.blake2b(digest_size=32)
+        for part in parts:
+            encoded = str(part or '').encode()
+            digest.update(len(encoded).to_bytes(8, 'big'))
+            digest.update(encoded)
         
-        import hashlib
-        return hashlib.sha256(cache_json.encode()).hexdigest()
+        return digest.hexdigest()
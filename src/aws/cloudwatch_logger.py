@@ -4,17 +4,36 @@ CloudWatch Logger Module
 This module implements the CloudWatch logger for monitoring and logging.
 """
 
-import json
+import atexit
 import logging
+import threading
 import time
 from typing import Dict, Any, List, Optional
 
 import boto3
+import orjson
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Maximum number of metric datums accepted by a single PutMetricData request
+MAX_METRIC_DATA_PER_REQUEST = 1000
+
+# Limits of a single PutLogEvents request
+MAX_LOG_EVENTS_PER_REQUEST = 10000
+MAX_LOG_EVENTS_BYTES_PER_REQUEST = 1048576
+LOG_EVENT_OVERHEAD_BYTES = 26
+
+# Client configuration shared by the CloudWatch clients
+CLIENT_CONFIG = Config(retries={'max_attempts': 3, 'mode': 'adaptive'})
+
+# Log groups, as (group, None), and log streams, as (group, stream), known to
+# exist, so each is only created once per process
+_CREATED_LOG_DESTINATIONS = set()
+_CREATED_LOG_DESTINATIONS_LOCK = threading.Lock()
+
 
 class CloudWatchLogger:
     """
@@ -37,19 +56,53 @@ class CloudWatchLogger:
         self.namespace = namespace
         
         # Initialize the CloudWatch clients
-        self.cloudwatch = boto3.client('cloudwatch', region_name=region)
-        self.logs = boto3.client('logs', region_name=region)
+        self.cloudwatch = boto3.client('cloudwatch', region_name=region, config=CLIENT_CONFIG)
+        self.logs = boto3.client('logs', region_name=region, config=CLIENT_CONFIG)
+        
+        # Buffer metrics and log events and send them in batches, when a batch
+        # is full or after the flush interval has elapsed
+        self.metric_batch_size = min(kwargs.get('metric_batch_size', 20),
+                                     MAX_METRIC_DATA_PER_REQUEST)
+        self.event_batch_size = min(kwargs.get('event_batch_size', 100),
+                                    MAX_LOG_EVENTS_PER_REQUEST)
+        self.flush_interval = kwargs.get('flush_interval', 20.0)
+        self._metric_buffer = []
+        self._event_buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_timer = None
+        
+        # Make sure buffered metrics and events are sent on shutdown
+        atexit.register(self.flush)
         
         # Set the log group and stream
         self.log_group = kwargs.get('log_group', '/aws/lambda/intelligent-llm-agent')
         self.log_stream = kwargs.get('log_stream', f'agent-logs-{int(time.time())}')
+
+    def _ensure_log_destination_exists(self) -> None:
+        """
+        Ensure that the log group and stream exist before events are first put.
+        
+        The log group and stream are only created once per process, however
+        many loggers use them.
+        """
+        stream_key = (self.log_group, self.log_stream)
+        if stream_key in _CREATED_LOG_DESTINATIONS:
+            return
         
-        # Ensure the log group and stream exist
-        self._ensure_log_group_exists()
-        self._ensure_log_stream_exists()
+        group_key = (self.log_group, None)
+        with _CREATED_LOG_DESTINATIONS_LOCK:
+            if group_key not in _CREATED_LOG_DESTINATIONS and self._ensure_log_group_exists():
+                _CREATED_LOG_DESTINATIONS.add(group_key)
+            if stream_key not in _CREATED_LOG_DESTINATIONS and self._ensure_log_stream_exists():
+                _CREATED_LOG_DESTINATIONS.add(stream_key)
 
-    def _ensure_log_group_exists(self) -> None:
-        """Ensure that the log group exists."""
+    def _ensure_log_group_exists(self) -> bool:
+        """
+        Ensure that the log group exists.
+        
+        Returns:
+            True if the log group exists
+        """
         try:
             self.logs.create_log_group(
                 logGroupName=self.log_group
@@ -59,9 +112,17 @@ class CloudWatchLogger:
             # If the log group already exists, ignore the error
             if e.response['Error']['Code'] != 'ResourceAlreadyExistsException':
                 logger.error(f"Error creating log group: {str(e)}")
+                return False
+        
+        return True
 
-    def _ensure_log_stream_exists(self) -> None:
-        """Ensure that the log stream exists."""
+    def _ensure_log_stream_exists(self) -> bool:
+        """
+        Ensure that the log stream exists.
+        
+        Returns:
+            True if the log stream exists
+        """
         try:
             self.logs.create_log_stream(
                 logGroupName=self.log_group,
@@ -72,6 +133,9 @@ class CloudWatchLogger:
             # If the log stream already exists, ignore the error
             if e.response['Error']['Code'] != 'ResourceAlreadyExistsException':
                 logger.error(f"Error creating log stream: {str(e)}")
+                return False
+        
+        return True
 
     def log_metric(self, metric_name: str, value: float, 
                   dimensions: Optional[List[Dict[str, str]]] = None, 
@@ -79,85 +143,161 @@ class CloudWatchLogger:
         """
         Log a metric to CloudWatch.
         
+        The metric is buffered and sent with other metrics in a single request
+        once the batch is full or the flush interval has elapsed.
+        
         Args:
             metric_name: Name of the metric
             value: Value of the metric
             dimensions: Dimensions for the metric
             unit: Unit of the metric
         """
-        try:
-            # Create the metric data
-            metric_data = {
-                'MetricName': metric_name,
-                'Value': value,
-                'Unit': unit,
-                'Timestamp': time.time()
-            }
-            
-            # Add dimensions if provided
-            if dimensions:
-                metric_data['Dimensions'] = dimensions
-            
-            # Put the metric data
-            self.cloudwatch.put_metric_data(
-                Namespace=self.namespace,
-                MetricData=[metric_data]
-            )
-            
-            logger.debug(f"Logged metric: {metric_name}={value} {unit}")
+        # Create the metric data
+        metric_data = {
+            'MetricName': metric_name,
+            'Value': value,
+            'Unit': unit,
+            'Timestamp': time.time()
+        }
         
-        except ClientError as e:
-            logger.error(f"Error logging metric: {str(e)}")
+        # Add dimensions if provided
+        if dimensions:
+            metric_data['Dimensions'] = dimensions
+        
+        with self._buffer_lock:
+            self._metric_buffer.append(metric_data)
+            batch_full = len(self._metric_buffer) >= self.metric_batch_size
+            if not batch_full:
+                self._start_flush_timer()
+        
+        logger.debug(f"Buffered metric: {metric_name}={value} {unit}")
+        
+        if batch_full:
+            self.flush()
 
     def log_event(self, event_data: Dict[str, Any], log_level: str = 'INFO') -> None:
         """
         Log an event to CloudWatch Logs.
         
+        The event is buffered and sent with other events in a single request
+        once the batch is full or the flush interval has elapsed.
+        
         Args:
             event_data: Event data to log
             log_level: Log level (INFO, WARNING, ERROR, etc.)
         """
-        try:
-            # Format the event data
-            event_message = json.dumps(event_data)
+        # Format the event data
+        event_message = orjson.dumps(event_data).decode()
+        
+        log_event = {
+            'timestamp': int(time.time() * 1000),
+            'message': f"[{log_level}] {event_message}"
+        }
+        
+        with self._buffer_lock:
+            self._event_buffer.append(log_event)
+            batch_full = len(self._event_buffer) >= self.event_batch_size
+            if not batch_full:
+                self._start_flush_timer()
+        
+        logger.debug(f"Buffered event: {event_message}")
+        
+        if batch_full:
+            self.flush()
+
+    def _start_flush_timer(self) -> None:
+        """Start the flush timer if it is not already running. Must hold the buffer lock."""
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Send all buffered metrics and log events to CloudWatch."""
+        with self._buffer_lock:
+            metric_buffer, self._metric_buffer = self._metric_buffer, []
+            event_buffer, self._event_buffer = self._event_buffer, []
             
-            # Get the sequence token for the log stream
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        
+        if metric_buffer:
+            self._put_metric_data(metric_buffer)
+        
+        if event_buffer:
+            self._put_log_events(event_buffer)
+
+    def _put_metric_data(self, metric_buffer: List[Dict[str, Any]]) -> None:
+        """
+        Put metric data to CloudWatch in as few requests as possible.
+        
+        Args:
+            metric_buffer: Metric data to put
+        """
+        for start in range(0, len(metric_buffer), MAX_METRIC_DATA_PER_REQUEST):
             try:
-                response = self.logs.describe_log_streams(
-                    logGroupName=self.log_group,
-                    logStreamNamePrefix=self.log_stream
+                self.cloudwatch.put_metric_data(
+                    Namespace=self.namespace,
+                    MetricData=metric_buffer[start:start + MAX_METRIC_DATA_PER_REQUEST]
                 )
-                
-                sequence_token = response['logStreams'][0].get('uploadSequenceToken')
-            except (ClientError, IndexError):
-                # If there's an error or the stream doesn't exist, create it
-                self._ensure_log_stream_exists()
-                sequence_token = None
+            except ClientError as e:
+                logger.error(f"Error logging metrics: {str(e)}")
+
+    def _put_log_events(self, event_buffer: List[Dict[str, Any]]) -> None:
+        """
+        Put log events to CloudWatch Logs in as few requests as possible.
+        
+        Args:
+            event_buffer: Log events to put
+        """
+        self._ensure_log_destination_exists()
+        
+        # Events in a request must be in chronological order
+        event_buffer.sort(key=lambda event: event['timestamp'])
+        
+        batch = []
+        batch_bytes = 0
+        
+        for log_event in event_buffer:
+            event_bytes = len(log_event['message'].encode()) + LOG_EVENT_OVERHEAD_BYTES
             
-            # Put the log event
-            log_event = {
-                'timestamp': int(time.time() * 1000),
-                'message': f"[{log_level}] {event_message}"
-            }
+            if batch and (len(batch) >= MAX_LOG_EVENTS_PER_REQUEST or
+                          batch_bytes + event_bytes > MAX_LOG_EVENTS_BYTES_PER_REQUEST):
+                self._put_log_events_batch(batch)
+                batch = []
+                batch_bytes = 0
             
-            if sequence_token:
-                self.logs.put_log_events(
-                    logGroupName=self.log_group,
-                    logStreamName=self.log_stream,
-                    logEvents=[log_event],
-                    sequenceToken=sequence_token
-                )
-            else:
+            batch.append(log_event)
+            batch_bytes += event_bytes
+        
+        if batch:
+            self._put_log_events_batch(batch)
+
+    def _put_log_events_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Put a single batch of log events, creating the log stream if it is missing.
+        
+        Args:
+            batch: Log events to put
+        """
+        for attempt in range(2):
+            try:
                 self.logs.put_log_events(
                     logGroupName=self.log_group,
                     logStreamName=self.log_stream,
-                    logEvents=[log_event]
+                    logEvents=batch
                 )
+                return
             
-            logger.debug(f"Logged event: {event_message}")
-        
-        except ClientError as e:
-            logger.error(f"Error logging event: {str(e)}")
+            except ClientError as e:
+                # If the log stream doesn't exist, create it and try again
+                if e.response['Error']['Code'] == 'ResourceNotFoundException' and attempt == 0:
+                    self._ensure_log_stream_exists()
+                    continue
+                
+                logger.error(f"Error logging events: {str(e)}")
+                return
 
     def log_cache_metrics(self, cache_metrics: Dict[str, int]) -> None:
         """
@@ -2,14 +2,24 @@
 Lambda Handler Module
 
 This module implements the AWS Lambda handler for the intelligent LLM agent.
+
+The configuration, shared clients and, for SnapStart and provisioned
+concurrency, the agents are initialized at import, so enabling SnapStart or
+provisioned concurrency on the function moves that work out of the
+invocations. Connections that are stale after a SnapStart restore are
+reopened by a runtime hook.
 """
 
-import json
+import hashlib
 import logging
 import os
+import threading
 import time
-from typing import Dict, Any, List, Union
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple, Union
 
+import orjson
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
@@ -18,8 +28,181 @@ from ..cache.cache_manager import CacheManager
 from ..utils.input_validator import validate_input
 from ..utils.error_handler import handle_error
 
-# Configure logging
-logger = Logger(service="intelligent-llm-agent")
+# Configure logging, serializing structured log records with orjson
+logger = Logger(
+    service="intelligent-llm-agent",
+    json_serializer=lambda log: orjson.dumps(log, default=str,
+                                             option=orjson.OPT_NON_STR_KEYS).decode()
+)
+
+
+def _dumps(obj: Any) -> str:
+    """
+    Serialize an object to a JSON string.
+    
+    Args:
+        obj: Object to serialize
+        
+    Returns:
+        JSON string
+    """
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Headers returned by the Lambda URL handler
+JSON_RESPONSE_HEADERS = {'Content-Type': 'application/json'}
+
+# Serialized bodies and responses for the fixed errors, shared by every response
+_INVALID_EVENT_BODY = _dumps({'error': 'Invalid event format'})
+_INVALID_JSON_BODY_RESPONSE = {
+    'statusCode': 400,
+    'headers': JSON_RESPONSE_HEADERS,
+    'body': _dumps({'error': 'Invalid JSON in request body'})
+}
+_NO_BODY_RESPONSE = {
+    'statusCode': 400,
+    'headers': JSON_RESPONSE_HEADERS,
+    'body': _dumps({'error': 'No body in request'})
+}
+
+# Worker threads used to prepare the entries of a batch concurrently
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', '8'))
+_EXECUTOR = ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY)
+
+# Whether SQS records are handed to asynchronous invocations of this function
+# instead of being processed in the invocation that received them. Records
+# that could not be handed over are reported as batch item failures, so the
+# SQS event source mapping needs ReportBatchItemFailures enabled to retry them
+ASYNC_FANOUT = os.environ.get('ASYNC_FANOUT') == '1'
+
+# Configuration read from the environment once per container
+_BASE_CONFIG = {
+    'agent_config': {
+        'provider': os.environ.get('LLM_PROVIDER', 'openai'),
+        'model': os.environ.get('LLM_MODEL', None),
+        'api_key': os.environ.get('LLM_API_KEY', None),
+        'use_cache': os.environ.get('USE_CACHE', 'true').lower() == 'true',
+        'cache_config': {
+            'cache_type': os.environ.get('CACHE_TYPE', 'memory'),
+            'ttl': int(os.environ.get('CACHE_TTL', '3600')),
+            'table_name': os.environ.get('DYNAMODB_TABLE', 'LLMAgentCache'),
+            'region': os.environ.get('AWS_REGION', 'us-east-1')
+        }
+    }
+}
+
+# Whether the agents are created at import, for environments where the
+# initialization is done ahead of the invocations
+WARM_UP_ON_INIT = os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') in (
+    'snap-start', 'provisioned-concurrency'
+)
+
+# Fields identifying a feedback entry rather than its content, ignored when
+# recognizing feedback that was already processed
+FEEDBACK_IDENTITY_FIELDS = frozenset({'feedback_id', 'timestamp'})
+
+# Interaction and tool agents, and caches of processed feedback, keyed by their
+# configuration and reused across feedback entries and warm invocations
+_AGENT_CACHE: Dict[Tuple, Tuple[Any, Any]] = {}
+_FEEDBACK_CACHES: Dict[Tuple, CacheManager] = {}
+_AGENT_CACHE_LOCK = threading.Lock()
+
+
+def _agent_config_key(agent_config: Dict[str, Any]) -> Tuple:
+    """
+    Build a hashable key for an agent configuration.
+    
+    Args:
+        agent_config: Configuration for the agents
+        
+    Returns:
+        Tuple uniquely identifying the configuration
+    """
+    return tuple(sorted(
+        (name, tuple(sorted(value.items())) if isinstance(value, dict) else value)
+        for name, value in agent_config.items()
+    ))
+
+
+def get_agents(agent_config: Dict[str, Any]) -> Tuple[Any, Any]:
+    """
+    Get the interaction and tool agents for a configuration, creating them on first use.
+    
+    Args:
+        agent_config: Configuration for the agents
+        
+    Returns:
+        Tuple of the interaction agent and the tool agent
+    """
+    key = _agent_config_key(agent_config)
+    agents = _AGENT_CACHE.get(key)
+    if agents is None:
+        with _AGENT_CACHE_LOCK:
+            agents = _AGENT_CACHE.get(key)
+            if agents is None:
+                agents = (
+                    AgentFactory.create_agent('interaction', dict(agent_config)),
+                    AgentFactory.create_agent('tool', dict(agent_config))
+                )
+                _AGENT_CACHE[key] = agents
+    
+    return agents
+
+
+def get_feedback_cache(agent_config: Dict[str, Any]) -> Optional[CacheManager]:
+    """
+    Get the cache of processed feedback for a configuration, creating it on first use.
+    
+    Args:
+        agent_config: Configuration for the agents
+        
+    Returns:
+        Cache manager, or None if caching is disabled or the LLM output is not deterministic
+    """
+    if not agent_config.get('use_cache', True) or agent_config.get('temperature', 0) > 0:
+        return None
+    
+    key = _agent_config_key(agent_config)
+    feedback_cache = _FEEDBACK_CACHES.get(key)
+    if feedback_cache is None:
+        with _AGENT_CACHE_LOCK:
+            feedback_cache = _FEEDBACK_CACHES.get(key)
+            if feedback_cache is None:
+                feedback_cache = CacheManager(**agent_config.get('cache_config', {}))
+                _FEEDBACK_CACHES[key] = feedback_cache
+    
+    return feedback_cache
+
+
+def _feedback_cache_key(feedback: Dict[str, Any]) -> str:
+    """
+    Generate a cache key from the content of a feedback entry.
+    
+    Args:
+        feedback: Feedback entry
+        
+    Returns:
+        Cache key as a string
+    """
+    content = {name: value for name, value in feedback.items()
+               if name not in FEEDBACK_IDENTITY_FIELDS}
+    encoded = orjson.dumps(content, default=str,
+                           option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return f"feedback:{hashlib.sha256(encoded).hexdigest()}"
+
+
+def _with_feedback_id(result: Dict[str, Any], feedback: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy a cached processing result for another feedback entry with the same content.
+    
+    Args:
+        result: Cached processing result
+        feedback: Feedback entry the result is returned for
+        
+    Returns:
+        Processing result with the feedback_id of the entry
+    """
+    return {**result, 'feedback_id': feedback.get('feedback_id', 'unknown')}
 
 
 def process_single_feedback(feedback: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
@@ -41,8 +224,16 @@ def process_single_feedback(feedback: Dict[str, Any], config: Dict[str, Any]) ->
                 'error': 'Invalid input format'
             }
         
-        # Create the interaction agent
-        interaction_agent = AgentFactory.create_agent('interaction', config.get('agent_config', {}))
+        # Return the result of feedback with the same content if it was already processed
+        feedback_cache = get_feedback_cache(config.get('agent_config', {}))
+        if feedback_cache is not None:
+            cache_key = _feedback_cache_key(feedback)
+            cached_result = feedback_cache.get(cache_key)
+            if cached_result:
+                return _with_feedback_id(cached_result, feedback)
+        
+        # Get the agents for this configuration
+        interaction_agent, tool_agent = get_agents(config.get('agent_config', {}))
         
         # Process the input with the interaction agent
         interaction_result = interaction_agent.process_input(feedback)
@@ -50,9 +241,6 @@ def process_single_feedback(feedback: Dict[str, Any], config: Dict[str, Any]) ->
         # Extract the tools to execute
         tools_to_execute = interaction_result.get('tools_to_execute', [])
         
-        # Create the tool agent
-        tool_agent = AgentFactory.create_agent('tool', config.get('agent_config', {}))
-        
         # Process the request with the tool agent
         tool_result = tool_agent.process_request(feedback, tools_to_execute)
         
@@ -64,6 +252,9 @@ def process_single_feedback(feedback: Dict[str, Any], config: Dict[str, Any]) ->
             'results': tool_result.get('results', {})
         }
         
+        if feedback_cache is not None:
+            feedback_cache.set(cache_key, result)
+        
         return result
     
     except Exception as e:
@@ -73,65 +264,288 @@ def process_single_feedback(feedback: Dict[str, Any], config: Dict[str, Any]) ->
         return error_result
 
 
-def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+def _prepare_feedback(
+        feedback: Dict[str, Any],
+        interaction_agent: Any) -> Tuple[Optional[List[str]], Optional[Dict[str, Any]]]:
     """
-    AWS Lambda handler for the intelligent LLM agent.
+    Determine the tools to execute for a validated feedback entry.
     
     Args:
-        event: Lambda event
-        context: Lambda context
+        feedback: Feedback entry to prepare
+        interaction_agent: Interaction agent determining the tools
         
     Returns:
-        Lambda response
+        Tuple of the tools to execute and None, or None and an error result
     """
-    # Log the incoming event
-    logger.info(f"Received event: {json.dumps(event)}")
-    
-    # Extract the configuration
-    config = {
-        'agent_config': {
-            'provider': os.environ.get('LLM_PROVIDER', 'openai'),
-            'model': os.environ.get('LLM_MODEL', None),
-            'api_key': os.environ.get('LLM_API_KEY', None),
-            'use_cache': os.environ.get('USE_CACHE', 'true').lower() == 'true',
-            'cache_config': {
-                'cache_type': os.environ.get('CACHE_TYPE', 'memory'),
-                'ttl': int(os.environ.get('CACHE_TTL', '3600')),
-                'table_name': os.environ.get('DYNAMODB_TABLE', 'LLMAgentCache'),
-                'region': os.environ.get('AWS_REGION', 'us-east-1')
+    try:
+        interaction_result = interaction_agent.process_input(feedback)
+        return interaction_result.get('tools_to_execute', []), None
+    
+    except Exception as e:
+        # Handle the error
+        logger.error(f"Error processing feedback: {str(e)}")
+        return None, handle_error(e, feedback.get('feedback_id', 'unknown'))
+
+
+def process_feedback_batch(feedback_entries: List[Dict[str, Any]],
+                           config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Process a batch of feedback entries.
+    
+    Already processed feedback is looked up for the whole batch at once, and
+    entries with the same content are processed once. The remaining entries
+    are prepared concurrently on a thread pool, and the tool agent looks up
+    and stores the cached results of the whole batch together while executing
+    the uncached entries concurrently.
+    
+    Args:
+        feedback_entries: Feedback entries to process
+        config: Configuration for processing
+        
+    Returns:
+        Processing results, in the same order as the feedback entries
+    """
+    results = [None] * len(feedback_entries)
+    agent_config = config.get('agent_config', {})
+    
+    # Validate the entries
+    valid_positions = []
+    for position, feedback in enumerate(feedback_entries):
+        if validate_input(feedback):
+            valid_positions.append(position)
+        else:
+            feedback_id = (feedback.get('feedback_id', 'unknown') if isinstance(feedback, dict)
+                           else 'unknown')
+            results[position] = {
+                'feedback_id': feedback_id,
+                'error': 'Invalid input format'
             }
+    
+    try:
+        # Return the results of feedback with the same content that was already processed
+        feedback_cache = get_feedback_cache(agent_config)
+        cache_keys = {}
+        duplicate_positions = {}
+        if feedback_cache is not None:
+            cache_keys = {position: _feedback_cache_key(feedback_entries[position])
+                          for position in valid_positions}
+            cached_results = feedback_cache.get_many(list(cache_keys.values()))
+            
+            pending_positions = []
+            first_positions = {}
+            for position in valid_positions:
+                cache_key = cache_keys[position]
+                cached_result = cached_results.get(cache_key)
+                if cached_result:
+                    results[position] = _with_feedback_id(cached_result, feedback_entries[position])
+                elif cache_key in first_positions:
+                    # Entries with the same content as an earlier entry of the batch
+                    # reuse its result
+                    duplicate_positions[position] = first_positions[cache_key]
+                else:
+                    first_positions[cache_key] = position
+                    pending_positions.append(position)
+            valid_positions = pending_positions
+        
+        # Get the agents for this configuration
+        interaction_agent, tool_agent = get_agents(agent_config)
+    
+    except Exception as e:
+        # Report the failed setup in the result of every entry still to be processed
+        logger.error(f"Error processing feedback: {str(e)}")
+        for position, feedback in enumerate(feedback_entries):
+            if results[position] is None:
+                results[position] = handle_error(e, feedback.get('feedback_id', 'unknown'))
+        return results
+    
+    # Determine the tools to execute for each entry concurrently, since tool
+    # selection may wait on an LLM call
+    prepared = _EXECUTOR.map(
+        lambda position: _prepare_feedback(feedback_entries[position], interaction_agent),
+        valid_positions
+    )
+    
+    requests = []
+    positions = []
+    for position, (tools_to_execute, error_result) in zip(valid_positions, prepared):
+        if error_result is not None:
+            results[position] = error_result
+        else:
+            requests.append((feedback_entries[position], tools_to_execute))
+            positions.append(position)
+    
+    # Process the requests with the tool agent
+    try:
+        tool_results = tool_agent.process_requests(requests)
+    except Exception as e:
+        tool_results = [e] * len(requests)
+    
+    # Combine the results
+    processed_at = int(time.time())
+    new_results = {}
+    for position, (feedback, tools_to_execute), tool_result in zip(
+            positions, requests, tool_results):
+        if isinstance(tool_result, Exception):
+            results[position] = handle_error(tool_result, feedback.get('feedback_id', 'unknown'))
+            logger.error(f"Error processing feedback: {str(tool_result)}")
+            continue
+        
+        results[position] = {
+            'feedback_id': feedback.get('feedback_id', 'unknown'),
+            'processed_at': processed_at,
+            'tools_executed': tools_to_execute,
+            'results': tool_result.get('results', {})
         }
-    }
+        
+        if position in cache_keys:
+            new_results[cache_keys[position]] = results[position]
+    
+    # Remember the processed feedback, which is not needed for the results
+    if new_results:
+        try:
+            feedback_cache.set_many(new_results)
+        except Exception as e:
+            logger.error(f"Error caching processed feedback: {str(e)}")
+    
+    # Fill in the entries with the same content as an earlier entry of the batch
+    for position, first_position in duplicate_positions.items():
+        results[position] = _with_feedback_id(results[first_position], feedback_entries[position])
+    
+    return results
+
+
+def _encode_response(status_code: int, body: Any,
+                     headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Build a Lambda response, serializing the body exactly once.
+    
+    Args:
+        status_code: HTTP status code
+        body: Response body as native Python objects, or a string holding
+            an already serialized body
+        headers: Optional response headers
+        
+    Returns:
+        Lambda response
+    """
+    response = {'statusCode': status_code}
+    if headers is not None:
+        response['headers'] = headers
+    response['body'] = body if isinstance(body, str) else _dumps(body)
+    return response
+
+
+@lru_cache(maxsize=None)
+def _get_lambda_client() -> Any:
+    """
+    Get the Lambda client used to invoke this function asynchronously.
+    
+    Returns:
+        Lambda client
+    """
+    import boto3
+    return boto3.client('lambda')
+
+
+def _invoke_async(function_name: str, feedback: Any) -> Dict[str, Any]:
+    """
+    Queue an asynchronous invocation of this function for a feedback entry.
+    
+    Args:
+        function_name: Name of this function
+        feedback: Feedback entry to process
+        
+    Returns:
+        Status of the invocation
+    """
+    try:
+        _get_lambda_client().invoke(
+            FunctionName=function_name,
+            InvocationType='Event',
+            Payload=orjson.dumps({'feedback': feedback})
+        )
+        return {'status': 'queued'}
+    
+    except Exception as e:
+        logger.error(f"Error queueing feedback: {str(e)}")
+        return {'error': f'Error queueing feedback: {str(e)}'}
+
+
+def _handle_event(event: Dict[str, Any], function_name: Optional[str] = None) -> Tuple[int, Any]:
+    """
+    Process an event and return the response status and body without serializing it.
+    
+    Args:
+        event: Lambda event, or the parsed body of a Lambda URL request
+        function_name: Name of this function, used to hand SQS records to
+            asynchronous invocations when ASYNC_FANOUT is enabled
+            
+    Returns:
+        Tuple of (status code, response body)
+        
+    Raises:
+        RuntimeError: If SQS records without a message ID could not be queued
+    """
+    # The configuration comes from the environment, which is fixed for the container
+    config = _BASE_CONFIG
     
     # Check if the event is a batch of feedback entries or a single entry
     if 'Records' in event:
         # Process a batch of feedback entries
-        results = []
+        records = event['Records']
+        results = [None] * len(records)
+        feedback_entries = []
+        positions = []
+        
+        # Bind the names used for every record to locals
+        loads = orjson.loads
+        decode_error = orjson.JSONDecodeError
+        log_error = logger.error
+        append_entry = feedback_entries.append
+        append_position = positions.append
         
-        for record in event['Records']:
+        for position, record in enumerate(records):
             # Extract the feedback from the record
             if 'body' in record:
                 try:
-                    feedback = json.loads(record['body'])
-                    result = process_single_feedback(feedback, config)
-                    results.append(result)
-                except json.JSONDecodeError:
-                    logger.error(f"Invalid JSON in record: {record['body']}")
-                    results.append({
+                    append_entry(loads(record['body']))
+                    append_position(position)
+                except decode_error:
+                    log_error(f"Invalid JSON in record: {record['body']}")
+                    results[position] = {
                         'error': 'Invalid JSON in record'
-                    })
+                    }
             else:
-                logger.error(f"Invalid record format: {record}")
-                results.append({
+                log_error(f"Invalid record format: {record}")
+                results[position] = {
                     'error': 'Invalid record format'
-                })
+                }
         
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'results': results
-            })
-        }
+        # Queue the entries for asynchronous invocations and return without waiting for them
+        if ASYNC_FANOUT and function_name:
+            statuses = _EXECUTOR.map(lambda feedback: _invoke_async(function_name, feedback),
+                                     feedback_entries)
+            failed_message_ids = []
+            for position, status in zip(positions, statuses):
+                results[position] = status
+                if 'error' in status:
+                    failed_message_ids.append(records[position].get('messageId'))
+            
+            # Have SQS retry the records that were not queued, or the whole batch
+            # if they cannot be identified
+            if None in failed_message_ids:
+                raise RuntimeError("Error queueing feedback of records without a message ID")
+            
+            return 202, {
+                'results': results,
+                'batchItemFailures': [{'itemIdentifier': message_id}
+                                      for message_id in failed_message_ids]
+            }
+        
+        for position, result in zip(positions, process_feedback_batch(feedback_entries, config)):
+            results[position] = result
+        
+        return 200, {'results': results}
     
     elif 'feedback' in event:
         # Check if this is a batch of feedback entries
@@ -139,53 +553,52 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         
         if isinstance(feedback_entries, list):
             # Process a batch of feedback entries
-            results = []
-            
-            for feedback in feedback_entries:
-                result = process_single_feedback(feedback, config)
-                results.append(result)
-            
-            return {
-                'statusCode': 200,
-                'body': json.dumps({
-                    'results': results
-                })
-            }
+            return 200, {'results': process_feedback_batch(feedback_entries, config)}
         else:
             # Process a single feedback entry
-            result = process_single_feedback(feedback_entries, config)
-            
-            return {
-                'statusCode': 200,
-                'body': json.dumps(result)
-            }
+            return 200, process_single_feedback(feedback_entries, config)
     
     elif 'feedback_id' in event:
         # Process a single feedback entry
-        result = process_single_feedback(event, config)
-        
-        return {
-            'statusCode': 200,
-            'body': json.dumps(result)
-        }
+        return 200, process_single_feedback(event, config)
     
     else:
         # Invalid event format
         logger.error(f"Invalid event format: {event}")
         
-        return {
-            'statusCode': 400,
-            'body': json.dumps({
-                'error': 'Invalid event format'
-            })
-        }
+        return 400, _INVALID_EVENT_BODY
+
+
+def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
+    """
+    AWS Lambda handler for the intelligent LLM agent.
+    
+    Args:
+        event: Lambda event
+        context: Lambda context
+        
+    Returns:
+        Lambda response
+    """
+    # Log the incoming event as a structured field, serialized only if the record is emitted
+    logger.info("Received event", extra={"event": event})
+    
+    status_code, body = _handle_event(event, getattr(context, 'function_name', None))
+    response = _encode_response(status_code, body)
+    
+    # SQS reads the records to retry from the top level of the response
+    if isinstance(body, dict) and 'batchItemFailures' in body:
+        response['batchItemFailures'] = body['batchItemFailures']
+    
+    return response
 
 
 def lambda_url_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
     """
     AWS Lambda URL handler for the intelligent LLM agent.
     
-    This handler is designed to be used with Lambda Function URLs.
+    This handler is designed to be used with Lambda Function URLs. The parsed
+    request body is processed directly and the response is serialized once.
     
     Args:
         event: Lambda event
@@ -201,52 +614,55 @@ def lambda_url_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[st
         # Extract the body from the event
         if 'body' in event:
             try:
-                body = json.loads(event['body'])
-            except json.JSONDecodeError:
+                body = orjson.loads(event['body'])
+            except orjson.JSONDecodeError:
                 logger.error(f"Invalid JSON in request body: {event['body']}")
-                return {
-                    'statusCode': 400,
-                    'headers': {
-                        'Content-Type': 'application/json'
-                    },
-                    'body': json.dumps({
-                        'error': 'Invalid JSON in request body'
-                    })
-                }
+                return _INVALID_JSON_BODY_RESPONSE
         else:
             logger.error(f"No body in request: {event}")
-            return {
-                'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json'
-                },
-                'body': json.dumps({
-                    'error': 'No body in request'
-                })
-            }
+            return _NO_BODY_RESPONSE
         
-        # Process the request using the main lambda handler
-        result = lambda_handler(body, context)
+        # Process the parsed body without a round trip through the main lambda handler
+        logger.info("Received event", extra={"event": body})
+        status_code, result = _handle_event(body)
         
         # Return the result
-        return {
-            'statusCode': result.get('statusCode', 200),
-            'headers': {
-                'Content-Type': 'application/json'
-            },
-            'body': result.get('body', json.dumps({'error': 'Unknown error'}))
-        }
+        return _encode_response(status_code, result, JSON_RESPONSE_HEADERS)
     
     except Exception as e:
         # Handle the error
         logger.error(f"Error processing Lambda URL request: {str(e)}")
         
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json'
-            },
-            'body': json.dumps({
-                'error': f'Error processing request: {str(e)}'
-            })
-        }
+        return _encode_response(500, {'error': f'Error processing request: {str(e)}'},
+                                JSON_RESPONSE_HEADERS)
+
+
+def _warm_up() -> None:
+    """
+    Create the agents and shared clients for the configuration from the environment.
+    
+    Failures are logged rather than raised, since the agents are also created
+    on first use.
+    """
+    try:
+        get_agents(_BASE_CONFIG['agent_config'])
+        logger.info("Agents initialized ahead of the invocations")
+    except Exception as e:
+        logger.warning(f"Error initializing agents ahead of the invocations: {str(e)}")
+
+
+def _after_restore() -> None:
+    """Reopen the connections that are stale after a SnapStart restore."""
+    from ..cache.dynamodb_cache import refresh_connections
+    refresh_connections()
+
+
+if WARM_UP_ON_INIT:
+    _warm_up()
+    
+    # The runtime hooks are only available in the Lambda Python runtime
+    try:
+        from snapshot_restore_py import register_after_restore
+        register_after_restore(_after_restore)
+    except ImportError:
+        pass
@@ -7,11 +7,19 @@ processed requests and their results.
 
 import json
 import logging
-import time
-from typing import Dict, Any, Optional
+from array import array
+from typing import Dict, Any, List, Optional
+
+from .memory_cache import MemoryCache
 
 logger = logging.getLogger(__name__)
 
+# Names of the cache metrics, in the order of their counters
+METRIC_NAMES = ('hits', 'misses', 'sets')
+
+# Indices of the cache metric counters
+HITS, MISSES, SETS = range(len(METRIC_NAMES))
+
 
 class CacheManager:
     """
@@ -28,14 +36,17 @@ class CacheManager:
         Args:
             cache_type: Type of cache to use ('memory' or 'dynamodb')
             ttl: Time-to-live for cache entries in seconds
-            **kwargs: Additional configuration options
+            **kwargs: Additional configuration options, including 'max_entries'
+                for the size of the memory cache
         """
         self.cache_type = cache_type.lower()
         self.ttl = ttl
         
-        # Initialize the appropriate cache based on the type
+        # Create the backend for the cache type once, so the cache operations
+        # call it directly instead of dispatching on the type each time
         if self.cache_type == 'memory':
-            self.cache = {}
+            # Least recently used entries are evicted once the cache is full
+            self.cache = MemoryCache(max_entries=kwargs.get('max_entries', 10000))
         elif self.cache_type == 'dynamodb':
             # Import here to avoid dependency if not using DynamoDB
             from .dynamodb_cache import DynamoDBCache
@@ -43,12 +54,8 @@ class CacheManager:
         else:
             raise ValueError(f"Unsupported cache type: {self.cache_type}")
         
-        # Initialize cache metrics
-        self.metrics = {
-            'hits': 0,
-            'misses': 0,
-            'sets': 0
-        }
+        # Initialize cache metrics as counters indexed by HITS, MISSES and SETS
+        self.metrics = array('q', bytes(8 * len(METRIC_NAMES)))
 
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         """
@@ -61,44 +68,20 @@ class CacheManager:
             Cached value or None if not found or expired
         """
         # Log the cache request
-        logger.debug(f"Cache get request for key: {key}")
+        logger.debug("Cache get request for key: %s", key)
         
-        # Handle based on cache type
-        if self.cache_type == 'memory':
-            # Check if the key exists in the cache
-            if key in self.cache:
-                entry = self.cache[key]
-                
-                # Check if the entry has expired
-                if time.time() < entry['expiry']:
-                    # Cache hit
-                    self.metrics['hits'] += 1
-                    logger.info(f"Cache hit for key: {key}")
-                    return entry['value']
-                else:
-                    # Entry has expired
-                    logger.info(f"Cache entry expired for key: {key}")
-                    del self.cache[key]
-            
+        result = self.cache.get(key)
+        
+        if result is not None:
+            # Cache hit
+            self.metrics[HITS] += 1
+            logger.debug("Cache hit for key: %s", key)
+        else:
             # Cache miss
-            self.metrics['misses'] += 1
-            logger.info(f"Cache miss for key: {key}")
-            return None
+            self.metrics[MISSES] += 1
+            logger.debug("Cache miss for key: %s", key)
         
-        elif self.cache_type == 'dynamodb':
-            # Use the DynamoDB cache implementation
-            result = self.cache.get(key)
-            
-            if result:
-                # Cache hit
-                self.metrics['hits'] += 1
-                logger.info(f"Cache hit for key: {key}")
-            else:
-                # Cache miss
-                self.metrics['misses'] += 1
-                logger.info(f"Cache miss for key: {key}")
-            
-            return result
+        return result
 
     def set(self, key: str, value: Dict[str, Any]) -> None:
         """
@@ -109,26 +92,47 @@ class CacheManager:
             value: Value to cache
         """
         # Log the cache set
-        logger.debug(f"Cache set request for key: {key}")
+        logger.debug("Cache set request for key: %s", key)
         
-        # Handle based on cache type
-        if self.cache_type == 'memory':
-            # Calculate the expiry time
-            expiry = time.time() + self.ttl
+        self.cache.set(key, value, self.ttl)
+        
+        # Update metrics
+        self.metrics[SETS] += 1
+        logger.debug("Cache set for key: %s", key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several values from the cache at once.
+        
+        Args:
+            keys: Cache keys
             
-            # Store the value in the cache
-            self.cache[key] = {
-                'value': value,
-                'expiry': expiry
-            }
+        Returns:
+            Dictionary of cached values by key, for the keys that were found
+        """
+        # Fetch all keys at once, which the DynamoDB backend does in batches
+        results = self.cache.get_many(keys)
         
-        elif self.cache_type == 'dynamodb':
-            # Use the DynamoDB cache implementation
-            self.cache.set(key, value, self.ttl)
+        # Update metrics
+        self.metrics[HITS] += len(results)
+        self.metrics[MISSES] += len(keys) - len(results)
+        logger.info("Cache batch get for %d keys with %d hits", len(keys), len(results))
+        
+        return results
+
+    def set_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Set several values in the cache at once.
+        
+        Args:
+            items: Values to cache by key
+        """
+        # Store all items at once, which the DynamoDB backend does in batches
+        self.cache.set_many(items, self.ttl)
         
         # Update metrics
-        self.metrics['sets'] += 1
-        logger.info(f"Cache set for key: {key}")
+        self.metrics[SETS] += len(items)
+        logger.info("Cache batch set for %d keys", len(items))
 
     def delete(self, key: str) -> None:
         """
@@ -138,44 +142,22 @@ class CacheManager:
             key: Cache key
         """
         # Log the cache delete
-        logger.debug(f"Cache delete request for key: {key}")
-        
-        # Handle based on cache type
-        if self.cache_type == 'memory':
-            # Delete the key from the cache if it exists
-            if key in self.cache:
-                del self.cache[key]
-                logger.info(f"Cache entry deleted for key: {key}")
-            else:
-                logger.info(f"Cache entry not found for delete key: {key}")
+        logger.debug("Cache delete request for key: %s", key)
         
-        elif self.cache_type == 'dynamodb':
-            # Use the DynamoDB cache implementation
-            self.cache.delete(key)
-            logger.info(f"Cache entry deleted for key: {key}")
+        self.cache.delete(key)
+        logger.debug("Cache entry deleted for key: %s", key)
 
     def clear(self) -> None:
         """Clear all entries from the cache."""
         # Log the cache clear
         logger.debug("Cache clear request")
         
-        # Handle based on cache type
-        if self.cache_type == 'memory':
-            # Clear the in-memory cache
-            self.cache = {}
-            logger.info("In-memory cache cleared")
-        
-        elif self.cache_type == 'dynamodb':
-            # Use the DynamoDB cache implementation
-            self.cache.clear()
-            logger.info("DynamoDB cache cleared")
+        self.cache.clear()
+        logger.info("%s cache cleared", self.cache_type)
         
         # Reset metrics
-        self.metrics = {
-            'hits': 0,
-            'misses': 0,
-            'sets': 0
-        }
+        for index in range(len(METRIC_NAMES)):
+            self.metrics[index] = 0
 
     def get_metrics(self) -> Dict[str, int]:
         """
@@ -184,4 +166,4 @@ class CacheManager:
         Returns:
             Dictionary containing cache metrics
         """
-        return self.metrics
+        return dict(zip(METRIC_NAMES, self.metrics))
@@ -5,16 +5,150 @@ This module implements the DynamoDB cache for storing processed
 requests and their results.
 """
 
-import json
 import logging
+import os
+import threading
 import time
-from typing import Dict, Any, Optional
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
 import boto3
+import orjson
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of keys in a single BatchGetItem request
+MAX_BATCH_GET_KEYS = 100
+
+# Maximum number of items in a single BatchWriteItem request
+MAX_BATCH_WRITE_ITEMS = 25
+
+# Maximum number of batch request attempts for keys or items left unprocessed by throttling
+MAX_BATCH_ATTEMPTS = 5
+
+# Version prefixes of the binary cached_result encodings
+RESULT_FORMAT_JSON = b'\x01'
+RESULT_FORMAT_ZLIB_JSON = b'\x02'
+
+# Serialized size in bytes above which cached results are compressed
+RESULT_COMPRESSION_THRESHOLD = 1024
+
+# Number of segments scanned in parallel when clearing the cache
+CLEAR_SCAN_SEGMENTS = 8
+
+# DynamoDB resources keyed by region and tables keyed by (table name, region),
+# shared across cache instances so warm Lambda invocations reuse the same connections
+_RESOURCES: Dict[str, Any] = {}
+_TABLES: Dict[Tuple[str, str], Any] = {}
+_TABLES_LOCK = threading.Lock()
+
+
+def _encode_result(value: Dict[str, Any]) -> bytes:
+    """
+    Encode a cached result as a version-prefixed binary value.
+    
+    Results larger than RESULT_COMPRESSION_THRESHOLD are compressed, which
+    reduces the write capacity and bytes transferred for each item.
+    
+    Args:
+        value: Result to encode
+        
+    Returns:
+        Encoded result
+    """
+    data = orjson.dumps(value)
+    if len(data) > RESULT_COMPRESSION_THRESHOLD:
+        return RESULT_FORMAT_ZLIB_JSON + zlib.compress(data)
+    return RESULT_FORMAT_JSON + data
+
+
+def _decode_result(attribute: Any) -> Dict[str, Any]:
+    """
+    Decode a cached result stored by _encode_result or as JSON text.
+    
+    Args:
+        attribute: cached_result attribute of a DynamoDB item
+        
+    Returns:
+        Decoded result
+    """
+    # Items written before the binary encoding hold JSON text
+    if isinstance(attribute, str):
+        return orjson.loads(attribute)
+    
+    data = bytes(getattr(attribute, 'value', attribute))
+    if data[:1] == RESULT_FORMAT_ZLIB_JSON:
+        return orjson.loads(zlib.decompress(data[1:]))
+    return orjson.loads(data[1:])
+
+
+def _get_resource(region: str) -> Any:
+    """
+    Get the shared DynamoDB service resource for a region, creating it on first use.
+    
+    Args:
+        region: AWS region
+        
+    Returns:
+        DynamoDB service resource
+    """
+    resource = _RESOURCES.get(region)
+    if resource is None:
+        with _TABLES_LOCK:
+            resource = _RESOURCES.get(region)
+            if resource is None:
+                resource = boto3.resource('dynamodb', region_name=region)
+                _RESOURCES[region] = resource
+    
+    return resource
+
+
+def _get_table(table_name: str, region: str) -> Any:
+    """
+    Get the shared DynamoDB table resource, creating it on first use.
+    
+    Args:
+        table_name: Name of the DynamoDB table
+        region: AWS region
+        
+    Returns:
+        DynamoDB table resource
+    """
+    key = (table_name, region)
+    table = _TABLES.get(key)
+    if table is None:
+        resource = _get_resource(region)
+        with _TABLES_LOCK:
+            table = _TABLES.get(key)
+            if table is None:
+                table = resource.Table(table_name)
+                _TABLES[key] = table
+    
+    return table
+
+
+def refresh_connections() -> None:
+    """
+    Reopen the connections of the shared tables with a lightweight request.
+    
+    Connections pooled before a Lambda SnapStart snapshot are stale once the
+    snapshot is restored, so this is called after restore to replace them
+    before the first cache access.
+    """
+    for (table_name, region), table in list(_TABLES.items()):
+        try:
+            table.meta.client.describe_table(TableName=table_name)
+        except ClientError as e:
+            logger.warning("Error refreshing connection to DynamoDB table %s: %s", table_name, e)
+
+
+# Create the configured table during the Lambda INIT phase rather than the first invocation
+if 'AWS_LAMBDA_FUNCTION_NAME' in os.environ:
+    _get_table(os.environ.get('DYNAMODB_TABLE', 'LLMAgentCache'),
+               os.environ.get('AWS_REGION', 'us-east-1'))
+
 
 class DynamoDBCache:
     """
@@ -22,6 +156,9 @@ class DynamoDBCache:
     
     This class provides an interface for caching and retrieving
     processed requests and their results using DynamoDB.
+    
+    The table must have DynamoDB TTL enabled on the 'expiry' attribute, so
+    that expired entries are deleted by DynamoDB rather than by the cache.
     """
 
     def __init__(self, table_name: str = 'LLMAgentCache', 
@@ -36,9 +173,9 @@ class DynamoDBCache:
         """
         self.table_name = table_name
         
-        # Initialize the DynamoDB client
-        self.dynamodb = boto3.resource('dynamodb', region_name=region)
-        self.table = self.dynamodb.Table(self.table_name)
+        # Reuse the DynamoDB resource and table shared by all caches for this table and region
+        self.dynamodb = _get_resource(region)
+        self.table = _get_table(self.table_name, region)
 
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         """
@@ -51,63 +188,148 @@ class DynamoDBCache:
             Cached value or None if not found or expired
         """
         try:
-            # Get the item from DynamoDB
+            # Get the item from DynamoDB, reading only the attributes that are used
             response = self.table.get_item(
                 Key={
                     'cache_key': key
-                }
+                },
+                ProjectionExpression='cached_result, expiry'
             )
             
             # Check if the item exists
             if 'Item' in response:
                 item = response['Item']
                 
-                # Check if the item has expired
+                # Check if the item has expired, leaving its deletion to DynamoDB TTL
                 if 'expiry' in item and item['expiry'] < int(time.time()):
-                    # Item has expired, delete it
-                    logger.info(f"Cache entry expired for key: {key}")
-                    self.delete(key)
+                    logger.debug("Cache entry expired for key: %s", key)
                     return None
                 
                 # Return the cached result
-                return json.loads(item['cached_result'])
+                return _decode_result(item['cached_result'])
             
             # Item not found
             return None
         
         except ClientError as e:
-            logger.error(f"Error getting item from DynamoDB: {str(e)}")
+            logger.error("Error getting item from DynamoDB: %s", e)
             return None
 
     def set(self, key: str, value: Dict[str, Any], ttl: int = 3600) -> None:
         """
         Set a value in the cache.
         
+        The write is skipped if the key already holds an entry that has not
+        expired, such as one stored by another worker for the same request.
+        
         Args:
             key: Cache key
             value: Value to cache
             ttl: Time-to-live in seconds
         """
+        item = self._build_item(key, value, ttl)
+        
         try:
-            # Calculate the expiry time
-            expiry = int(time.time()) + ttl
-            
-            # Extract the feedback_id if present
-            feedback_id = value.get('feedback_id', '')
-            
-            # Store the item in DynamoDB
+            # Store the item in DynamoDB unless another writer already stored a
+            # live entry for the key
             self.table.put_item(
-                Item={
-                    'cache_key': key,
-                    'feedback_id': feedback_id,
-                    'cached_result': json.dumps(value),
-                    'expiry': expiry,
-                    'last_updated': int(time.time())
-                }
+                Item=item,
+                ConditionExpression='attribute_not_exists(cache_key) OR expiry < :now',
+                ExpressionAttributeValues={':now': item['last_updated']}
             )
         
         except ClientError as e:
-            logger.error(f"Error setting item in DynamoDB: {str(e)}")
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                logger.debug("Cache entry already stored for key: %s", key)
+                return
+            logger.error("Error setting item in DynamoDB: %s", e)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several values from the cache with as few requests as possible.
+        
+        Expired entries that DynamoDB TTL has not deleted yet are treated as missing.
+        
+        Args:
+            keys: Cache keys
+            
+        Returns:
+            Dictionary of cached values by key, for the keys that were found
+        """
+        results = {}
+        unique_keys = list(dict.fromkeys(keys))
+        now = int(time.time())
+        
+        try:
+            for start in range(0, len(unique_keys), MAX_BATCH_GET_KEYS):
+                chunk = unique_keys[start:start + MAX_BATCH_GET_KEYS]
+                request_items = {
+                    self.table_name: {
+                        'Keys': [{'cache_key': key} for key in chunk],
+                        'ProjectionExpression': 'cache_key, cached_result, expiry'
+                    }
+                }
+                
+                # Retry keys left unprocessed by throttling, backing off between attempts
+                for attempt in range(MAX_BATCH_ATTEMPTS):
+                    if attempt:
+                        time.sleep(0.05 * 2 ** attempt)
+                    
+                    response = self.dynamodb.batch_get_item(RequestItems=request_items)
+                    for item in response.get('Responses', {}).get(self.table_name, []):
+                        if 'expiry' in item and item['expiry'] < now:
+                            continue
+                        results[item['cache_key']] = _decode_result(item['cached_result'])
+                    
+                    request_items = response.get('UnprocessedKeys')
+                    if not request_items:
+                        break
+                else:
+                    logger.warning("Some keys were left unprocessed by DynamoDB batch get")
+        
+        except ClientError as e:
+            logger.error("Error getting items from DynamoDB: %s", e)
+        
+        return results
+
+    def set_many(self, items: Dict[str, Dict[str, Any]], ttl: int = 3600) -> None:
+        """
+        Set several values in the cache with as few requests as possible.
+        
+        Args:
+            items: Values to cache by key
+            ttl: Time-to-live in seconds
+        """
+        try:
+            # The batch writer groups the puts into BatchWriteItem requests
+            with self.table.batch_writer(overwrite_by_pkeys=['cache_key']) as batch:
+                for key, value in items.items():
+                    batch.put_item(Item=self._build_item(key, value, ttl))
+        
+        except ClientError as e:
+            logger.error("Error setting items in DynamoDB: %s", e)
+
+    def _build_item(self, key: str, value: Dict[str, Any], ttl: int) -> Dict[str, Any]:
+        """
+        Build the DynamoDB item for a cache entry.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds
+            
+        Returns:
+            DynamoDB item
+        """
+        now = int(time.time())
+        
+        return {
+            'cache_key': key,
+            'feedback_id': value.get('feedback_id', ''),
+            'cached_result': _encode_result(value),
+            'expiry': now + ttl,
+            'last_updated': now
+        }
 
     def delete(self, key: str) -> None:
         """
@@ -125,36 +347,102 @@ class DynamoDBCache:
             )
         
         except ClientError as e:
-            logger.error(f"Error deleting item from DynamoDB: {str(e)}")
+            logger.error("Error deleting item from DynamoDB: %s", e)
 
-    def clear(self) -> None:
-        """Clear all entries from the cache."""
+    def clear(self, fast: bool = False) -> None:
+        """
+        Clear all entries from the cache.
+        
+        Args:
+            fast: Whether to delete and recreate the table instead of deleting its
+                items. This takes the same time however large the cache is, but the
+                table is unavailable while it is recreated and only its key schema,
+                billing mode and TTL setting are preserved.
+        """
         try:
-            # Scan the table to get all items
-            response = self.table.scan()
+            if fast:
+                self._recreate_table()
+                return
             
-            # Delete each item
-            with self.table.batch_writer() as batch:
-                for item in response.get('Items', []):
-                    batch.delete_item(
-                        Key={
-                            'cache_key': item['cache_key']
-                        }
-                    )
+            # Scan and delete the segments of the table in parallel
+            with ThreadPoolExecutor(max_workers=CLEAR_SCAN_SEGMENTS) as executor:
+                list(executor.map(self._clear_segment, range(CLEAR_SCAN_SEGMENTS)))
+        
+        except ClientError as e:
+            logger.error("Error clearing DynamoDB cache: %s", e)
+
+    def _clear_segment(self, segment: int) -> None:
+        """
+        Delete all entries in one segment of a parallel scan of the table.
+        
+        The low-level client is used since, unlike resources, it can be shared
+        between threads.
+        
+        Args:
+            segment: Index of the scan segment
+        """
+        client = self.table.meta.client
+        paginator = client.get_paginator('scan')
+        
+        # Only the keys are read, since nothing else is needed to delete the items
+        for page in paginator.paginate(TableName=self.table_name, ProjectionExpression='cache_key',
+                                       Segment=segment, TotalSegments=CLEAR_SCAN_SEGMENTS):
+            keys = [{'cache_key': item['cache_key']} for item in page.get('Items', [])]
             
-            # Continue scanning and deleting if there are more items
-            while 'LastEvaluatedKey' in response:
-                response = self.table.scan(
-                    ExclusiveStartKey=response['LastEvaluatedKey']
-                )
+            for start in range(0, len(keys), MAX_BATCH_WRITE_ITEMS):
+                request_items = {
+                    self.table_name: [{'DeleteRequest': {'Key': key}}
+                                      for key in keys[start:start + MAX_BATCH_WRITE_ITEMS]]
+                }
                 
-                with self.table.batch_writer() as batch:
-                    for item in response.get('Items', []):
-                        batch.delete_item(
-                            Key={
-                                'cache_key': item['cache_key']
-                            }
-                        )
+                # Retry items left unprocessed by throttling, backing off between attempts
+                for attempt in range(MAX_BATCH_ATTEMPTS):
+                    if attempt:
+                        time.sleep(0.05 * 2 ** attempt)
+                    
+                    response = client.batch_write_item(RequestItems=request_items)
+                    request_items = response.get('UnprocessedItems')
+                    if not request_items:
+                        break
+                else:
+                    logger.warning("Some items were left unprocessed by DynamoDB batch delete")
+
+    def _recreate_table(self) -> None:
+        """Delete and recreate the table with the same key schema, billing mode and TTL setting."""
+        client = self.table.meta.client
+        description = client.describe_table(TableName=self.table_name)['Table']
+        time_to_live = client.describe_time_to_live(
+            TableName=self.table_name)['TimeToLiveDescription']
         
-        except ClientError as e:
-            logger.error(f"Error clearing DynamoDB cache: {str(e)}")
+        client.delete_table(TableName=self.table_name)
+        client.get_waiter('table_not_exists').wait(TableName=self.table_name)
+        logger.info("Deleted DynamoDB table: %s", self.table_name)
+        
+        key_attributes = {element['AttributeName'] for element in description['KeySchema']}
+        billing_mode = description.get('BillingModeSummary', {}).get('BillingMode', 'PROVISIONED')
+        create_kwargs = {
+            'TableName': self.table_name,
+            'KeySchema': description['KeySchema'],
+            'AttributeDefinitions': [
+                definition for definition in description['AttributeDefinitions']
+                if definition['AttributeName'] in key_attributes
+            ],
+            'BillingMode': billing_mode
+        }
+        if billing_mode == 'PROVISIONED':
+            create_kwargs['ProvisionedThroughput'] = {
+                'ReadCapacityUnits': description['ProvisionedThroughput']['ReadCapacityUnits'],
+                'WriteCapacityUnits': description['ProvisionedThroughput']['WriteCapacityUnits']
+            }
+        
+        client.create_table(**create_kwargs)
+        client.get_waiter('table_exists').wait(TableName=self.table_name)
+        logger.info("Recreated DynamoDB table: %s", self.table_name)
+        
+        # TTL is a table setting, so it has to be enabled again
+        if time_to_live.get('TimeToLiveStatus') in ('ENABLED', 'ENABLING'):
+            client.update_time_to_live(
+                TableName=self.table_name,
+                TimeToLiveSpecification={'Enabled': True,
+                                         'AttributeName': time_to_live['AttributeName']}
+            )
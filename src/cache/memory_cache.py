@@ -0,0 +1,116 @@
+"""
+Memory Cache Module
+
+This module implements the in-memory cache for storing processed
+requests and their results.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """
+    In-memory cache for storing processed requests and their results.
+    
+    Entries expire after their time-to-live, and the least recently used
+    entries are evicted once the cache holds max_entries entries.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        """
+        Initialize the memory cache.
+        
+        Args:
+            max_entries: Maximum number of entries held in the cache
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a value from the cache.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value or None if not found or expired
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        
+        # Check if the entry has expired
+        value, expiry = entry
+        if time.monotonic() >= expiry:
+            logger.debug("Cache entry expired for key: %s", key)
+            del self.entries[key]
+            return None
+        
+        # Mark the entry as the most recently used
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int = 3600) -> None:
+        """
+        Set a value in the cache.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds
+        """
+        # Store the value with its expiry time as the most recently used entry
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        
+        # Evict the least recently used entries beyond the size limit
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several values from the cache.
+        
+        Args:
+            keys: Cache keys
+            
+        Returns:
+            Dictionary of cached values by key, for the keys that were found
+        """
+        results = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                results[key] = value
+        
+        return results
+
+    def set_many(self, items: Dict[str, Dict[str, Any]], ttl: int = 3600) -> None:
+        """
+        Set several values in the cache.
+        
+        Args:
+            items: Values to cache by key
+            ttl: Time-to-live in seconds
+        """
+        for key, value in items.items():
+            self.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        """
+        Delete a value from the cache.
+        
+        Args:
+            key: Cache key
+        """
+        self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Clear all entries from the cache."""
+        self.entries.clear()
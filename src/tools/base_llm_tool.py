@@ -0,0 +1,1126 @@
+"""
+Base LLM Tool Module
+
+This module implements the base class of the tools that analyze text data
+with structured LLM queries.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import string
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+
+import orjson
+
+from .semantic_cache import SemanticCache
+from ..cache.memory_cache import MemoryCache
+from ..utils.dynamic_batcher import DynamicBatcher
+from ..utils.json_stream import JsonObjectStream
+from ..utils.llm_batch import run_anthropic_batch, run_openai_batch
+from ..utils.llm_client import (
+    close_async_clients, create_async_bedrock_client, create_async_llm_client, get_llm_client,
+    read_tool_use_input, stream_bedrock_text, supports_structured_outputs
+)
+
+logger = logging.getLogger(__name__)
+
+# Number of responses kept for repeated texts, and how long they are reused in seconds
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL = 3600
+
+# Maximum number of texts analyzed in one LLM call, and how long in seconds
+# concurrent calls wait for more texts to analyze with them
+BATCH_MAX_SIZE = 16
+BATCH_MAX_LATENCY = 0.05
+
+# Default models, by provider, all of which accept the JSON response format
+# that the original gpt-4 snapshots reject
+DEFAULT_MODELS = {
+    'openai': 'gpt-4o',
+    'anthropic': 'claude-3-opus-20240229',
+    'bedrock': 'anthropic.claude-3-sonnet-20240229',
+    'groq': 'llama3-70b-8192'
+}
+
+# Approximate number of characters per token, used to estimate the token
+# count of texts
+CHARS_PER_TOKEN = 4
+
+# Approximate token count beyond which texts are truncated before analysis,
+# bounding the prompt size of very long texts
+MAX_TEXT_TOKENS = 2000
+
+# Approximate token count below which texts are analyzed with the lighter
+# model of the provider when cascading is enabled
+CASCADE_MAX_TOKENS = 200
+
+# Lighter models used for short texts, by provider
+LIGHT_MODELS = {
+    'openai': 'gpt-4o-mini',
+    'anthropic': 'claude-3-haiku-20240307',
+    'bedrock': 'anthropic.claude-3-haiku-20240307-v1:0',
+    'groq': 'llama3-8b-8192'
+}
+
+# Providers that can be raced against the configured one, which need an
+# asynchronous client
+RACE_PROVIDERS = ('openai', 'anthropic', 'groq')
+
+# Pattern matching texts made only of whitespace and punctuation
+PUNCTUATION_ONLY_PATTERN = re.compile(f'[\\s{re.escape(string.punctuation)}]*')
+
+# Maximum number of tokens generated for one LLM call, however many texts it analyzes
+MAX_OUTPUT_TOKENS = 4096
+
+# Delimiter closing the text of a single-text prompt
+TEXT_DELIMITER = '"""'
+
+# Response format forcing OpenAI and Groq models to return a JSON object
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+
+def create_batch_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Create the JSON schema of the results of several numbered texts.
+    
+    Args:
+        schema: JSON schema of the result of one text
+        
+    Returns:
+        JSON schema of a results array holding the result of each text, in order
+    """
+    return {
+        "type": "object",
+        "properties": {"results": {"type": "array", "items": schema}},
+        "required": ["results"],
+        "additionalProperties": False
+    }
+
+
+def cached_system_message(system_prompt: str) -> List[Dict[str, Any]]:
+    """
+    Build the system message for Anthropic models, marked for prompt caching.
+    
+    Calls sharing the system message reuse its processed prefix.
+    
+    Args:
+        system_prompt: Text of the system message
+        
+    Returns:
+        System message content blocks
+    """
+    return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+
+class BaseLLMTool(ABC):
+    """
+    Base class of the tools analyzing text data with structured LLM queries.
+    
+    Subclasses describe their result with the class attributes below and
+    build the prompts for one text and for several numbered texts. The base
+    class queries the providers, batches concurrent calls, reuses responses
+    for repeated texts, and analyzes short texts with a lighter model.
+    Subclasses whose result has a JSON schema constrain the responses to it.
+    """
+    
+    # Name of the analysis in log and error messages
+    task_name = 'text analysis'
+    
+    # Name of the result, naming the tool and JSON schema response formats
+    # built from the schema of the result
+    result_name = 'result'
+    
+    # System message describing the result format, as text and for Anthropic models
+    system_prompt = ''
+    cached_system: List[Dict[str, Any]] = []
+    
+    # Tool forcing Anthropic models to return the result as structured input
+    result_tool: Dict[str, Any] = {}
+    result_tool_choice: Dict[str, Any] = {}
+    
+    # JSON schemas of the result of one text and of several numbered texts,
+    # sent to the models with structured outputs
+    result_schema: Optional[Dict[str, Any]] = None
+    batch_result_schema: Optional[Dict[str, Any]] = None
+    
+    # Maximum number of tokens generated for the result of one text
+    result_max_tokens = 1000
+
+    def __init__(self, provider: str = 'openai', model: str = None,
+                 api_key: str = None, **kwargs):
+        """
+        Initialize the tool.
+        
+        Args:
+            provider: LLM provider ('openai', 'anthropic', 'bedrock', or 'groq')
+            model: Model name to use
+            api_key: API key for the provider
+            **kwargs: Additional configuration options
+        """
+        self.provider = provider.lower()
+        self.model = model or DEFAULT_MODELS.get(self.provider)
+        self.api_key = api_key
+        
+        # Whether short texts are analyzed with a lighter model, by default only
+        # when no model was chosen explicitly
+        self.cascade = kwargs.get('cascade', model is None)
+        
+        # Number of characters of a text sent to the LLM
+        self.max_text_length = kwargs.get('max_text_tokens', MAX_TEXT_TOKENS) * CHARS_PER_TOKEN
+        
+        # Whether execute_async queries the LLM with an asynchronous client
+        self.async_mode = kwargs.get('async_mode', False)
+        self._async_clients = {}
+        
+        # Provider queried at the same time as the configured one in async mode,
+        # taking the first successful response
+        self.race_provider = (kwargs.get('race_provider') or '').lower() or None
+        if self.race_provider and self.race_provider not in RACE_PROVIDERS:
+            raise ValueError(f"Unsupported race provider: {self.race_provider}")
+        self.race_model = kwargs.get('race_model') or DEFAULT_MODELS.get(self.race_provider)
+        self.race_api_key = kwargs.get('race_api_key')
+        
+        # Initialize the client based on the provider
+        self._initialize_client()
+        
+        # Batcher analyzing texts submitted concurrently in one LLM call
+        self._batcher = DynamicBatcher(
+            self._analyze_texts,
+            max_batch_size=kwargs.get('max_batch_size', BATCH_MAX_SIZE),
+            max_latency=kwargs.get('max_batch_latency', BATCH_MAX_LATENCY)
+        )
+        
+        # Cache of the responses for texts that were already analyzed
+        self._response_cache = MemoryCache(
+            max_entries=kwargs.get('response_cache_size', RESPONSE_CACHE_SIZE)
+        )
+        self._response_cache_lock = threading.Lock()
+        
+        # Cache reusing the result of a near-duplicate text, enabled by giving the
+        # minimum similarity of a near-duplicate
+        threshold = kwargs.get('semantic_cache_threshold')
+        self._semantic_cache = SemanticCache(threshold=threshold) if threshold else None
+
+    def _initialize_client(self):
+        """Get the shared LLM client for the provider."""
+        self.client = get_llm_client(self.provider, self.api_key)
+
+    def _initialize_result_format(self):
+        """
+        Constrain the results to the JSON schema of the tool.
+        
+        Subclasses providing a schema call this once their settings are set,
+        as the schema may depend on them. Anthropic models get a tool taking
+        the result of one text or the results of several numbered texts, and
+        the models with structured outputs get the schemas as their response
+        formats.
+        """
+        schema = self._create_schema()
+        if schema is None:
+            return
+        
+        self.result_schema = schema
+        self.batch_result_schema = create_batch_schema(schema)
+        
+        self.result_tool = {
+            "name": f"record_{self.result_name}",
+            "description": f"Record the {self.result_name} of the text, "
+                           "or the results of each numbered text.",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    **schema["properties"],
+                    "results": {"type": "array", "items": schema}
+                }
+            }
+        }
+        self.result_tool_choice = {"type": "tool", "name": self.result_tool["name"]}
+
+    def _create_schema(self) -> Optional[Dict[str, Any]]:
+        """
+        Create the JSON schema the result of one text is constrained to.
+        
+        Returns:
+            JSON schema of the result, or None if the responses are only
+            asked to be JSON objects
+        """
+        return None
+
+    def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute the tool on the input data.
+        
+        Args:
+            input_data: Dictionary containing the input data
+            
+        Returns:
+            Dictionary containing the analysis results
+        """
+        # Extract the text to analyze
+        text = input_data.get('feedback_text', '')
+        
+        if not text:
+            logger.warning(f"No text provided for {self.task_name}")
+            return {'error': f'No text provided for {self.task_name}'}
+        
+        text = self._truncate(text)
+        
+        # Reuse the result of a trivial, repeated, or near-duplicate text
+        cache_key = self._response_cache_key(text)
+        known_result = self._known_result(text, cache_key)
+        if known_result is not None:
+            return known_result
+        
+        # Query the LLM, together with concurrent calls for other texts
+        result = self._batcher.submit(text)
+        
+        self._cache_response(text, cache_key, result)
+        return result
+
+    async def execute_async(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute the tool without blocking the event loop.
+        
+        With async_mode, the LLM is queried with an asynchronous client so
+        concurrent calls share the event loop. Otherwise execute runs on a
+        worker thread, where concurrent calls are batched.
+        
+        Args:
+            input_data: Dictionary containing the input data
+            
+        Returns:
+            Dictionary containing the analysis results
+        """
+        if not self.async_mode:
+            return await asyncio.to_thread(self.execute, input_data)
+        
+        # Extract the text to analyze
+        text = input_data.get('feedback_text', '')
+        
+        if not text:
+            logger.warning(f"No text provided for {self.task_name}")
+            return {'error': f'No text provided for {self.task_name}'}
+        
+        text = self._truncate(text)
+        
+        # Reuse the result of a trivial, repeated, or near-duplicate text
+        cache_key = self._response_cache_key(text)
+        known_result = self._known_result(text, cache_key)
+        if known_result is not None:
+            return known_result
+        
+        # Query the LLM
+        result = await self._query_llm_async(self._create_prompt(text), self._select_model([text]))
+        
+        self._cache_response(text, cache_key, result)
+        return result
+
+    async def execute_stream(self, input_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the tool, yielding partial results as they are generated.
+        
+        The response is streamed from the LLM and a copy of the result so far
+        is yielded each time a field, or an item of a list field, is
+        complete. The last result yielded is the complete one.
+        
+        Args:
+            input_data: Dictionary containing the input data
+        
+        Yields:
+            Dictionaries containing the analysis results so far
+        """
+        # Extract the text to analyze
+        text = input_data.get('feedback_text', '')
+        
+        if not text:
+            logger.warning(f"No text provided for {self.task_name}")
+            yield {'error': f'No text provided for {self.task_name}'}
+            return
+        
+        text = self._truncate(text)
+        
+        # Reuse the result of a trivial, repeated, or near-duplicate text
+        cache_key = self._response_cache_key(text)
+        known_result = self._known_result(text, cache_key)
+        if known_result is not None:
+            yield known_result
+            return
+        
+        stream = JsonObjectStream()
+        chunks = []
+        partial = {}
+        
+        try:
+            prompt = self._create_prompt(text)
+            async for chunk in self._stream_llm_text(prompt, self._select_model([text])):
+                chunks.append(chunk)
+                for event, key, value in stream.feed(chunk):
+                    if event == 'item':
+                        partial[key] = [*partial.get(key, []), value]
+                    elif isinstance(value, list) and key in partial:
+                        # The items of the list were already yielded
+                        continue
+                    else:
+                        partial[key] = value
+                    yield dict(partial)
+        
+        except Exception as e:
+            logger.error(f"Error streaming LLM {self.task_name}: {str(e)}")
+            yield self._error_result(e)
+            return
+        
+        # Parse the whole response if it held no complete object, and yield the
+        # final result if it differs from the last partial one
+        response = partial if stream.done else ''.join(chunks)
+        result = self._finish_result(self._parse_result(response))
+        if result != partial:
+            yield result
+        
+        self._cache_response(text, cache_key, result)
+
+    def execute_many(self, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Execute the tool on several inputs, analyzing their texts with shared prompts.
+        
+        Up to max_batch_size texts are analyzed with one LLM call, so the
+        system message is paid for once per call rather than once per text.
+        
+        Args:
+            inputs: Input data for each execution
+            
+        Returns:
+            Dictionary containing the analysis results of each input, in the same order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(inputs)
+        
+        # Collect the texts to analyze, with the position of their input
+        rows = []
+        for index, input_data in enumerate(inputs):
+            text = input_data.get('feedback_text', '')
+            if not text:
+                results[index] = {'error': f'No text provided for {self.task_name}'}
+                continue
+            
+            text = self._truncate(text)
+            cache_key = self._response_cache_key(text)
+            results[index] = self._known_result(text, cache_key)
+            if results[index] is None:
+                rows.append((index, text, cache_key))
+        
+        batch_size = self._batcher.max_batch_size
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            chunk_results = self._analyze_texts([text for _, text, _ in chunk])
+            for (index, text, cache_key), result in zip(chunk, chunk_results):
+                self._cache_response(text, cache_key, result)
+                results[index] = result
+        
+        return results
+
+    def batch_execute(self, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Execute the tool on many inputs through the batch API of the provider.
+        
+        OpenAI and Anthropic process batches at half the cost of individual
+        requests and outside their rate limits, but may take up to a day, so
+        this suits large offline jobs. Inputs for other providers are
+        processed one request at a time.
+        
+        Args:
+            inputs: Input data for each execution
+            
+        Returns:
+            Dictionary containing the analysis results of each input, in the same order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(inputs)
+        
+        # Create the prompts and select their models, by custom ID
+        requests = {}
+        for index, input_data in enumerate(inputs):
+            text = input_data.get('feedback_text', '')
+            if text:
+                text = self._truncate(text)
+                requests[str(index)] = (self._create_prompt(text), self._select_model([text]))
+            else:
+                results[index] = {'error': f'No text provided for {self.task_name}'}
+        
+        if not requests:
+            return results
+        
+        max_tokens = self._max_tokens(1)
+        try:
+            if self.provider == 'openai':
+                outputs = run_openai_batch(self.client, {
+                    custom_id: {
+                        "model": model,
+                        "messages": [{"role": "system", "content": self.system_prompt},
+                                     {"role": "user", "content": prompt}],
+                        "max_tokens": max_tokens,
+                        "temperature": 0.1,
+                        "response_format": self._response_format(self.provider, model)
+                    }
+                    for custom_id, (prompt, model) in requests.items()
+                })
+            
+            elif self.provider == 'anthropic':
+                outputs = run_anthropic_batch(self.client, {
+                    custom_id: {
+                        "model": model,
+                        "max_tokens": max_tokens,
+                        "temperature": 0.1,
+                        "system": self.cached_system,
+                        "messages": [{"role": "user", "content": prompt}],
+                        "tools": [self.result_tool],
+                        "tool_choice": self.result_tool_choice
+                    }
+                    for custom_id, (prompt, model) in requests.items()
+                })
+                outputs = {
+                    custom_id: (output if isinstance(output, Exception)
+                                else read_tool_use_input(output))
+                    for custom_id, output in outputs.items()
+                }
+            
+            else:
+                for custom_id, (prompt, model) in requests.items():
+                    results[int(custom_id)] = self._query_llm(prompt, model)
+                return results
+        
+        except Exception as e:
+            logger.error(f"Error running {self.task_name} batch: {str(e)}")
+            outputs = {custom_id: e for custom_id in requests}
+        
+        for custom_id, output in outputs.items():
+            if isinstance(output, Exception):
+                results[int(custom_id)] = self._error_result(output)
+            else:
+                results[int(custom_id)] = self._finish_result(self._parse_result(output))
+        
+        return results
+
+    def _truncate(self, text: str) -> str:
+        """
+        Truncate a text to the maximum length sent to the LLM.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            The text, or its beginning if it is too long
+        """
+        if len(text) > self.max_text_length:
+            logger.info(f"Truncating text of {len(text)} characters for {self.task_name}")
+            return text[:self.max_text_length]
+        
+        return text
+
+    def _direct_result(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the result for a text that can be analyzed without the LLM.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            Result for a trivial text, or None if the LLM has to be queried
+        """
+        return None
+
+    def _known_result(self, text: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the result for a text without querying the LLM.
+        
+        Args:
+            text: Text to analyze
+            cache_key: Response cache key of the text
+            
+        Returns:
+            Result of a trivial text, of the same text, or of a near-duplicate
+            text, or None if the LLM has to be queried
+        """
+        # Answer trivial texts without querying the LLM
+        direct_result = self._direct_result(text)
+        if direct_result is not None:
+            return direct_result
+        
+        # Return the response for the same text if it was already analyzed
+        cached_result = self._get_cached_response(cache_key)
+        if cached_result is not None:
+            return cached_result
+        
+        # Reuse the result for a near-duplicate of a text that was already analyzed
+        if self._semantic_cache is not None:
+            return self._semantic_cache.get(text)
+        
+        return None
+
+    def _response_cache_key(self, text: str) -> str:
+        """
+        Get the response cache key for a text.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            Key identifying the text and the settings that affect the response
+        """
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+        return ':'.join(map(str, (*self._response_settings(), digest)))
+
+    def _response_settings(self) -> Tuple[Any, ...]:
+        """
+        Get the settings that affect the response for a text.
+        
+        Returns:
+            Settings included in the response cache keys
+        """
+        return self.provider, self.model
+
+    def _get_cached_response(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the response for a text that was already analyzed.
+        
+        Args:
+            cache_key: Response cache key of the text
+            
+        Returns:
+            Cached response, or None if the text was not analyzed recently
+        """
+        with self._response_cache_lock:
+            return self._response_cache.get(cache_key)
+
+    def _cache_response(self, text: str, cache_key: str, result: Dict[str, Any]) -> None:
+        """
+        Remember a successful response for repeated and near-duplicate texts.
+        
+        Args:
+            text: Text that was analyzed
+            cache_key: Response cache key of the text
+            result: Analysis results for the text
+        """
+        if 'error' not in result:
+            with self._response_cache_lock:
+                self._response_cache.set(cache_key, result, RESPONSE_CACHE_TTL)
+            
+            if self._semantic_cache is not None:
+                self._semantic_cache.set(text, result)
+
+    def _select_model(self, texts: List[str]) -> str:
+        """
+        Select the model to analyze texts with.
+        
+        With cascading, texts that are all short are analyzed with the lighter
+        model of the provider, and longer texts with the configured model.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            Model name
+        """
+        if self.cascade and self.provider in LIGHT_MODELS:
+            if all(len(text) // CHARS_PER_TOKEN < CASCADE_MAX_TOKENS for text in texts):
+                return LIGHT_MODELS[self.provider]
+        
+        return self.model
+
+    def _max_tokens(self, text_count: int) -> int:
+        """
+        Get the maximum number of tokens to generate for the results of several texts.
+        
+        Args:
+            text_count: Number of texts analyzed in the LLM call
+            
+        Returns:
+            Maximum number of tokens to generate
+        """
+        return min(self.result_max_tokens * text_count, MAX_OUTPUT_TOKENS)
+
+    def _analyze_texts(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Query the LLM for the analysis of several texts.
+        
+        Several texts are analyzed with one prompt. If the response does not
+        hold one result per text, each text is analyzed separately.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            List of analysis results, in the same order as the texts
+        """
+        if len(texts) > 1:
+            batch_data = self._query_llm(self._create_batch_prompt(texts),
+                                         self._select_model(texts),
+                                         self._max_tokens(len(texts)), batch=True)
+            # Accept a bare list of results as well as the requested object holding them
+            results = batch_data.get('results') if isinstance(batch_data, dict) else batch_data
+            if (isinstance(results, list) and len(results) == len(texts)
+                    and all(isinstance(result, dict) for result in results)):
+                return [self._finish_result(result) for result in results]
+            
+            logger.warning(f"Batched {self.task_name} result did not match the texts, "
+                           "analyzing them separately")
+        
+        return [self._query_llm(self._create_prompt(text), self._select_model([text]))
+                for text in texts]
+
+    @abstractmethod
+    def _create_prompt(self, text: str) -> str:
+        """
+        Create the prompt for one text.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            Prompt for the LLM
+        """
+
+    @abstractmethod
+    def _create_batch_prompt(self, texts: List[str]) -> str:
+        """
+        Create the prompt for several texts, asking for one result per text.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            Prompt for the LLM
+        """
+
+    def _query_llm(self, prompt: str, model: Optional[str] = None,
+                   max_tokens: Optional[int] = None, batch: bool = False) -> Dict[str, Any]:
+        """
+        Query the LLM for the analysis.
+        
+        Args:
+            prompt: Prompt for the LLM
+            model: Model to query, or None for the configured model
+            max_tokens: Maximum number of tokens to generate, or None for the
+                result of one text
+            batch: Whether the prompt holds several numbered texts
+            
+        Returns:
+            Dictionary containing the analysis results, holding a list of them
+            for several texts
+        """
+        model = model or self.model
+        max_tokens = max_tokens or self._max_tokens(1)
+        
+        try:
+            result = self._parse_result(self._request(prompt, model, max_tokens, batch))
+        
+        except Exception as e:
+            logger.error(f"Error querying LLM for {self.task_name}: {str(e)}")
+            return self._error_result(e)
+        
+        return result if batch else self._finish_result(result)
+
+    def _request(self, prompt: str, model: str, max_tokens: int, batch: bool = False) -> Any:
+        """
+        Send the query to the configured provider.
+        
+        Args:
+            prompt: Prompt for the LLM
+            model: Model to query
+            max_tokens: Maximum number of tokens to generate
+            batch: Whether the prompt holds several numbered texts
+            
+        Returns:
+            JSON text response from the LLM, or the parsed input of a tool use
+        """
+        if self.provider == 'openai':
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "system", "content": self.system_prompt},
+                          {"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=0.1,
+                response_format=self._response_format(self.provider, model, batch)
+            )
+            result = response.choices[0].message.content
+        
+        elif self.provider == 'anthropic':
+            response = self.client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=0.1,
+                system=self.cached_system,
+                messages=[{"role": "user", "content": prompt}],
+                tools=[self.result_tool],
+                tool_choice=self.result_tool_choice
+            )
+            result = read_tool_use_input(response.content)
+            if result is None:
+                result = response.content[0].text
+        
+        elif self.provider == 'bedrock':
+            response = self.client.invoke_model(
+                modelId=model,
+                body=orjson.dumps(self._bedrock_payload(prompt, model, max_tokens))
+            )
+            result = self._read_bedrock_result(model, orjson.loads(response['body'].read()))
+        
+        elif self.provider == 'groq':
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "system", "content": self.system_prompt},
+                          {"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=0.1,
+                response_format=self._response_format(self.provider, model, batch)
+            )
+            result = response.choices[0].message.content
+        
+        return result
+
+    def _response_format(self, provider: str, model: str, batch: bool = False) -> Dict[str, Any]:
+        """
+        Get the response format of an OpenAI or Groq query.
+        
+        Args:
+            provider: Provider to query
+            model: Model to query
+            batch: Whether the prompt holds several numbered texts
+            
+        Returns:
+            JSON schema response format for the models with structured
+            outputs, or the JSON object response format otherwise
+        """
+        schema = self.batch_result_schema if batch else self.result_schema
+        if schema is None or not supports_structured_outputs(provider, model):
+            return JSON_RESPONSE_FORMAT
+        
+        name = f"{self.result_name}_results" if batch else self.result_name
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": name, "schema": schema, "strict": True}
+        }
+
+    def _bedrock_payload(self, prompt: str, model: str, max_tokens: int) -> Dict[str, Any]:
+        """
+        Create the request body of a Bedrock query.
+        
+        Args:
+            prompt: Prompt for the LLM
+            model: Model to query
+            max_tokens: Maximum number of tokens to generate
+            
+        Returns:
+            Request body for the model
+        """
+        # For Bedrock, we need to format the request based on the model
+        if 'claude' in model:
+            # Claude model format
+            return {
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": max_tokens,
+                "temperature": 0.1,
+                "system": self.cached_system,
+                "messages": [{"role": "user", "content": prompt}],
+                "tools": [self.result_tool],
+                "tool_choice": self.result_tool_choice
+            }
+        
+        # Generic format - would need to be adjusted for specific models
+        return {
+            "prompt": f"{self.system_prompt}\n\n{prompt}",
+            "max_tokens": max_tokens,
+            "temperature": 0.1
+        }
+
+    def _read_bedrock_result(self, model: str, response_body: Dict[str, Any]) -> Any:
+        """
+        Read the result from the body of a Bedrock response.
+        
+        Args:
+            model: Model that was queried
+            response_body: Parsed body of the response
+            
+        Returns:
+            Input of the tool use for Claude models, or the JSON text response
+        """
+        # Extract the result based on the model
+        if 'claude' in model:
+            result = read_tool_use_input(response_body['content'])
+            if result is None:
+                result = response_body['content'][0]['text']
+            return result
+        
+        # Generic extraction - would need to be adjusted for specific models
+        return response_body.get('completion', '')
+
+    async def _query_llm_async(self, prompt: str, model: Optional[str] = None,
+                               max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Query the LLM for the analysis with an asynchronous client.
+        
+        With a race provider, the query is also sent to that provider and the
+        first successful response is used, so a slow or failing provider does
+        not hold up the analysis.
+        
+        Args:
+            prompt: Prompt for the LLM
+            model: Model to query, or None for the configured model
+            max_tokens: Maximum number of tokens to generate, or None for the
+                result of one text
+                
+        Returns:
+            Dictionary containing the analysis results
+        """
+        model = model or self.model
+        max_tokens = max_tokens or self._max_tokens(1)
+        
+        try:
+            if self.race_provider:
+                result = await self._race_requests(prompt, model, max_tokens)
+            else:
+                result = await self._request_async(self.provider, prompt, model, max_tokens)
+            result = self._parse_result(result)
+        
+        except Exception as e:
+            logger.error(f"Error querying LLM for {self.task_name}: {str(e)}")
+            return self._error_result(e)
+        
+        return self._finish_result(result)
+
+    async def _race_requests(self, prompt: str, model: str, max_tokens: int) -> Any:
+        """
+        Send the query to the configured and the race provider at once.
+        
+        The slower request is cancelled as soon as one succeeds.
+        
+        Args:
+            prompt: Prompt for the LLM
+            model: Model to query on the configured provider
+            max_tokens: Maximum number of tokens to generate
+            
+        Returns:
+            First successful response
+            
+        Raises:
+            Exception: The error of the configured provider if both requests failed
+        """
+        tasks = [
+            asyncio.create_task(self._request_async(self.provider, prompt, model, max_tokens)),
+            asyncio.create_task(
+                self._request_async(self.race_provider, prompt, self.race_model, max_tokens)
+            )
+        ]
+        
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            
+            raise tasks[0].exception()
+        
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _request_async(self, provider: str, prompt: str, model: str, max_tokens: int) -> Any:
+        """
+        Send the query to a provider with an asynchronous client.
+        
+        Args:
+            provider: Provider to query
+            prompt: Prompt for the LLM
+            model: Model to query
+            max_tokens: Maximum number of tokens to generate
+            
+        Returns:
+            JSON text response from the LLM, or the parsed input of a tool use
+        """
+        client = await self._get_async_client(provider)
+        if client is None:
+            # Without aioboto3, Bedrock has no asynchronous client, so the
+            # request runs on a worker thread
+            return await asyncio.to_thread(self._request, prompt, model, max_tokens)
+        
+        if provider == 'bedrock':
+            response = await client.invoke_model(
+                modelId=model,
+                body=orjson.dumps(self._bedrock_payload(prompt, model, max_tokens))
+            )
+            result = self._read_bedrock_result(model, orjson.loads(await response['body'].read()))
+        
+        elif provider == 'anthropic':
+            response = await client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=0.1,
+                system=self.cached_system,
+                messages=[{"role": "user", "content": prompt}],
+                tools=[self.result_tool],
+                tool_choice=self.result_tool_choice
+            )
+            result = read_tool_use_input(response.content)
+            if result is None:
+                result = response.content[0].text
+        
+        else:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[{"role": "system", "content": self.system_prompt},
+                          {"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=0.1,
+                response_format=self._response_format(provider, model)
+            )
+            result = response.choices[0].message.content
+        
+        return result
+
+    async def _stream_llm_text(self, prompt: str, model: str) -> AsyncIterator[str]:
+        """
+        Stream the text of the LLM response with an asynchronous client.
+        
+        Args:
+            prompt: Prompt for the LLM
+            model: Model to query
+        
+        Yields:
+            Chunks of the response text, or of the input of the tool use
+        """
+        max_tokens = self._max_tokens(1)
+        
+        if self.provider == 'bedrock':
+            payload = self._bedrock_payload(prompt, model, max_tokens)
+            async for text in stream_bedrock_text(self.client, model, payload):
+                yield text
+            return
+        
+        client = await self._get_async_client(self.provider)
+        if self.provider == 'anthropic':
+            async with client.messages.stream(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=0.1,
+                system=self.cached_system,
+                messages=[{"role": "user", "content": prompt}],
+                tools=[self.result_tool],
+                tool_choice=self.result_tool_choice
+            ) as response:
+                # The result streams as the partial JSON input of the tool use
+                async for event in response:
+                    if event.type == 'input_json' and event.partial_json:
+                        yield event.partial_json
+        
+        else:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[{"role": "system", "content": self.system_prompt},
+                          {"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=0.1,
+                response_format=self._response_format(self.provider, model),
+                stream=True
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def _get_async_client(self, provider: str) -> Optional[Any]:
+        """
+        Get the asynchronous client of a provider for the running event loop.
+        
+        The client of another event loop is closed when it is replaced.
+        
+        Args:
+            provider: Provider of the client
+            
+        Returns:
+            Asynchronous client, or None if the provider has none
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(provider)
+        if entry is None or entry[0] is not loop:
+            if provider == 'bedrock':
+                client = await create_async_bedrock_client()
+                
+                # Keep the client of a concurrent call that finished creating one first
+                current = self._async_clients.get(provider)
+                if current is not None and current[0] is loop:
+                    if client is not None:
+                        await client.close()
+                    return current[1]
+            else:
+                api_key = self.api_key if provider == self.provider else self.race_api_key
+                client = create_async_llm_client(provider, api_key)
+            
+            self._async_clients[provider] = (loop, client)
+            if entry is not None:
+                await close_async_clients([entry])
+        
+        return self._async_clients[provider][1]
+
+    async def aclose(self) -> None:
+        """
+        Close the asynchronous clients of the tool.
+        
+        Their connections are bound to the event loop they were created for,
+        so this has to be awaited before that loop ends. The tool stays
+        usable and creates new clients when queried again.
+        """
+        entries = list(self._async_clients.values())
+        self._async_clients.clear()
+        await close_async_clients(entries)
+
+    def _parse_result(self, result: Any) -> Dict[str, Any]:
+        """
+        Parse the analysis result returned by the LLM.
+        
+        Args:
+            result: JSON text response from the LLM, or the already parsed
+                input of a tool use
+                
+        Returns:
+            Dictionary containing the analysis results
+        """
+        if isinstance(result, dict):
+            return result
+        
+        if result is None:
+            message = f"{self.task_name.capitalize()} response holds no result"
+            logger.warning(message)
+            return self._error_result(ValueError(message))
+        
+        try:
+            return orjson.loads(result)
+        
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Failed to parse {self.task_name} result as JSON")
+            return self._error_result(e)
+
+    def _finish_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Adapt the parsed result of one text to the result of the tool.
+        
+        Args:
+            result: Result of one text, as returned by the LLM
+            
+        Returns:
+            Dictionary containing the analysis results
+        """
+        return result
+
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """
+        Build the analysis result for a failed query.
+        
+        Args:
+            error: Error raised by the query
+            
+        Returns:
+            Dictionary containing the error
+        """
+        return {'error': str(error)}
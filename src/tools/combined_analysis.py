@@ -0,0 +1,211 @@
+"""
+Combined Analysis Tool Module
+
+This module implements the combined analysis tool that extracts keywords
+from text data and analyzes its sentiment with a single LLM query.
+"""
+
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from .base_llm_tool import (
+    BaseLLMTool, PUNCTUATION_ONLY_PATTERN, TEXT_DELIMITER, cached_system_message
+)
+from .keyword_contextualization import KEYWORD_BASE_TOKENS, KEYWORDS_SCHEMA, TOKENS_PER_KEYWORD
+from .sentiment_analysis import NO_WORDS_SENTIMENT, SENTIMENT_MAX_TOKENS, SENTIMENT_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+# Tool types whose results the combined analysis provides together
+COMBINED_TOOL_TYPES = ('keyword_contextualization', 'sentiment_analysis')
+
+# System message for the combined analysis, describing the result format once
+COMBINED_SYSTEM_PROMPT = (
+    'You are a text analysis assistant. Respond with JSON only. A result has the form '
+    '{"keywords": [{"keyword": "delivery delay", "relevance": 0.9, '
+    '"context": "The customer mentioned late delivery."}], '
+    '"sentiment": {"overall_sentiment": "positive", '
+    '"scores": {"positive": 0.8, "negative": 0.1, "neutral": 0.1}, '
+    '"explanation": "Satisfied with the product, but mentions a minor issue."}}, '
+    'where relevance is between 0.0 and 1.0, context briefly explains why the keyword '
+    'is relevant, overall_sentiment is positive, negative, or neutral, and the scores '
+    'add up to 1.0.'
+)
+
+# System message for Anthropic models, marked for prompt caching
+COMBINED_CACHED_SYSTEM = cached_system_message(COMBINED_SYSTEM_PROMPT)
+
+# Prompts for the analysis of one text and of several numbered texts, formatted
+# with the number of keywords once per tool and followed by the texts
+COMBINED_PROMPT_PREFIX = (
+    'Extract at most {max_keywords} keywords from the text and analyze its sentiment.\nText: """'
+)
+BATCH_COMBINED_PROMPT_PREFIX = (
+    'Extract at most {max_keywords} keywords from each numbered text and analyze its sentiment. '
+    'Respond with {{"results": [...]}} holding one result per text, in order.\nTexts:\n'
+)
+
+# Schema of the combined analysis of a text
+COMBINED_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "keywords": KEYWORDS_SCHEMA["properties"]["keywords"],
+        "sentiment": SENTIMENT_SCHEMA
+    },
+    "required": ["keywords", "sentiment"]
+}
+
+# Tool forcing Anthropic models to return the analysis of a text, or the
+# results of several numbered texts, as structured input
+COMBINED_TOOL = {
+    "name": "record_analysis",
+    "description": ("Record the keywords and sentiment of the text, "
+                    "or the results of each numbered text."),
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            **COMBINED_SCHEMA["properties"],
+            "results": {"type": "array", "items": COMBINED_SCHEMA}
+        }
+    }
+}
+COMBINED_TOOL_CHOICE = {"type": "tool", "name": "record_analysis"}
+
+
+def split_combined_result(result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Split a combined analysis result into the results of the separate tools.
+    
+    Args:
+        result: Combined analysis result
+        
+    Returns:
+        Keyword contextualization and sentiment analysis results, by tool type
+    """
+    keyword_result = {'keywords': result.get('keywords', [])}
+    sentiment_result = dict(result.get('sentiment') or {})
+    
+    # Report a failed query in both results
+    if 'error' in result:
+        keyword_result['error'] = result['error']
+        sentiment_result['error'] = result['error']
+    
+    return {
+        'keyword_contextualization': keyword_result,
+        'sentiment_analysis': sentiment_result
+    }
+
+
+class CombinedAnalysisTool(BaseLLMTool):
+    """
+    Tool for extracting keywords and analyzing sentiment in text data at once.
+    
+    This tool asks the LLM for the results of the keyword contextualization
+    and sentiment analysis tools in one response, so a text that needs both
+    costs a single round trip and a single prompt.
+    """
+    
+    task_name = 'combined analysis'
+    system_prompt = COMBINED_SYSTEM_PROMPT
+    cached_system = COMBINED_CACHED_SYSTEM
+    result_tool = COMBINED_TOOL
+    result_tool_choice = COMBINED_TOOL_CHOICE
+
+    def __init__(self, provider: str = 'openai', model: str = None,
+                 api_key: str = None, **kwargs):
+        """
+        Initialize the combined analysis tool.
+        
+        Args:
+            provider: LLM provider ('openai', 'anthropic', 'bedrock', or 'groq')
+            model: Model name to use
+            api_key: API key for the provider
+            **kwargs: Additional configuration options
+        """
+        super().__init__(provider=provider, model=model, api_key=api_key, **kwargs)
+        
+        # Set the maximum number of keywords to extract
+        self.max_keywords = kwargs.get('max_keywords', 10)
+        
+        # Maximum number of tokens generated for the keywords and sentiment of a text
+        self.result_max_tokens = (KEYWORD_BASE_TOKENS + self.max_keywords * TOKENS_PER_KEYWORD
+                                  + SENTIMENT_MAX_TOKENS)
+        
+        # Prompt prefixes with the number of keywords filled in
+        self._prompt_prefix = COMBINED_PROMPT_PREFIX.format(max_keywords=self.max_keywords)
+        self._batch_prompt_prefix = BATCH_COMBINED_PROMPT_PREFIX.format(
+            max_keywords=self.max_keywords)
+
+    def _direct_result(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the analysis of a text made only of punctuation without the LLM.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            Empty keywords and neutral sentiment for a text without words, or
+            None otherwise
+        """
+        if PUNCTUATION_ONLY_PATTERN.fullmatch(text):
+            return {'keywords': [], 'sentiment': dict(NO_WORDS_SENTIMENT)}
+        
+        return None
+
+    def _response_settings(self) -> Tuple[Any, ...]:
+        """
+        Get the settings that affect the response for a text.
+        
+        Returns:
+            Settings included in the response cache keys
+        """
+        return self.provider, self.model, self.max_keywords
+
+    def _create_prompt(self, text: str) -> str:
+        """
+        Create a prompt for the combined analysis.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            Prompt for the LLM
+        """
+        return ''.join((self._prompt_prefix, text, TEXT_DELIMITER))
+
+    def _create_batch_prompt(self, texts: List[str]) -> str:
+        """
+        Create a prompt for the combined analysis of several texts.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            Prompt for the LLM
+        """
+        numbered_texts = '\n'.join(f'{number}. "{text}"' for number, text in enumerate(texts, 1))
+        return self._batch_prompt_prefix + numbered_texts
+
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """
+        Build the combined analysis result for a failed query.
+        
+        Args:
+            error: Error raised by the query
+            
+        Returns:
+            Dictionary containing the error and empty results
+        """
+        return {
+            'error': str(error),
+            'keywords': [],
+            'sentiment': {
+                'overall_sentiment': 'unknown',
+                'scores': {
+                    'positive': 0.0,
+                    'negative': 0.0,
+                    'neutral': 0.0
+                },
+                'explanation': 'Failed to analyze sentiment due to an error.'
+            }
+        }
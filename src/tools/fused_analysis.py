@@ -0,0 +1,271 @@
+"""
+Fused Analysis Tool Module
+
+This module implements the fused analysis tool that extracts keywords,
+analyzes sentiment, categorizes topics, and summarizes text data with a
+single LLM query.
+"""
+
+import logging
+from typing import Dict, Any, List, Tuple
+
+from .base_llm_tool import BaseLLMTool, TEXT_DELIMITER, cached_system_message
+from .keyword_contextualization import KEYWORD_BASE_TOKENS, KEYWORDS_SCHEMA, TOKENS_PER_KEYWORD
+from .sentiment_analysis import SENTIMENT_MAX_TOKENS, SENTIMENT_SCHEMA
+from .summarization import SUMMARY_MAX_TOKENS, SUMMARY_SCHEMA
+from .topic_categorization import (
+    DEFAULT_TOPICS, TOPIC_MAX_TOKENS, create_topic_schema, relevant_topics
+)
+
+logger = logging.getLogger(__name__)
+
+# Tool types whose results the fused analysis provides together
+FUSED_TOOL_TYPES = (
+    'keyword_contextualization', 'sentiment_analysis', 'topic_categorization', 'summarization'
+)
+
+# System message for the fused analysis, describing the result format once
+FUSED_SYSTEM_PROMPT = (
+    'You are a text analysis assistant. Respond with JSON only. A result has the form '
+    '{"keywords": [{"keyword": "delivery delay", "relevance": 0.9, '
+    '"context": "The customer mentioned late delivery."}], '
+    '"sentiment": {"overall_sentiment": "positive", '
+    '"scores": {"positive": 0.8, "negative": 0.1, "neutral": 0.1}, '
+    '"explanation": "Satisfied with the product, but mentions a minor issue."}, '
+    '"topics": {"primary_topic": "Delivery", '
+    '"topics": {"Delivery": 0.9, "Product Quality": 0.4}, '
+    '"explanation": "The text mainly discusses a late delivery."}, '
+    '"summary": "Customer likes the product but the delivery was late.", '
+    '"recommendations": ["Improve delivery logistics to reduce delays"], '
+    '"key_points": ["Product quality is good", "Delivery was delayed"]}, '
+    'where relevance and topic scores are between 0.0 and 1.0, context briefly explains '
+    'why the keyword is relevant, overall_sentiment is positive, negative, or neutral, '
+    'the sentiment scores add up to 1.0, primary_topic is one of the listed topics, '
+    'topics scores every listed topic with 0.0 for topics that are not relevant, '
+    'and recommendations are actionable.'
+)
+
+# System message for Anthropic models, marked for prompt caching
+FUSED_CACHED_SYSTEM = cached_system_message(FUSED_SYSTEM_PROMPT)
+
+# Prompts for the analysis of one text and of several numbered texts, formatted
+# with the settings of the tool once per tool and followed by the texts
+FUSED_PROMPT_PREFIX = (
+    'Extract at most {max_keywords} keywords from the text, analyze its sentiment, '
+    'categorize it into these topics: {topics}, and summarize it in at most '
+    '{max_summary_length} characters with at most {max_recommendations} '
+    'recommendations.\nText: """'
+)
+BATCH_FUSED_PROMPT_PREFIX = (
+    'Extract at most {max_keywords} keywords from each numbered text, analyze its sentiment, '
+    'categorize it into these topics: {topics}, and summarize it in at most '
+    '{max_summary_length} characters with at most {max_recommendations} recommendations. '
+    'Respond with {{"results": [...]}} holding one result per text, in order.\nTexts:\n'
+)
+
+# Choice of the tool forcing Anthropic models to return the analysis of a
+# text, or the results of several numbered texts, as structured input. The
+# tool lists the predefined topics and is built for each fused analysis tool
+FUSED_TOOL_CHOICE = {"type": "tool", "name": "record_fused_analysis"}
+
+
+def create_fused_schema(topics: List[str]) -> Dict[str, Any]:
+    """
+    Create the schema of the fused analysis of a text.
+    
+    The topic categorization has the schema of the topic categorization
+    tool, scoring every predefined topic.
+    
+    Args:
+        topics: Predefined topics to categorize into
+        
+    Returns:
+        JSON schema of the fused analysis
+    """
+    return {
+        "type": "object",
+        "properties": {
+            "keywords": KEYWORDS_SCHEMA["properties"]["keywords"],
+            "sentiment": SENTIMENT_SCHEMA,
+            "topics": create_topic_schema(topics),
+            **SUMMARY_SCHEMA["properties"]
+        },
+        "required": ["keywords", "sentiment", "topics", *SUMMARY_SCHEMA["required"]]
+    }
+
+
+def create_fused_tool(topics: List[str]) -> Dict[str, Any]:
+    """
+    Create the tool forcing Anthropic models to return the fused analysis as structured input.
+    
+    Args:
+        topics: Predefined topics to categorize into
+        
+    Returns:
+        Tool taking the analysis of a text, or the results of several numbered texts
+    """
+    schema = create_fused_schema(topics)
+    return {
+        "name": "record_fused_analysis",
+        "description": "Record the keywords, sentiment, topics, and summary of the text, "
+                       "or the results of each numbered text.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                **schema["properties"],
+                "results": {"type": "array", "items": schema}
+            }
+        }
+    }
+
+
+def split_fused_result(result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Split a fused analysis result into the results of the separate tools.
+    
+    As with the topic categorization tool, the topics scored 0.0 are dropped.
+    
+    Args:
+        result: Fused analysis result
+        
+    Returns:
+        Keyword contextualization, sentiment analysis, topic categorization,
+        and summarization results, by tool type
+    """
+    split_results = {
+        'keyword_contextualization': {'keywords': result.get('keywords', [])},
+        'sentiment_analysis': dict(result.get('sentiment') or {}),
+        'topic_categorization': relevant_topics(dict(result.get('topics') or {})),
+        'summarization': {
+            'summary': result.get('summary', ''),
+            'recommendations': result.get('recommendations', []),
+            'key_points': result.get('key_points', [])
+        }
+    }
+    
+    # Report a failed query in every result
+    if 'error' in result:
+        for tool_result in split_results.values():
+            tool_result['error'] = result['error']
+    
+    return split_results
+
+
+class FusedAnalysisTool(BaseLLMTool):
+    """
+    Tool for extracting keywords, analyzing sentiment, categorizing topics, and
+    summarizing text data at once.
+    
+    This tool asks the LLM for the results of the keyword contextualization,
+    sentiment analysis, topic categorization, and summarization tools in one
+    response, so a text that needs all of them costs a single round trip and
+    a single prompt instead of four.
+    """
+    
+    task_name = 'fused analysis'
+    system_prompt = FUSED_SYSTEM_PROMPT
+    cached_system = FUSED_CACHED_SYSTEM
+    result_tool_choice = FUSED_TOOL_CHOICE
+
+    def __init__(self, provider: str = 'openai', model: str = None,
+                 api_key: str = None, **kwargs):
+        """
+        Initialize the fused analysis tool.
+        
+        Args:
+            provider: LLM provider ('openai', 'anthropic', 'bedrock', or 'groq')
+            model: Model name to use
+            api_key: API key for the provider
+            **kwargs: Additional configuration options
+        """
+        super().__init__(provider=provider, model=model, api_key=api_key, **kwargs)
+        
+        # Set the limits of the keywords and summary, and the topics to categorize into
+        self.max_keywords = kwargs.get('max_keywords', 10)
+        self.max_summary_length = kwargs.get('max_summary_length', 200)
+        self.max_recommendations = kwargs.get('max_recommendations', 3)
+        self.predefined_topics = kwargs.get('predefined_topics', DEFAULT_TOPICS)
+        
+        # Tool constraining the topics to the predefined ones for Anthropic models
+        self.result_tool = create_fused_tool(self.predefined_topics)
+        
+        # Maximum number of tokens generated for the fused results of a text
+        self.result_max_tokens = (KEYWORD_BASE_TOKENS + self.max_keywords * TOKENS_PER_KEYWORD
+                                  + SENTIMENT_MAX_TOKENS + TOPIC_MAX_TOKENS + SUMMARY_MAX_TOKENS)
+        
+        # Prompt prefixes with the settings filled in
+        settings = {
+            'max_keywords': self.max_keywords,
+            'topics': ', '.join(self.predefined_topics),
+            'max_summary_length': self.max_summary_length,
+            'max_recommendations': self.max_recommendations
+        }
+        self._prompt_prefix = FUSED_PROMPT_PREFIX.format(**settings)
+        self._batch_prompt_prefix = BATCH_FUSED_PROMPT_PREFIX.format(**settings)
+
+    def _response_settings(self) -> Tuple[Any, ...]:
+        """
+        Get the settings that affect the response for a text.
+        
+        Returns:
+            Settings included in the response cache keys
+        """
+        return (self.provider, self.model, self.max_keywords, self.max_summary_length,
+                self.max_recommendations, *self.predefined_topics)
+
+    def _create_prompt(self, text: str) -> str:
+        """
+        Create a prompt for the fused analysis.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            Prompt for the LLM
+        """
+        return ''.join((self._prompt_prefix, text, TEXT_DELIMITER))
+
+    def _create_batch_prompt(self, texts: List[str]) -> str:
+        """
+        Create a prompt for the fused analysis of several texts.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            Prompt for the LLM
+        """
+        numbered_texts = '\n'.join(f'{number}. "{text}"' for number, text in enumerate(texts, 1))
+        return self._batch_prompt_prefix + numbered_texts
+
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """
+        Build the fused analysis result for a failed query.
+        
+        Args:
+            error: Error raised by the query
+            
+        Returns:
+            Dictionary containing the error and empty results
+        """
+        return {
+            'error': str(error),
+            'keywords': [],
+            'sentiment': {
+                'overall_sentiment': 'unknown',
+                'scores': {
+                    'positive': 0.0,
+                    'negative': 0.0,
+                    'neutral': 0.0
+                },
+                'explanation': 'Failed to analyze sentiment due to an error.'
+            },
+            'topics': {
+                'primary_topic': 'Unknown',
+                'topics': {},
+                'explanation': 'Failed to categorize topics due to an error.'
+            },
+            'summary': 'Failed to generate summary due to an error.',
+            'recommendations': [],
+            'key_points': []
+        }
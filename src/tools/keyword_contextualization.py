@@ -5,25 +5,87 @@ This module implements the keyword contextualization tool that extracts
 context-aware keywords from text data with relevance scores.
 """
 
-import json
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 
-import openai
-import anthropic
-import boto3
-import groq
+from .base_llm_tool import BaseLLMTool, TEXT_DELIMITER, cached_system_message
+from ..utils.json_stream import JsonArrayStream
 
 logger = logging.getLogger(__name__)
 
+# System message for keyword contextualization, describing the result format once
+KEYWORD_SYSTEM_PROMPT = (
+    'You are a keyword extraction assistant. Respond with JSON only. A result has the form '
+    '{"keywords": [{"keyword": "delivery delay", "relevance": 0.9, '
+    '"context": "The customer mentioned late delivery."}]}, where relevance is between 0.0 and 1.0 '
+    'and context briefly explains why the keyword is relevant.'
+)
 
-class KeywordContextualizationTool:
+# System message for Anthropic models, marked for prompt caching so that calls
+# sharing the system message reuse its processed prefix
+KEYWORD_CACHED_SYSTEM = cached_system_message(KEYWORD_SYSTEM_PROMPT)
+
+# Prompts for the keywords of one text and of several numbered texts, formatted
+# with the number of keywords once per tool and followed by the texts
+KEYWORD_PROMPT_PREFIX = 'Extract at most {max_keywords} keywords from the text.\nText: """'
+BATCH_KEYWORD_PROMPT_PREFIX = (
+    'Extract at most {max_keywords} keywords from each numbered text. '
+    'Respond with {{"results": [...]}} holding one result per text, in order.\nTexts:\n'
+)
+
+# Maximum number of tokens generated for the keywords of a text, as a fixed
+# part and a part per keyword
+KEYWORD_BASE_TOKENS = 50
+TOKENS_PER_KEYWORD = 40
+
+# Number of characters below which texts are not worth querying the LLM for keywords
+MIN_TEXT_LENGTH = 20
+
+# Schemas of a keyword and of the keywords of a text
+KEYWORD_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "keyword": {"type": "string"},
+        "relevance": {"type": "number"},
+        "context": {"type": "string"}
+    },
+    "required": ["keyword", "relevance", "context"]
+}
+KEYWORDS_SCHEMA = {
+    "type": "object",
+    "properties": {"keywords": {"type": "array", "items": KEYWORD_SCHEMA}},
+    "required": ["keywords"]
+}
+
+# Tool forcing Anthropic models to return the keywords of a text, or the
+# results of several numbered texts, as structured input
+KEYWORD_TOOL = {
+    "name": "record_keywords",
+    "description": "Record the keywords of the text, or the results of each numbered text.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "keywords": KEYWORDS_SCHEMA["properties"]["keywords"],
+            "results": {"type": "array", "items": KEYWORDS_SCHEMA}
+        }
+    }
+}
+KEYWORD_TOOL_CHOICE = {"type": "tool", "name": "record_keywords"}
+
+
+class KeywordContextualizationTool(BaseLLMTool):
     """
     Tool for extracting context-aware keywords from text data.
     
     This tool uses LLMs to extract keywords from text data and
     provide relevance scores and contextual information.
     """
+    
+    task_name = 'keyword contextualization'
+    system_prompt = KEYWORD_SYSTEM_PROMPT
+    cached_system = KEYWORD_CACHED_SYSTEM
+    result_tool = KEYWORD_TOOL
+    result_tool_choice = KEYWORD_TOOL_CHOICE
 
     def __init__(self, provider: str = 'openai', model: str = None, 
                  api_key: str = None, **kwargs):
@@ -36,267 +98,138 @@ class KeywordContextualizationTool:
             api_key: API key for the provider
             **kwargs: Additional configuration options
         """
-        self.provider = provider.lower()
-        self.model = model
-        self.api_key = api_key
-        
-        # Set default models based on provider
-        if not self.model:
-            if self.provider == 'openai':
-                self.model = 'gpt-4'
-            elif self.provider == 'anthropic':
-                self.model = 'claude-3-opus-20240229'
-            elif self.provider == 'bedrock':
-                self.model = 'anthropic.claude-3-sonnet-20240229'
-            elif self.provider == 'groq':
-                self.model = 'llama3-70b-8192'
-        
-        # Initialize the client based on the provider
-        self._initialize_client()
+        super().__init__(provider=provider, model=model, api_key=api_key, **kwargs)
         
         # Set the maximum number of keywords to extract
         self.max_keywords = kwargs.get('max_keywords', 10)
+        
+        # Maximum number of tokens generated for the keywords of a text
+        self.result_max_tokens = KEYWORD_BASE_TOKENS + self.max_keywords * TOKENS_PER_KEYWORD
+        
+        # Texts shorter than this are answered without querying the LLM
+        self.min_text_length = kwargs.get('min_text_length', MIN_TEXT_LENGTH)
+        
+        # Prompt prefixes with the number of keywords filled in
+        self._prompt_prefix = KEYWORD_PROMPT_PREFIX.format(max_keywords=self.max_keywords)
+        self._batch_prompt_prefix = BATCH_KEYWORD_PROMPT_PREFIX.format(
+            max_keywords=self.max_keywords)
 
-    def _initialize_client(self):
-        """Initialize the appropriate LLM client based on the provider."""
-        if self.provider == 'openai':
-            if self.api_key:
-                self.client = openai.OpenAI(api_key=self.api_key)
-            else:
-                self.client = openai.OpenAI()
-        elif self.provider == 'anthropic':
-            if self.api_key:
-                self.client = anthropic.Anthropic(api_key=self.api_key)
-            else:
-                self.client = anthropic.Anthropic()
-        elif self.provider == 'bedrock':
-            self.client = boto3.client('bedrock-runtime')
-        elif self.provider == 'groq':
-            if self.api_key:
-                self.client = groq.Groq(api_key=self.api_key)
-            else:
-                self.client = groq.Groq()
-        else:
-            raise ValueError(f"Unsupported provider: {self.provider}")
-
-    def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute_stream(self, input_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
         """
-        Execute the keyword contextualization tool on the input data.
+        Execute the keyword contextualization tool, yielding keywords as they are generated.
+        
+        The response is streamed from the LLM and each keyword is yielded as
+        soon as its object is complete, rather than after the whole response.
         
         Args:
             input_data: Dictionary containing the input data
-            
-        Returns:
-            Dictionary containing the keyword contextualization results
+        
+        Yields:
+            Keyword objects with keyword, relevance, and context
         """
         # Extract the text to analyze
         text = input_data.get('feedback_text', '')
         
         if not text:
             logger.warning("No text provided for keyword contextualization")
-            return {'error': 'No text provided for keyword contextualization'}
+            return
+        
+        text = self._truncate(text)
+        
+        # Yield the keywords of a repeated or near-duplicate text, where trivial
+        # texts have no keywords to yield
+        cache_key = self._response_cache_key(text)
+        known_result = self._known_result(text, cache_key)
+        if known_result is not None:
+            for keyword in known_result.get('keywords', []):
+                yield keyword
+            return
+        
+        stream = JsonArrayStream('keywords')
+        chunks = []
+        keywords = []
         
-        # Create the prompt for keyword contextualization
-        prompt = self._create_keyword_contextualization_prompt(text)
+        try:
+            prompt = self._create_prompt(text)
+            async for chunk in self._stream_llm_text(prompt, self._select_model([text])):
+                chunks.append(chunk)
+                for keyword in stream.feed(chunk):
+                    keywords.append(keyword)
+                    yield keyword
+        
+        except Exception as e:
+            logger.error(f"Error streaming LLM keyword contextualization: {str(e)}")
+            return
         
-        # Query the LLM for keyword contextualization
-        keyword_result = self._query_llm_for_keywords(prompt)
+        # Fall back to parsing the whole response if no keyword array was found
+        if not keywords:
+            keyword_result = self._parse_result(''.join(chunks))
+            keywords = keyword_result.get('keywords', [])
+            for keyword in keywords:
+                yield keyword
         
-        return keyword_result
+        self._cache_response(text, cache_key, {'keywords': keywords})
 
-    def _create_keyword_contextualization_prompt(self, text: str) -> str:
+    def _direct_result(self, text: str) -> Optional[Dict[str, Any]]:
         """
-        Create a prompt for keyword contextualization.
+        Get the keywords of a text too short to query the LLM for.
         
         Args:
             text: Text to analyze
             
         Returns:
-            Prompt for the LLM
+            Empty keywords for a short text, or None otherwise
         """
-        prompt = f"""
-        Extract the most important keywords or phrases from the following text. For each keyword, provide a relevance score between 0.0 and 1.0, where 1.0 means highly relevant, and a brief contextual explanation.
-        
-        Extract at most {self.max_keywords} keywords.
-        
-        Text: "{text}"
+        if len(text.strip()) < self.min_text_length:
+            return {'keywords': [], 'note': 'Text too short for keyword contextualization'}
         
-        Respond with a JSON object containing:
-        1. keywords: An array of objects, each with:
-           - keyword: The extracted keyword or phrase
-           - relevance: A relevance score between 0.0 and 1.0
-           - context: A brief explanation of why this keyword is relevant in the context
-        
-        Example response format:
-        {{
-            "keywords": [
-                {{
-                    "keyword": "delivery delay",
-                    "relevance": 0.9,
-                    "context": "The customer specifically mentioned issues with delivery timing."
-                }},
-                {{
-                    "keyword": "product quality",
-                    "relevance": 0.7,
-                    "context": "The customer expressed satisfaction with the product itself."
-                }}
-            ]
-        }}
+        return None
+
+    def _response_settings(self) -> Tuple[Any, ...]:
         """
+        Get the settings that affect the response for a text.
         
-        return prompt
+        Returns:
+            Settings included in the response cache keys
+        """
+        return self.provider, self.model, self.max_keywords
 
-    def _query_llm_for_keywords(self, prompt: str) -> Dict[str, Any]:
+    def _create_prompt(self, text: str) -> str:
         """
-        Query the LLM for keyword contextualization.
+        Create a prompt for keyword contextualization.
         
         Args:
-            prompt: Prompt for the LLM
+            text: Text to analyze
             
         Returns:
-            Dictionary containing the keyword contextualization results
+            Prompt for the LLM
         """
-        try:
-            if self.provider == 'openai':
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "system", "content": "You are a keyword extraction assistant."}, 
-                              {"role": "user", "content": prompt}],
-                    temperature=0.1
-                )
-                result = response.choices[0].message.content
-            
-            elif self.provider == 'anthropic':
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=1000,
-                    temperature=0.1,
-                    system="You are a keyword extraction assistant.",
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                result = response.content[0].text
-            
-            elif self.provider == 'bedrock':
-                # For Bedrock, we need to format the request based on the model
-                if 'claude' in self.model:
-                    # Claude model format
-                    payload = {
-                        "anthropic_version": "bedrock-2023-05-31",
-                        "max_tokens": 1000,
-                        "temperature": 0.1,
-                        "system": "You are a keyword extraction assistant.",
-                        "messages": [{"role": "user", "content": prompt}]
-                    }
-                else:
-                    # Generic format - would need to be adjusted for specific models
-                    payload = {
-                        "prompt": prompt,
-                        "max_tokens": 1000,
-                        "temperature": 0.1
-                    }
-                
-                response = self.client.invoke_model(
-                    modelId=self.model,
-                    body=json.dumps(payload)
-                )
-                response_body = json.loads(response['body'].read())
-                
-                # Extract the result based on the model
-                if 'claude' in self.model:
-                    result = response_body['content'][0]['text']
-                else:
-                    # Generic extraction - would need to be adjusted for specific models
-                    result = response_body.get('completion', '')
-            
-            elif self.provider == 'groq':
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "system", "content": "You are a keyword extraction assistant."}, 
-                              {"role": "user", "content": prompt}],
-                    temperature=0.1
-                )
-                result = response.choices[0].message.content
-            
-            # Parse the result to extract the keywords
-            try:
-                # Try to parse as JSON
-                keyword_data = json.loads(result)
-                return keyword_data
-            
-            except json.JSONDecodeError:
-                # If not valid JSON, try to extract keywords from text
-                logger.warning("Failed to parse keyword contextualization result as JSON")
-                return self._extract_keywords_from_text(result)
-        
-        except Exception as e:
-            logger.error(f"Error querying LLM for keyword contextualization: {str(e)}")
-            return {
-                'error': str(e),
-                'keywords': []
-            }
+        return ''.join((self._prompt_prefix, text, TEXT_DELIMITER))
 
-    def _extract_keywords_from_text(self, text: str) -> Dict[str, Any]:
+    def _create_batch_prompt(self, texts: List[str]) -> str:
         """
-        Extract keywords from text response.
+        Create a prompt for the keyword contextualization of several texts.
         
         Args:
-            text: Text response from the LLM
+            texts: Texts to analyze
             
         Returns:
-            Dictionary containing the keyword contextualization results
+            Prompt for the LLM
+        """
+        numbered_texts = '\n'.join(f'{number}. "{text}"' for number, text in enumerate(texts, 1))
+        return self._batch_prompt_prefix + numbered_texts
+
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
         """
-        # This is a fallback method if JSON parsing fails
-        # In a real implementation, this would be more sophisticated
+        Build the keyword contextualization result for a failed query.
         
-        # Default values
-        keyword_data = {
+        Args:
+            error: Error raised by the query
+            
+        Returns:
+            Dictionary containing the error and empty results
+        """
+        return {
+            'error': str(error),
             'keywords': []
         }
-        
-        # Try to extract keywords
-        lines = text.split('\n')
-        current_keyword = None
-        current_relevance = None
-        current_context = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Check if this line contains a keyword
-            if line.lower().startswith('keyword:') or line.lower().startswith('- keyword:'):
-                # If we have a complete keyword entry, add it to the list
-                if current_keyword and current_relevance is not None:
-                    keyword_data['keywords'].append({
-                        'keyword': current_keyword,
-                        'relevance': current_relevance,
-                        'context': current_context or 'No context provided'
-                    })
-                
-                # Start a new keyword entry
-                keyword_part = line.split(':', 1)[1].strip()
-                current_keyword = keyword_part
-                current_relevance = None
-                current_context = None
-            
-            # Check if this line contains a relevance score
-            elif line.lower().startswith('relevance:') or line.lower().startswith('- relevance:'):
-                relevance_part = line.split(':', 1)[1].strip()
-                try:
-                    current_relevance = float(relevance_part)
-                except ValueError:
-                    current_relevance = 0.5  # Default if we can't parse
-            
-            # Check if this line contains context
-            elif line.lower().startswith('context:') or line.lower().startswith('- context:'):
-                context_part = line.split(':', 1)[1].strip()
-                current_context = context_part
-        
-        # Add the last keyword if we have one
-        if current_keyword and current_relevance is not None:
-            keyword_data['keywords'].append({
-                'keyword': current_keyword,
-                'relevance': current_relevance,
-                'context': current_context or 'No context provided'
-            })
-        
-        return keyword_data
@@ -0,0 +1,209 @@
+"""
+Parallel Runner Module
+
+This module provides a runner that executes a tool on many inputs
+concurrently while staying within the rate limits of the LLM provider.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from .base_llm_tool import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# Default request and token limits per minute, and number of attempts per input
+DEFAULT_MAX_REQUESTS_PER_MINUTE = 500
+DEFAULT_MAX_TOKENS_PER_MINUTE = 100000
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Default number of executions in flight at once
+DEFAULT_MAX_CONCURRENCY = 50
+
+# Delay in seconds before the first retry of a failed execution, doubled for
+# each further attempt
+RETRY_BASE_DELAY = 1.0
+
+# Interval in seconds at which an execution waiting for capacity checks again
+CAPACITY_POLL_INTERVAL = 0.05
+
+# Number of tokens assumed for the result of a tool that does not declare it
+DEFAULT_RESULT_TOKENS = 1000
+
+# Fragments of error messages reporting that the provider rate limited a request
+RATE_LIMIT_MARKERS = ('429', 'rate limit', 'rate_limit', 'too many requests', 'throttl')
+
+
+def is_rate_limited(result: Dict[str, Any]) -> bool:
+    """
+    Check whether a tool result reports a rate limited request.
+    
+    Args:
+        result: Result of a tool execution
+        
+    Returns:
+        True if the result holds a rate limit error
+    """
+    error = str(result.get('error', '')).lower()
+    return any(marker in error for marker in RATE_LIMIT_MARKERS)
+
+
+class ParallelToolRunner:
+    """
+    Runner executing a tool on many inputs concurrently.
+    
+    Executions draw from request and token budgets that refill continuously
+    up to the limits per minute, so a large list of inputs runs as fast as the
+    provider allows without being rate limited. Executions that raise or are
+    rate limited anyway are retried with exponential backoff.
+    """
+
+    def __init__(self, max_requests_per_minute: float = DEFAULT_MAX_REQUESTS_PER_MINUTE,
+                 max_tokens_per_minute: float = DEFAULT_MAX_TOKENS_PER_MINUTE,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        """
+        Initialize the parallel runner.
+        
+        Args:
+            max_requests_per_minute: Maximum number of executions started per minute
+            max_tokens_per_minute: Maximum number of estimated tokens used per minute
+            max_attempts: Maximum number of attempts per input
+            max_concurrency: Maximum number of executions in flight at once
+        """
+        self.max_requests_per_minute = max_requests_per_minute
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self.max_attempts = max_attempts
+        self.max_concurrency = max_concurrency
+        
+        # Remaining budgets, refilled from the time of the last update
+        self._available_requests = max_requests_per_minute
+        self._available_tokens = max_tokens_per_minute
+        self._last_update = time.monotonic()
+
+    async def run(self, tool: Any, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Execute a tool on several inputs concurrently.
+        
+        Args:
+            tool: Tool providing an execute_async coroutine
+            inputs: Input data for each execution
+            
+        Returns:
+            Results of the tool, in the same order as the inputs
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(inputs)
+        if not inputs:
+            return results
+        
+        # Queue of (index, input data, attempt) waiting to be executed
+        queue: asyncio.Queue = asyncio.Queue()
+        for index, input_data in enumerate(inputs):
+            queue.put_nowait((index, input_data, 1))
+        
+        remaining = len(inputs)
+        finished = asyncio.Event()
+        capacity_lock = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+        
+        async def worker():
+            nonlocal remaining
+            while True:
+                index, input_data, attempt = await queue.get()
+                
+                async with capacity_lock:
+                    await self._acquire(self._estimate_tokens(tool, input_data))
+                
+                result, retryable = await self._execute(tool, input_data)
+                if retryable and attempt < self.max_attempts:
+                    # Put the input back in the queue once the backoff has elapsed
+                    delay = RETRY_BASE_DELAY * 2 ** (attempt - 1) * (1 + random.random())
+                    logger.warning(f"Retrying input {index} in {delay:.1f}s "
+                                   f"after attempt {attempt}: {result.get('error')}")
+                    loop.call_later(delay, queue.put_nowait, (index, input_data, attempt + 1))
+                    continue
+                
+                results[index] = result
+                remaining -= 1
+                if not remaining:
+                    finished.set()
+        
+        worker_count = min(self.max_concurrency, len(inputs))
+        workers = [asyncio.create_task(worker()) for _ in range(worker_count)]
+        try:
+            await finished.wait()
+        finally:
+            for task in workers:
+                task.cancel()
+        
+        return results
+
+    async def _execute(self, tool: Any, input_data: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Execute the tool on one input.
+        
+        Args:
+            tool: Tool providing an execute_async coroutine
+            input_data: Input data for the execution
+            
+        Returns:
+            Result of the tool, and whether the execution should be retried
+        """
+        try:
+            result = await tool.execute_async(input_data)
+        
+        except Exception as e:
+            return {'error': str(e)}, True
+        
+        return result, is_rate_limited(result)
+
+    async def _acquire(self, tokens: int) -> None:
+        """
+        Wait until the budgets allow one more execution, and consume it.
+        
+        Args:
+            tokens: Estimated number of tokens used by the execution
+        """
+        # An execution larger than the token limit only waits for a full budget
+        tokens = min(tokens, self.max_tokens_per_minute)
+        
+        while True:
+            self._refill()
+            if self._available_requests >= 1 and self._available_tokens >= tokens:
+                self._available_requests -= 1
+                self._available_tokens -= tokens
+                return
+            
+            await asyncio.sleep(CAPACITY_POLL_INTERVAL)
+
+    def _refill(self) -> None:
+        """Refill the budgets in proportion to the time since the last update."""
+        now = time.monotonic()
+        elapsed_minutes = (now - self._last_update) / 60
+        self._last_update = now
+        
+        self._available_requests = min(
+            self.max_requests_per_minute,
+            self._available_requests + elapsed_minutes * self.max_requests_per_minute
+        )
+        self._available_tokens = min(
+            self.max_tokens_per_minute,
+            self._available_tokens + elapsed_minutes * self.max_tokens_per_minute
+        )
+
+    def _estimate_tokens(self, tool: Any, input_data: Dict[str, Any]) -> int:
+        """
+        Estimate the number of tokens an execution uses.
+        
+        Args:
+            tool: Tool to execute
+            input_data: Input data for the execution
+            
+        Returns:
+            Estimated number of prompt and result tokens
+        """
+        text_tokens = len(input_data.get('feedback_text', '')) // CHARS_PER_TOKEN
+        return text_tokens + getattr(tool, 'result_max_tokens', DEFAULT_RESULT_TOKENS)
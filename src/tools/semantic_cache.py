@@ -0,0 +1,145 @@
+"""
+Semantic Cache Module
+
+This module implements a cache that reuses LLM results for texts that are
+near-duplicates of texts already analyzed.
+"""
+
+import logging
+import math
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Mapping, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Minimum cosine similarity between two texts for one to reuse the result of the other
+DEFAULT_SIMILARITY_THRESHOLD = 0.92
+
+# Maximum number of texts held in the cache
+DEFAULT_MAX_ENTRIES = 1024
+
+# Length of the character n-grams the default embedding is built from
+NGRAM_LENGTH = 3
+
+# Patterns matching runs of whitespace and of digits, collapsed before
+# embedding a text so that numbers such as order IDs do not count
+WHITESPACE_PATTERN = re.compile(r'\s+')
+DIGITS_PATTERN = re.compile(r'\d+')
+
+# Sparse embedding of a text, mapping each feature to its weight
+Embedding = Mapping[Any, float]
+
+
+def ngram_embedding(text: str) -> Dict[str, float]:
+    """
+    Embed a text as its unit-length vector of character n-gram counts.
+    
+    Texts differing only in a few words get nearly parallel vectors, and
+    texts differing only in their numbers, such as templated messages with
+    different order numbers, get the same vector.
+    
+    Args:
+        text: Text to embed
+        
+    Returns:
+        Weight of each n-gram of the text
+    """
+    normalized = DIGITS_PATTERN.sub('0', WHITESPACE_PATTERN.sub(' ', text.lower()).strip())
+    normalized = f" {normalized} "
+    counts = Counter(normalized[i:i + NGRAM_LENGTH]
+                     for i in range(len(normalized) - NGRAM_LENGTH + 1))
+    
+    norm = math.sqrt(sum(count * count for count in counts.values())) or 1.0
+    return {ngram: count / norm for ngram, count in counts.items()}
+
+
+class SemanticCache:
+    """
+    Cache of LLM results, looked up by the similarity of texts.
+    
+    Each text is embedded as a sparse unit vector. A lookup returns the
+    result of the most similar cached text if their cosine similarity
+    reaches the threshold. An inverted index from features to texts limits
+    the comparison to texts sharing features with the one looked up, and
+    the least recently used texts are evicted beyond max_entries.
+    """
+
+    def __init__(self, embed: Optional[Callable[[str], Embedding]] = None,
+                 threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the semantic cache.
+        
+        Args:
+            embed: Function embedding a text as a sparse unit vector, by
+                default its character n-gram counts
+            threshold: Minimum cosine similarity for a cache hit
+            max_entries: Maximum number of texts held in the cache
+        """
+        self.embed = embed or ngram_embedding
+        self.threshold = threshold
+        self.max_entries = max_entries
+        
+        self._entries: 'OrderedDict[int, Tuple[Embedding, Dict[str, Any]]]' = OrderedDict()
+        self._index: Dict[Any, Set[int]] = defaultdict(set)
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the result of the cached text most similar to a text.
+        
+        Args:
+            text: Text to look up
+            
+        Returns:
+            Cached result, or None if no cached text is similar enough
+        """
+        vector = self.embed(text)
+        
+        with self._lock:
+            # Accumulate the dot products with the texts sharing features
+            scores: Dict[int, float] = defaultdict(float)
+            for feature, weight in vector.items():
+                for entry_id in self._index.get(feature, ()):
+                    scores[entry_id] += weight * self._entries[entry_id][0][feature]
+            
+            if not scores:
+                return None
+            
+            entry_id, similarity = max(scores.items(), key=lambda item: item[1])
+            if similarity < self.threshold:
+                return None
+            
+            logger.debug("Semantic cache hit with similarity %.3f", similarity)
+            self._entries.move_to_end(entry_id)
+            return self._entries[entry_id][1]
+
+    def set(self, text: str, result: Dict[str, Any]) -> None:
+        """
+        Cache the result for a text.
+        
+        Args:
+            text: Text the result was computed for
+            result: Result to reuse for similar texts
+        """
+        vector = self.embed(text)
+        
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            
+            self._entries[entry_id] = (vector, result)
+            for feature in vector:
+                self._index[feature].add(entry_id)
+            
+            # Evict the least recently used texts beyond the size limit
+            while len(self._entries) > self.max_entries:
+                evicted_id, (evicted_vector, _) = self._entries.popitem(last=False)
+                for feature in evicted_vector:
+                    entry_ids = self._index[feature]
+                    entry_ids.discard(evicted_id)
+                    if not entry_ids:
+                        del self._index[feature]
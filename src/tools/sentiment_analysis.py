@@ -5,103 +5,116 @@ This module implements the sentiment analysis tool that analyzes the
 sentiment of text data.
 """
 
-import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-import openai
-import anthropic
-import boto3
-import groq
+from .base_llm_tool import (
+    BaseLLMTool, PUNCTUATION_ONLY_PATTERN, TEXT_DELIMITER, cached_system_message
+)
 
 logger = logging.getLogger(__name__)
 
+# System message for sentiment analysis, describing the result format once
+SENTIMENT_SYSTEM_PROMPT = (
+    'You are a sentiment analysis assistant. Respond with JSON only. A result has the form '
+    '{"overall_sentiment": "positive", '
+    '"scores": {"positive": 0.8, "negative": 0.1, "neutral": 0.1}, '
+    '"explanation": "Satisfied with the product, but mentions a minor issue."}, '
+    'where overall_sentiment is positive, negative, or neutral and the scores add up to 1.0.'
+)
 
-class SentimentAnalysisTool:
+# System message for Anthropic models, marked for prompt caching so that calls
+# sharing the system message reuse its processed prefix
+SENTIMENT_CACHED_SYSTEM = cached_system_message(SENTIMENT_SYSTEM_PROMPT)
+
+# Prompts for the sentiment of one text and of several numbered texts, followed
+# by the texts
+SENTIMENT_PROMPT_PREFIX = 'Analyze the sentiment of the text.\nText: """'
+BATCH_SENTIMENT_PROMPT_PREFIX = (
+    'Analyze the sentiment of each numbered text. Respond with {"results": [...]} '
+    'holding one result per text, in order.\nTexts:\n'
+)
+
+# Maximum number of tokens generated for the sentiment of a text
+SENTIMENT_MAX_TOKENS = 150
+
+# Sentiment of texts without any words, which is reported without querying the LLM
+NO_WORDS_SENTIMENT = {
+    'overall_sentiment': 'neutral',
+    'scores': {
+        'positive': 0.0,
+        'negative': 0.0,
+        'neutral': 1.0
+    },
+    'explanation': 'The text has no words to analyze.'
+}
+
+# Schema of the sentiment of a text
+SENTIMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "overall_sentiment": {"type": "string", "enum": ["positive", "negative", "neutral"]},
+        "scores": {
+            "type": "object",
+            "properties": {
+                "positive": {"type": "number"},
+                "negative": {"type": "number"},
+                "neutral": {"type": "number"}
+            },
+            "required": ["positive", "negative", "neutral"]
+        },
+        "explanation": {"type": "string"}
+    },
+    "required": ["overall_sentiment", "scores", "explanation"]
+}
+
+# Tool forcing Anthropic models to return the sentiment of a text, or the
+# results of several numbered texts, as structured input
+SENTIMENT_TOOL = {
+    "name": "record_sentiment",
+    "description": "Record the sentiment of the text, or the results of each numbered text.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            **SENTIMENT_SCHEMA["properties"],
+            "results": {"type": "array", "items": SENTIMENT_SCHEMA}
+        }
+    }
+}
+SENTIMENT_TOOL_CHOICE = {"type": "tool", "name": "record_sentiment"}
+
+
+class SentimentAnalysisTool(BaseLLMTool):
     """
     Tool for analyzing sentiment in text data.
     
     This tool uses LLMs to analyze the sentiment of text data and
     categorize it as positive, negative, or neutral with confidence scores.
     """
+    
+    task_name = 'sentiment analysis'
+    system_prompt = SENTIMENT_SYSTEM_PROMPT
+    cached_system = SENTIMENT_CACHED_SYSTEM
+    result_tool = SENTIMENT_TOOL
+    result_tool_choice = SENTIMENT_TOOL_CHOICE
+    result_max_tokens = SENTIMENT_MAX_TOKENS
 
-    def __init__(self, provider: str = 'openai', model: str = None, 
-                 api_key: str = None, **kwargs):
-        """
-        Initialize the sentiment analysis tool.
-        
-        Args:
-            provider: LLM provider ('openai', 'anthropic', 'bedrock', or 'groq')
-            model: Model name to use
-            api_key: API key for the provider
-            **kwargs: Additional configuration options
-        """
-        self.provider = provider.lower()
-        self.model = model
-        self.api_key = api_key
-        
-        # Set default models based on provider
-        if not self.model:
-            if self.provider == 'openai':
-                self.model = 'gpt-4'
-            elif self.provider == 'anthropic':
-                self.model = 'claude-3-opus-20240229'
-            elif self.provider == 'bedrock':
-                self.model = 'anthropic.claude-3-sonnet-20240229'
-            elif self.provider == 'groq':
-                self.model = 'llama3-70b-8192'
-        
-        # Initialize the client based on the provider
-        self._initialize_client()
-
-    def _initialize_client(self):
-        """Initialize the appropriate LLM client based on the provider."""
-        if self.provider == 'openai':
-            if self.api_key:
-                self.client = openai.OpenAI(api_key=self.api_key)
-            else:
-                self.client = openai.OpenAI()
-        elif self.provider == 'anthropic':
-            if self.api_key:
-                self.client = anthropic.Anthropic(api_key=self.api_key)
-            else:
-                self.client = anthropic.Anthropic()
-        elif self.provider == 'bedrock':
-            self.client = boto3.client('bedrock-runtime')
-        elif self.provider == 'groq':
-            if self.api_key:
-                self.client = groq.Groq(api_key=self.api_key)
-            else:
-                self.client = groq.Groq()
-        else:
-            raise ValueError(f"Unsupported provider: {self.provider}")
-
-    def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _direct_result(self, text: str) -> Optional[Dict[str, Any]]:
         """
-        Execute the sentiment analysis tool on the input data.
+        Get the sentiment of a text made only of punctuation without the LLM.
         
         Args:
-            input_data: Dictionary containing the input data
+            text: Text to analyze
             
         Returns:
-            Dictionary containing the sentiment analysis results
+            Neutral sentiment for a text without words, or None otherwise
         """
-        # Extract the text to analyze
-        text = input_data.get('feedback_text', '')
+        if PUNCTUATION_ONLY_PATTERN.fullmatch(text):
+            return dict(NO_WORDS_SENTIMENT)
         
-        if not text:
-            logger.warning("No text provided for sentiment analysis")
-            return {'error': 'No text provided for sentiment analysis'}
-        
-        # Create the prompt for sentiment analysis
-        prompt = self._create_sentiment_analysis_prompt(text)
-        
-        # Query the LLM for sentiment analysis
-        sentiment_result = self._query_llm_for_sentiment(prompt)
-        
-        return sentiment_result
+        return None
 
-    def _create_sentiment_analysis_prompt(self, text: str) -> str:
+    def _create_prompt(self, text: str) -> str:
         """
         Create a prompt for sentiment analysis.
         
@@ -111,171 +124,38 @@ class SentimentAnalysisTool:
         Returns:
             Prompt for the LLM
         """
-        prompt = f"""
-        Analyze the sentiment of the following text and provide scores for positive, negative, and neutral sentiments. The scores should add up to 1.0.
-        
-        Text: "{text}"
-        
-        Respond with a JSON object containing:
-        1. overall_sentiment: The dominant sentiment (positive, negative, or neutral)
-        2. scores: An object with scores for positive, negative, and neutral sentiments
-        3. explanation: A brief explanation of the sentiment analysis
-        
-        Example response format:
-        {{
-            "overall_sentiment": "positive",
-            "scores": {{
-                "positive": 0.8,
-                "negative": 0.1,
-                "neutral": 0.1
-            }},
-            "explanation": "The text expresses satisfaction with the product but mentions a minor issue."
-        }}
-        """
-        
-        return prompt
+        return ''.join((SENTIMENT_PROMPT_PREFIX, text, TEXT_DELIMITER))
 
-    def _query_llm_for_sentiment(self, prompt: str) -> Dict[str, Any]:
+    def _create_batch_prompt(self, texts: List[str]) -> str:
         """
-        Query the LLM for sentiment analysis.
+        Create a prompt for the sentiment analysis of several texts.
         
         Args:
-            prompt: Prompt for the LLM
+            texts: Texts to analyze
             
         Returns:
-            Dictionary containing the sentiment analysis results
+            Prompt for the LLM
         """
-        try:
-            if self.provider == 'openai':
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "system", "content": "You are a sentiment analysis assistant."}, 
-                              {"role": "user", "content": prompt}],
-                    temperature=0.1
-                )
-                result = response.choices[0].message.content
-            
-            elif self.provider == 'anthropic':
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=1000,
-                    temperature=0.1,
-                    system="You are a sentiment analysis assistant.",
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                result = response.content[0].text
-            
-            elif self.provider == 'bedrock':
-                # For Bedrock, we need to format the request based on the model
-                if 'claude' in self.model:
-                    # Claude model format
-                    payload = {
-                        "anthropic_version": "bedrock-2023-05-31",
-                        "max_tokens": 1000,
-                        "temperature": 0.1,
-                        "system": "You are a sentiment analysis assistant.",
-                        "messages": [{"role": "user", "content": prompt}]
-                    }
-                else:
-                    # Generic format - would need to be adjusted for specific models
-                    payload = {
-                        "prompt": prompt,
-                        "max_tokens": 1000,
-                        "temperature": 0.1
-                    }
-                
-                response = self.client.invoke_model(
-                    modelId=self.model,
-                    body=json.dumps(payload)
-                )
-                response_body = json.loads(response['body'].read())
-                
-                # Extract the result based on the model
-                if 'claude' in self.model:
-                    result = response_body['content'][0]['text']
-                else:
-                    # Generic extraction - would need to be adjusted for specific models
-                    result = response_body.get('completion', '')
-            
-            elif self.provider == 'groq':
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "system", "content": "You are a sentiment analysis assistant."}, 
-                              {"role": "user", "content": prompt}],
-                    temperature=0.1
-                )
-                result = response.choices[0].message.content
-            
-            # Parse the result to extract the sentiment analysis
-            try:
-                # Try to parse as JSON
-                sentiment_data = json.loads(result)
-                return sentiment_data
-            
-            except json.JSONDecodeError:
-                # If not valid JSON, try to extract sentiment from text
-                logger.warning("Failed to parse sentiment analysis result as JSON")
-                return self._extract_sentiment_from_text(result)
-        
-        except Exception as e:
-            logger.error(f"Error querying LLM for sentiment analysis: {str(e)}")
-            return {
-                'error': str(e),
-                'overall_sentiment': 'unknown',
-                'scores': {
-                    'positive': 0.0,
-                    'negative': 0.0,
-                    'neutral': 0.0
-                },
-                'explanation': 'Failed to analyze sentiment due to an error.'
-            }
+        numbered_texts = '\n'.join(f'{number}. "{text}"' for number, text in enumerate(texts, 1))
+        return BATCH_SENTIMENT_PROMPT_PREFIX + numbered_texts
 
-    def _extract_sentiment_from_text(self, text: str) -> Dict[str, Any]:
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
         """
-        Extract sentiment analysis from text response.
+        Build the sentiment analysis result for a failed query.
         
         Args:
-            text: Text response from the LLM
+            error: Error raised by the query
             
         Returns:
-            Dictionary containing the sentiment analysis results
+            Dictionary containing the error and empty results
         """
-        # This is a fallback method if JSON parsing fails
-        # In a real implementation, this would be more sophisticated
-        
-        # Default values
-        sentiment_data = {
+        return {
+            'error': str(error),
             'overall_sentiment': 'unknown',
             'scores': {
                 'positive': 0.0,
                 'negative': 0.0,
                 'neutral': 0.0
             },
-            'explanation': 'Failed to parse sentiment analysis result.'
+            'explanation': 'Failed to analyze sentiment due to an error.'
         }
-        
-        # Try to extract overall sentiment
-        if 'positive' in text.lower():
-            sentiment_data['overall_sentiment'] = 'positive'
-            sentiment_data['scores']['positive'] = 0.7
-            sentiment_data['scores']['negative'] = 0.1
-            sentiment_data['scores']['neutral'] = 0.2
-        elif 'negative' in text.lower():
-            sentiment_data['overall_sentiment'] = 'negative'
-            sentiment_data['scores']['positive'] = 0.1
-            sentiment_data['scores']['negative'] = 0.7
-            sentiment_data['scores']['neutral'] = 0.2
-        elif 'neutral' in text.lower():
-            sentiment_data['overall_sentiment'] = 'neutral'
-            sentiment_data['scores']['positive'] = 0.3
-            sentiment_data['scores']['negative'] = 0.3
-            sentiment_data['scores']['neutral'] = 0.4
-        
-        # Try to extract explanation
-        explanation_start = text.lower().find('explanation')
-        if explanation_start != -1:
-            explanation_end = text.find('\n', explanation_start)
-            if explanation_end != -1:
-                sentiment_data['explanation'] = text[explanation_start:explanation_end].strip()
-        
-        return sentiment_data
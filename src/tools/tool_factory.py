@@ -5,12 +5,30 @@ This module is responsible for creating and configuring different tools
 based on the requirements and configuration.
 """
 
-from typing import Dict, Any, Optional
+import asyncio
+import threading
+from typing import Dict, Any, List, Optional
 
 from .sentiment_analysis import SentimentAnalysisTool
 from .topic_categorization import TopicCategorizationTool
 from .keyword_contextualization import KeywordContextualizationTool
 from .summarization import SummarizationTool
+from .combined_analysis import CombinedAnalysisTool
+from .fused_analysis import FusedAnalysisTool
+
+
+async def execute_batch(tool: Any, inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Execute a tool on several inputs concurrently.
+    
+    Args:
+        tool: Tool providing an execute_async coroutine
+        inputs: Input data for each execution
+        
+    Returns:
+        Results of the tool, in the same order as the inputs
+    """
+    return await asyncio.gather(*[tool.execute_async(input_data) for input_data in inputs])
 
 
 class ToolFactory:
@@ -31,17 +49,122 @@ class ToolFactory:
         self.model = model
         self.api_key = api_key
         self.kwargs = kwargs
+        
+        # Tools created by this factory, reused so their clients and caches are shared
+        self._tools: Dict[str, Any] = {}
+        self._tools_lock = threading.Lock()
+        
+        # Task closing the asynchronous clients of the tools when the factory
+        # is closed on a running event loop
+        self._closing: Optional[asyncio.Task] = None
 
-    def create_tool(self, tool_type: str) -> Any:
+    def __enter__(self) -> 'ToolFactory':
+        """Use the factory as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Close the factory when leaving the context."""
+        self.close()
+
+    async def __aenter__(self) -> 'ToolFactory':
+        """Use the factory as an asynchronous context manager that closes it on exit."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        """Close the factory when leaving the context."""
+        await self.aclose()
+
+    def close(self) -> None:
         """
-        Create a tool of the specified type.
+        Release the tools created by this factory and close their asynchronous clients.
+        
+        The asynchronous clients are bound to the event loop they were created
+        for, so from a coroutine aclose should be awaited instead; called on a
+        running loop, this only schedules closing them. The LLM clients of the
+        tools are shared with other factories and stay open;
+        llm_client.close_llm_clients closes them at shutdown.
+        """
+        with self._tools_lock:
+            tools = list(self._tools.values())
+            self._tools.clear()
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self._close_async_clients(tools))
+        else:
+            self._closing = loop.create_task(self._close_async_clients(tools))
 
+    async def aclose(self) -> None:
+        """
+        Release the tools created by this factory and close their asynchronous clients.
+        
+        The LLM clients of the tools are shared with other factories and stay
+        open; llm_client.close_llm_clients closes them at shutdown.
+        """
+        with self._tools_lock:
+            tools = list(self._tools.values())
+            self._tools.clear()
+        
+        await self._close_async_clients(tools)
+
+    async def close_async_clients(self) -> None:
+        """
+        Close the asynchronous clients of the tools created by this factory.
+        
+        The clients are bound to the running event loop, so this has to be
+        awaited before the loop ends. The tools stay usable and create new
+        clients when queried again.
+        """
+        with self._tools_lock:
+            tools = list(self._tools.values())
+        
+        await self._close_async_clients(tools)
+
+    @staticmethod
+    async def _close_async_clients(tools: List[Any]) -> None:
+        """
+        Close the asynchronous clients of tools.
+        
         Args:
-            tool_type: Type of tool to create
+            tools: Tools whose asynchronous clients to close
+        """
+        for tool in tools:
+            await tool.aclose()
 
+    def create_tool(self, tool_type: str) -> Any:
+        """
+        Get the tool of the specified type, creating it on first use.
+        
+        Args:
+            tool_type: Type of tool to create
+            
         Returns:
             An instance of the requested tool type
+            
+        Raises:
+            ValueError: If an unsupported tool type is requested
+        """
+        tool = self._tools.get(tool_type)
+        if tool is None:
+            with self._tools_lock:
+                tool = self._tools.get(tool_type)
+                if tool is None:
+                    tool = self._create_tool(tool_type)
+                    self._tools[tool_type] = tool
         
+        return tool
+
+    def _create_tool(self, tool_type: str) -> Any:
+        """
+        Create a tool of the specified type.
+        
+        Args:
+            tool_type: Type of tool to create
+            
+        Returns:
+            An instance of the requested tool type
+            
         Raises:
             ValueError: If an unsupported tool type is requested
         """
@@ -62,5 +185,9 @@ class ToolFactory:
             return KeywordContextualizationTool(**config)
         elif tool_type == 'summarization':
             return SummarizationTool(**config)
+        elif tool_type == 'combined_analysis':
+            return CombinedAnalysisTool(**config)
+        elif tool_type == 'fused_analysis':
+            return FusedAnalysisTool(**config)
         else:
             raise ValueError(f"Unsupported tool type: {tool_type}")
@@ -0,0 +1,118 @@
+"""
+Dynamic Batcher Module
+
+This module provides a batcher that coalesces concurrent calls into
+batches processed by a single call.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DynamicBatcher:
+    """
+    Batcher coalescing items submitted concurrently from several threads.
+    
+    The first caller of a batch processes it on behalf of the others. When no
+    batch is being processed, an item is processed right away, so a single
+    caller does not wait. While a batch is being processed, new items are
+    collected for up to max_latency seconds, or until max_batch_size items
+    are waiting, and then processed together.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 16, max_latency: float = 0.05):
+        """
+        Initialize the dynamic batcher.
+        
+        Args:
+            process_batch: Function processing a list of items, returning
+                one result per item in the same order
+            max_batch_size: Maximum number of items processed together
+            max_latency: Maximum time in seconds to wait for more items
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        
+        self._pending: List[Tuple[Any, Future]] = []
+        self._collecting = False
+        self._active_batches = 0
+        self._batch_full = threading.Event()
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Any:
+        """
+        Process an item as part of a batch and wait for its result.
+        
+        Args:
+            item: Item to process
+            
+        Returns:
+            Result for the item
+            
+        Raises:
+            Exception: If processing the batch containing the item failed
+        """
+        future = Future()
+        
+        with self._lock:
+            self._pending.append((item, future))
+            leader = not self._collecting
+            if leader:
+                # Start a new batch, waiting for more items only while another batch is in flight
+                self._collecting = True
+                self._batch_full.clear()
+                wait = self._active_batches > 0
+            elif len(self._pending) >= self.max_batch_size:
+                self._batch_full.set()
+        
+        if leader:
+            if wait:
+                self._batch_full.wait(self.max_latency)
+            
+            with self._lock:
+                pending, self._pending = self._pending, []
+                self._collecting = False
+                self._active_batches += 1
+            
+            try:
+                for start in range(0, len(pending), self.max_batch_size):
+                    self._run(pending[start:start + self.max_batch_size])
+            finally:
+                with self._lock:
+                    self._active_batches -= 1
+                
+                # Fail the items left unresolved when processing was interrupted,
+                # such as by KeyboardInterrupt, so their callers do not wait forever
+                for _, pending_future in pending:
+                    if not pending_future.done():
+                        pending_future.set_exception(
+                            RuntimeError("Batch processing was interrupted"))
+        
+        return future.result()
+
+    def _run(self, batch: List[Tuple[Any, Future]]) -> None:
+        """
+        Process a batch and resolve the futures of its items.
+        
+        Args:
+            batch: Items to process with their futures
+        """
+        logger.debug("Processing batch of %d items", len(batch))
+        
+        try:
+            results = self.process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Expected {len(batch)} batch results, got {len(results)}")
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
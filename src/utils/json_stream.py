@@ -0,0 +1,223 @@
+"""
+JSON Stream Module
+
+This module provides incremental parsers for the items of a JSON array and
+the fields of a JSON object received in chunks, such as a streamed LLM
+response.
+"""
+
+import json
+import logging
+import re
+from typing import Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayStream:
+    """
+    Incremental parser for the object items of a JSON array.
+    
+    The array is the value of the first occurrence of a key in the text.
+    Each object or array item is parsed as soon as its closing bracket is
+    received, so items can be used before the rest of the text arrives.
+    """
+
+    def __init__(self, key: str):
+        """
+        Initialize the parser.
+        
+        Args:
+            key: Key whose array value holds the items
+        """
+        self._array_start_pattern = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+        self._buffer = ''
+        self._position = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._item_start = 0
+        self.done = False
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        Add a chunk of text and parse the items it completes.
+        
+        Args:
+            text: Next chunk of the text
+            
+        Returns:
+            Items completed by the chunk, in order
+        """
+        self._buffer += text
+        items = []
+        
+        # Find the start of the array
+        if self._position is None:
+            match = self._array_start_pattern.search(self._buffer)
+            if match is None:
+                return items
+            self._position = match.end()
+        
+        buffer = self._buffer
+        position = self._position
+        while position < len(buffer) and not self.done:
+            char = buffer[position]
+            
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if self._depth == 0:
+                    self._item_start = position
+                self._depth += 1
+            elif char in '}]':
+                if self._depth == 0:
+                    # End of the array
+                    self.done = True
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        try:
+                            items.append(json.loads(buffer[self._item_start:position + 1]))
+                        except json.JSONDecodeError:
+                            logger.warning("Skipping array item that is not valid JSON")
+            
+            position += 1
+        
+        self._position = position
+        return items
+
+
+class JsonObjectStream:
+    """
+    Incremental parser for the fields of a JSON object.
+    
+    The object starts at the first opening brace in the text. Each field is
+    parsed as soon as its value is complete, and each item of an array field
+    as soon as the item is complete, so partial results can be used before
+    the rest of the text arrives.
+    """
+
+    def __init__(self):
+        """Initialize the parser."""
+        self._buffer = ''
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+        self._array_field = False
+        self._item_start = None
+        self.done = False
+
+    def feed(self, text: str) -> List[Tuple[str, str, Any]]:
+        """
+        Add a chunk of text and parse the fields and array items it completes.
+        
+        Args:
+            text: Next chunk of the text
+            
+        Returns:
+            Events completed by the chunk, in order: ('item', key, item) for
+            an item of an array field and ('field', key, value) for a field
+        """
+        self._buffer += text
+        events = []
+        
+        buffer = self._buffer
+        position = self._position
+        while position < len(buffer) and not self.done:
+            char = buffer[position]
+            in_array = self._depth == 2 and self._array_field
+            
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._value_start is None:
+                        self._key = self._parse(buffer[self._key_start:position + 1])
+            
+            elif self._depth == 0:
+                # Skip the text before the object
+                if char == '{':
+                    self._depth = 1
+            
+            elif char.isspace():
+                pass
+            
+            elif self._depth == 1 and char == ':':
+                self._value_start = position + 1
+            
+            elif self._depth == 1 and char in ',}':
+                # End of a field, and of the object at its closing brace
+                if self._value_start is not None:
+                    value = self._parse(buffer[self._value_start:position])
+                    events.append(('field', self._key, value))
+                self._value_start = None
+                self._array_field = False
+                if char == '}':
+                    self._depth = 0
+                    self.done = True
+            
+            elif in_array and char in ',]':
+                # End of a scalar item, and of the array at its closing bracket
+                if self._item_start is not None:
+                    value = self._parse(buffer[self._item_start:position])
+                    events.append(('item', self._key, value))
+                    self._item_start = None
+                if char == ']':
+                    self._depth = 1
+            
+            else:
+                if in_array and self._item_start is None:
+                    self._item_start = position
+                
+                if char == '"':
+                    self._in_string = True
+                    if self._depth == 1 and self._value_start is None:
+                        self._key_start = position
+                elif char in '{[':
+                    if self._depth == 1:
+                        self._array_field = char == '['
+                    self._depth += 1
+                elif char in '}]':
+                    self._depth -= 1
+                    if self._depth == 2 and self._array_field:
+                        # End of an object or array item
+                        value = self._parse(buffer[self._item_start:position + 1])
+                        events.append(('item', self._key, value))
+                        self._item_start = None
+            
+            position += 1
+        
+        self._position = position
+        return events
+
+    def _parse(self, text: str) -> Any:
+        """
+        Parse a complete JSON value.
+        
+        Args:
+            text: JSON text of the value
+            
+        Returns:
+            Parsed value, or None if the text is not valid JSON
+        """
+        try:
+            return json.loads(text)
+        
+        except json.JSONDecodeError:
+            logger.warning("Skipping value that is not valid JSON")
+            return None
@@ -0,0 +1,122 @@
+"""
+LLM Batch Module
+
+This module submits requests to the batch APIs of the LLM providers, which
+process large offline jobs at half the cost of individual requests.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Union
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Interval in seconds between checks of the status of a batch
+BATCH_POLL_INTERVAL = 30.0
+
+# Time within which OpenAI completes a batch
+OPENAI_BATCH_COMPLETION_WINDOW = '24h'
+
+# Endpoint of the requests in an OpenAI batch
+OPENAI_BATCH_ENDPOINT = '/v1/chat/completions'
+
+# Statuses of an OpenAI batch that is no longer processed
+OPENAI_BATCH_FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+def run_openai_batch(
+        client: Any, bodies: Dict[str, Dict[str, Any]],
+        poll_interval: float = BATCH_POLL_INTERVAL) -> Dict[str, Union[str, Exception]]:
+    """
+    Run chat completion requests through the OpenAI Batch API.
+    
+    The requests are uploaded as a JSONL file, and the batch is polled until
+    it is no longer processed.
+    
+    Args:
+        client: OpenAI client
+        bodies: Chat completion request bodies, by custom ID
+        poll_interval: Interval in seconds between status checks
+        
+    Returns:
+        Message content of each request, or the error it failed with, by custom ID
+    """
+    lines = [
+        orjson.dumps({"custom_id": custom_id, "method": "POST",
+                      "url": OPENAI_BATCH_ENDPOINT, "body": body})
+        for custom_id, body in bodies.items()
+    ]
+    batch_file = client.files.create(file=('batch.jsonl', b'\n'.join(lines)), purpose='batch')
+    batch = client.batches.create(input_file_id=batch_file.id, endpoint=OPENAI_BATCH_ENDPOINT,
+                                  completion_window=OPENAI_BATCH_COMPLETION_WINDOW)
+    logger.info(f"Submitted OpenAI batch {batch.id} with {len(lines)} requests")
+    
+    while batch.status not in OPENAI_BATCH_FINAL_STATUSES:
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+    
+    # Requests without an output failed with the status of the batch
+    outputs: Dict[str, Union[str, Exception]] = {
+        custom_id: RuntimeError(f"OpenAI batch {batch.id} {batch.status}") for custom_id in bodies
+    }
+    
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        
+        for line in client.files.content(file_id).text.splitlines():
+            if not line:
+                continue
+            
+            entry = orjson.loads(line)
+            response = entry.get('response') or {}
+            if response.get('status_code') == 200:
+                outputs[entry['custom_id']] = response['body']['choices'][0]['message']['content']
+            else:
+                error = entry.get('error') or response.get('body', {}).get('error')
+                outputs[entry['custom_id']] = RuntimeError(f"OpenAI batch request failed: {error}")
+    
+    return outputs
+
+
+def run_anthropic_batch(
+        client: Any, params: Dict[str, Dict[str, Any]],
+        poll_interval: float = BATCH_POLL_INTERVAL) -> Dict[str, Union[Any, Exception]]:
+    """
+    Run message requests through the Anthropic Message Batches API.
+    
+    Args:
+        client: Anthropic client
+        params: Message request parameters, by custom ID
+        poll_interval: Interval in seconds between status checks
+        
+    Returns:
+        Response message content blocks of each request, or the error it
+        failed with, by custom ID
+    """
+    batch = client.messages.batches.create(
+        requests=[{"custom_id": custom_id, "params": request}
+                  for custom_id, request in params.items()]
+    )
+    logger.info(f"Submitted Anthropic batch {batch.id} with {len(params)} requests")
+    
+    while batch.processing_status != 'ended':
+        time.sleep(poll_interval)
+        batch = client.messages.batches.retrieve(batch.id)
+    
+    # Requests without a result failed with the batch
+    outputs: Dict[str, Union[Any, Exception]] = {
+        custom_id: RuntimeError(f"Anthropic batch {batch.id} returned no result")
+        for custom_id in params
+    }
+    
+    for entry in client.messages.batches.results(batch.id):
+        if entry.result.type == 'succeeded':
+            outputs[entry.custom_id] = entry.result.message.content
+        else:
+            error = getattr(entry.result, 'error', None) or entry.result.type
+            outputs[entry.custom_id] = RuntimeError(f"Anthropic batch request failed: {error}")
+    
+    return outputs
@@ -0,0 +1,340 @@
+"""
+LLM Client Module
+
+This module provides shared LLM clients for the supported providers.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Providers that get_llm_client can create clients for
+SUPPORTED_PROVIDERS = ('openai', 'anthropic', 'bedrock', 'groq')
+
+# Connection pool limits for the HTTP client shared by the API-key providers,
+# and its request timeout in seconds, which the Anthropic clients replace with
+# the longer SDK default as long Claude generations exceed it
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
+HTTP_TIMEOUT = 30.0
+
+# Whether the HTTP clients multiplex concurrent requests over HTTP/2, which
+# needs the optional h2 package
+HTTP2_ENABLED = importlib.util.find_spec('h2') is not None
+
+# Whether Bedrock is queried with the native asynchronous client of the
+# optional aioboto3 package, rather than with boto3 on worker threads
+AIOBOTO3_ENABLED = importlib.util.find_spec('aioboto3') is not None
+
+# Number of times the API-key provider clients retry a request that timed out,
+# was rate limited, or failed on the server, with exponential backoff and jitter
+LLM_MAX_RETRIES = 3
+
+# Prefixes of the OpenAI models that accept strict JSON schema response
+# formats; older OpenAI models and the Groq models only have JSON mode
+STRUCTURED_OUTPUT_MODEL_PREFIXES = ('gpt-4o', 'gpt-4.1', 'gpt-5', 'o1', 'o3', 'o4')
+
+# Client configuration for the Bedrock runtime client
+BEDROCK_CLIENT_CONFIG = {
+    'max_pool_connections': 100,
+    'retries': {'max_attempts': 3, 'mode': 'adaptive'},
+    'tcp_keepalive': True
+}
+
+
+@lru_cache(maxsize=None)
+def _get_http_client() -> Any:
+    """
+    Get the HTTP client shared by the OpenAI, Anthropic and Groq clients.
+    
+    Returns:
+        Shared HTTP client with a pooled set of keep-alive connections
+    """
+    import httpx
+    
+    limits = httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                          max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS)
+    return httpx.Client(limits=limits, timeout=HTTP_TIMEOUT, http2=HTTP2_ENABLED)
+
+
+@lru_cache(maxsize=8)
+def _create_client(provider: str, api_key: Optional[str]) -> Any:
+    """
+    Create a client for the provider.
+    
+    The provider SDK is imported here rather than at module load, so only the
+    SDK of the selected provider is loaded.
+    
+    Args:
+        provider: LLM provider ('openai', 'anthropic', 'bedrock', or 'groq')
+        api_key: API key for the provider, or None to use the environment
+        
+    Returns:
+        Client for the provider
+    """
+    logger.info(f"Creating {provider} client")
+    
+    if provider == 'bedrock':
+        import boto3
+        from botocore.config import Config
+        return boto3.client('bedrock-runtime', config=Config(**BEDROCK_CLIENT_CONFIG))
+    
+    kwargs = {'http_client': _get_http_client(), 'max_retries': LLM_MAX_RETRIES}
+    if api_key:
+        kwargs['api_key'] = api_key
+    
+    if provider == 'openai':
+        import openai
+        return openai.OpenAI(**kwargs)
+    elif provider == 'anthropic':
+        import anthropic
+        return anthropic.Anthropic(timeout=anthropic.DEFAULT_TIMEOUT, **kwargs)
+    else:
+        import groq
+        return groq.Groq(**kwargs)
+
+
+def get_llm_client(provider: str, api_key: Optional[str] = None) -> Any:
+    """
+    Get a client for the provider, shared by every caller with the same API key.
+    
+    Clients are created on first use and reuse a common connection pool, so
+    agents created for each request do not pay for new connections.
+    
+    Args:
+        provider: LLM provider ('openai', 'anthropic', 'bedrock', or 'groq')
+        api_key: API key for the provider
+        
+    Returns:
+        Client for the provider
+        
+    Raises:
+        ValueError: If the provider is not supported
+    """
+    if provider not in SUPPORTED_PROVIDERS:
+        raise ValueError(f"Unsupported provider: {provider}")
+    
+    return _create_client(provider, api_key or None)
+
+
+def close_llm_clients() -> None:
+    """
+    Close the shared clients and their connection pool.
+    
+    Clients handed out before the call must not be used afterwards; later
+    calls to get_llm_client create new ones.
+    """
+    if _get_http_client.cache_info().currsize:
+        _get_http_client().close()
+    
+    _create_client.cache_clear()
+    _get_http_client.cache_clear()
+
+
+def create_async_llm_client(provider: str, api_key: Optional[str] = None) -> Any:
+    """
+    Create an asynchronous client for the provider.
+    
+    Asynchronous clients hold connections bound to the event loop they are
+    used on, so unlike get_llm_client a new client is created for each call.
+    
+    Args:
+        provider: LLM provider ('openai', 'anthropic', 'bedrock', or 'groq')
+        api_key: API key for the provider
+        
+    Returns:
+        Asynchronous client for the provider, or None for Bedrock, whose
+        asynchronous client is created by create_async_bedrock_client
+        
+    Raises:
+        ValueError: If the provider is not supported
+    """
+    if provider not in SUPPORTED_PROVIDERS:
+        raise ValueError(f"Unsupported provider: {provider}")
+    
+    if provider == 'bedrock':
+        return None
+    
+    import httpx
+    
+    limits = httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                          max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS)
+    http_client = httpx.AsyncClient(limits=limits, timeout=HTTP_TIMEOUT, http2=HTTP2_ENABLED)
+    
+    kwargs = {'http_client': http_client, 'max_retries': LLM_MAX_RETRIES}
+    if api_key:
+        kwargs['api_key'] = api_key
+    
+    if provider == 'openai':
+        import openai
+        return openai.AsyncOpenAI(**kwargs)
+    elif provider == 'anthropic':
+        import anthropic
+        return anthropic.AsyncAnthropic(timeout=anthropic.DEFAULT_TIMEOUT, **kwargs)
+    else:
+        import groq
+        return groq.AsyncGroq(**kwargs)
+
+
+async def create_async_bedrock_client() -> Any:
+    """
+    Create an asynchronous Bedrock runtime client with aioboto3.
+    
+    The client is entered here rather than in an async with block, so it can
+    be kept for the event loop it is bound to and reuse its connection pool
+    across queries. It is closed with its close coroutine.
+    
+    Returns:
+        Asynchronous Bedrock runtime client, or None if aioboto3 is not installed
+    """
+    if not AIOBOTO3_ENABLED:
+        return None
+    
+    import aioboto3
+    from botocore.config import Config
+    
+    logger.info("Creating asynchronous bedrock client")
+    client_context = aioboto3.Session().client('bedrock-runtime',
+                                               config=Config(**BEDROCK_CLIENT_CONFIG))
+    return await client_context.__aenter__()
+
+
+async def close_async_clients(clients: List[Tuple[asyncio.AbstractEventLoop, Any]]) -> None:
+    """
+    Close asynchronous clients, each on the event loop it was created for.
+    
+    The connections of an asynchronous client are bound to its event loop, so
+    a client of the running loop is closed directly and a client of a loop
+    running on another thread is closed on that loop. A client whose loop has
+    already stopped can no longer be closed cleanly and is dropped, which is
+    why clients must be closed before their loop ends.
+    
+    Args:
+        clients: Event loops paired with the client created for them
+    """
+    running_loop = asyncio.get_running_loop()
+    for loop, client in clients:
+        if client is None:
+            continue
+        
+        try:
+            if loop is running_loop:
+                await client.close()
+            elif loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.close(), loop))
+            else:
+                logger.warning("Dropping asynchronous client whose event loop has stopped")
+        
+        except Exception as e:
+            logger.warning(f"Error closing asynchronous client: {str(e)}")
+
+
+async def stream_bedrock_text(client: Any, model: str,
+                              payload: Dict[str, Any]) -> AsyncIterator[str]:
+    """
+    Stream the text of a Bedrock response.
+    
+    boto3 has no asynchronous client, so the response stream is read on a
+    worker thread that hands each chunk to the event loop as it arrives.
+    
+    Args:
+        client: Bedrock runtime client
+        model: Model to query
+        payload: Request body for the model
+    
+    Yields:
+        Chunks of the response text, or of the input of a tool use
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stopped = threading.Event()
+
+    def read_stream():
+        try:
+            response = client.invoke_model_with_response_stream(
+                modelId=model,
+                body=orjson.dumps(payload)
+            )
+            stream = response['body']
+            try:
+                for event in stream:
+                    if stopped.is_set():
+                        break
+                    chunk = orjson.loads(event['chunk']['bytes'])
+                    
+                    # Extract the streamed text based on the model, where
+                    # Claude streams a tool use as its partial JSON input
+                    if 'claude' in model:
+                        delta = chunk.get('delta', {})
+                        text = delta.get('text') or delta.get('partial_json')
+                    else:
+                        # Generic extraction - would need to be adjusted for specific models
+                        text = chunk.get('completion')
+                    
+                    if text:
+                        loop.call_soon_threadsafe(queue.put_nowait, text)
+            finally:
+                stream.close()
+        
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        
+        # Mark the end of the stream
+        loop.call_soon_threadsafe(queue.put_nowait, None)
+    
+    reader = loop.run_in_executor(None, read_stream)
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    
+    finally:
+        # Stop reading if the caller stopped consuming the stream
+        stopped.set()
+        await reader
+
+
+def supports_structured_outputs(provider: str, model: str) -> bool:
+    """
+    Check whether a model accepts a strict JSON schema response format.
+    
+    Args:
+        provider: LLM provider ('openai', 'anthropic', 'bedrock', or 'groq')
+        model: Model name
+        
+    Returns:
+        True if the chat completion API of the model can be constrained to a schema
+    """
+    return provider == 'openai' and model.startswith(STRUCTURED_OUTPUT_MODEL_PREFIXES)
+
+
+def read_tool_use_input(content: List[Any]) -> Optional[Dict[str, Any]]:
+    """
+    Get the input of the first tool use block of an Anthropic response.
+    
+    Args:
+        content: Content blocks of the response, as SDK objects or, for
+            Bedrock, dictionaries
+            
+    Returns:
+        Input of the tool use block, or None if the response has none
+    """
+    for block in content:
+        if isinstance(block, dict):
+            if block.get('type') == 'tool_use':
+                return block.get('input')
+        elif getattr(block, 'type', None) == 'tool_use':
+            return block.input
+    
+    return None
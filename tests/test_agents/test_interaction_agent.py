@@ -8,7 +8,7 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
-from src.agents.interaction_agent import InteractionAgent
+from src.agents.interaction_agent import InteractionAgent, TOOL_SCHEMA
 
 
 class TestInteractionAgent:
@@ -22,7 +22,9 @@ class TestInteractionAgent:
         # Create a mock response for the LLM
         self.mock_response = MagicMock()
         self.mock_response.choices = [MagicMock()]
-        self.mock_response.choices[0].message.content = json.dumps(["sentiment_analysis", "summarization"])
+        self.mock_response.choices[0].message.content = json.dumps(
+            {"tools": ["sentiment_analysis", "summarization"]}
+        )
         
         # Create the interaction agent with the mock client
         with patch('openai.OpenAI', return_value=self.mock_client):
@@ -66,6 +68,70 @@ class TestInteractionAgent:
         
         # Check the result
         assert result == input_data  # Guardrails should not modify the input in this case
+        assert result is input_data  # Unmodified input should not be copied
+
+    def test_detect_pii(self, caplog):
+        """Test the _detect_and_redact_pii method."""
+        # Create a test input containing PII
+        input_data = {
+            'feedback_id': '12345',
+            'feedback_text': 'Contact me at john@example.com, my SSN is 123-45-6789.'
+        }
+        
+        # Detect PII
+        result, redacted = self.agent._detect_and_redact_pii(input_data)
+        
+        # Check the result
+        assert result is input_data
+        assert not redacted
+        assert 'Potential PII detected in feedback: email' in caplog.text
+        assert 'Potential PII detected in feedback: ssn' in caplog.text
+        assert 'Potential PII detected in feedback: ssn_keyword' in caplog.text
+        assert 'credit_card' not in caplog.text
+
+    def test_detect_pii_validates_card_numbers(self, caplog):
+        """Test that card number candidates are only reported when they pass the Luhn check."""
+        # Detect PII in text with an invalid card number
+        self.agent._detect_and_redact_pii({'feedback_text': 'Order 1234567812345678 is late.'})
+        assert 'Potential PII detected in feedback: credit_card' not in caplog.text
+        
+        # Detect PII in text with a valid card number
+        self.agent._detect_and_redact_pii({'feedback_text': 'Charge 4111111111111111 twice.'})
+        assert 'Potential PII detected in feedback: credit_card' in caplog.text
+        
+        # Detect PII in text with a valid 15-digit card number
+        caplog.clear()
+        self.agent._detect_and_redact_pii({'feedback_text': 'Refund to 378282246310005 please.'})
+        assert 'Potential PII detected in feedback: credit_card' in caplog.text
+
+    def test_detect_pii_finds_phone_numbers(self, caplog):
+        """Test that phone numbers in common formats are reported as PII."""
+        for text in ('Call me at 555-123-4567.', 'My number is (555) 123-4567.',
+                     'Reach me on +1 555 123 4567 tomorrow.'):
+            caplog.clear()
+            self.agent._detect_and_redact_pii({'feedback_text': text})
+            assert 'Potential PII detected in feedback: phone' in caplog.text
+        
+        # Check that social security numbers are not mistaken for phone numbers
+        caplog.clear()
+        self.agent._detect_and_redact_pii({'feedback_text': 'My SSN is 123-45-6789.'})
+        assert 'phone' not in caplog.text
+
+    def test_filter_prohibited_content(self, caplog):
+        """Test the _filter_prohibited_content method with overlapping topics."""
+        self.agent.guardrails['prohibited_topics'] = ['Harmful', 'harmful content',
+                                                      'illegal activities']
+        input_data = {'feedback_text': 'This review contains HARMFUL CONTENT.'}
+        
+        # Filter prohibited content
+        result, filtered = self.agent._filter_prohibited_content(input_data)
+        
+        # Check the result
+        assert result is input_data
+        assert not filtered
+        assert 'Prohibited topic detected: Harmful' in caplog.text
+        assert 'Prohibited topic detected: harmful content' in caplog.text
+        assert 'illegal activities' not in caplog.text
 
     def test_determine_tools_with_instructions(self):
         """Test the _determine_tools method with instructions."""
@@ -78,7 +144,9 @@ class TestInteractionAgent:
         }
         
         # Set up the mock response
-        self.mock_response.choices[0].message.content = json.dumps(["sentiment_analysis", "summarization"])
+        self.mock_response.choices[0].message.content = json.dumps(
+            {"tools": ["sentiment_analysis", "summarization"]}
+        )
         
         # Determine tools with instructions
         tools = self.agent._determine_tools('Focus on identifying the sentiment and summarizing actionable insights.', input_data)
@@ -88,6 +156,47 @@ class TestInteractionAgent:
         assert 'sentiment_analysis' in tools
         assert 'summarization' in tools
 
+    def test_determine_tools_caches_llm_selection(self):
+        """Test that the LLM is queried once for repeated instructions."""
+        instructions = 'Focus on what matters most to the customer.'
+        
+        # Determine tools twice with the same instructions but different feedback
+        first = self.agent._determine_tools(instructions, {'feedback_text': 'Great product.'})
+        second = self.agent._determine_tools(instructions, {'feedback_text': 'Late delivery.'})
+        
+        # Check that the cached selection was reused
+        assert first == second == ['sentiment_analysis', 'summarization']
+        self.agent.client.chat.completions.create.assert_called_once()
+
+    def test_determine_tools_from_keywords(self):
+        """Test that unambiguous instructions select tools without querying the LLM."""
+        input_data = {
+            'feedback_id': '12345',
+            'feedback_text': 'The product is great, but the delivery was delayed.'
+        }
+        
+        # Determine tools with instructions naming the tools
+        tools = self.agent._determine_tools('Categorize the topics and extract keywords.',
+                                            input_data)
+        
+        # Check the result
+        assert tools == ['topic_categorization', 'keyword_contextualization']
+        self.agent.client.chat.completions.create.assert_not_called()
+
+    def test_determine_tools_with_negated_instructions(self):
+        """Test that instructions with negations are interpreted by the LLM."""
+        input_data = {
+            'feedback_id': '12345',
+            'feedback_text': 'The product is great, but the delivery was delayed.'
+        }
+        
+        # Determine tools with instructions excluding a tool
+        tools = self.agent._determine_tools('Do everything except the summary.', input_data)
+        
+        # Check that the LLM was queried
+        self.agent.client.chat.completions.create.assert_called_once()
+        assert tools == ['sentiment_analysis', 'summarization']
+
     def test_determine_tools_without_instructions(self):
         """Test the _determine_tools method without instructions."""
         # Create a test input
@@ -111,7 +220,9 @@ class TestInteractionAgent:
     def test_query_llm_for_tool_selection(self):
         """Test the _query_llm_for_tool_selection method."""
         # Set up the mock response
-        self.mock_response.choices[0].message.content = json.dumps(["sentiment_analysis", "summarization"])
+        self.mock_response.choices[0].message.content = json.dumps(
+            {"tools": ["sentiment_analysis", "summarization"]}
+        )
         
         # Query the LLM for tool selection
         tools = self.agent._query_llm_for_tool_selection('Test prompt')
@@ -124,8 +235,50 @@ class TestInteractionAgent:
         # Check that the LLM was called with the correct arguments
         self.agent.client.chat.completions.create.assert_called_once()
         call_args = self.agent.client.chat.completions.create.call_args[1]
-        assert call_args['model'] == 'gpt-4'
+        assert call_args['model'] == 'gpt-4o-mini'
         assert len(call_args['messages']) == 2
         assert call_args['messages'][0]['role'] == 'system'
         assert call_args['messages'][1]['role'] == 'user'
         assert call_args['messages'][1]['content'] == 'Test prompt'
+        assert call_args['response_format']['json_schema']['schema'] == TOOL_SCHEMA
+
+    def test_query_llm_for_tool_selection_in_json_mode_on_groq(self):
+        """Test that a router model without structured outputs is only asked for a JSON object."""
+        self.agent.provider = 'groq'
+        self.agent.router_model = 'llama-3.1-8b-instant'
+        self.mock_response.choices[0].message.content = json.dumps({"tools": ["summarization"]})
+        
+        # Query the LLM for tool selection
+        tools = self.agent._query_llm_for_tool_selection('Test prompt')
+        
+        # Check that JSON mode was requested instead of the schema
+        assert tools == ['summarization']
+        call_args = self.agent.client.chat.completions.create.call_args[1]
+        assert call_args['response_format'] == {"type": "json_object"}
+
+    def test_query_llm_for_tool_selection_bedrock_stream(self):
+        """Test that the Bedrock tool selection stops reading once the JSON is complete."""
+        self.agent.provider = 'bedrock'
+        self.agent.router_model = 'anthropic.claude-3-haiku-20240307-v1:0'
+        
+        # Set up a stream whose tool input arrives in pieces
+        chunks = [
+            {'type': 'content_block_start', 'content_block': {'type': 'tool_use', 'input': {}}},
+            {'type': 'content_block_delta',
+             'delta': {'type': 'input_json_delta', 'partial_json': '{"tools": ["sent'}},
+            {'type': 'content_block_delta',
+             'delta': {'type': 'input_json_delta', 'partial_json': 'iment_analysis"]}'}},
+            {'type': 'content_block_stop'}
+        ]
+        events = iter([{'chunk': {'bytes': json.dumps(chunk).encode()}} for chunk in chunks])
+        stream = MagicMock()
+        stream.__iter__.return_value = events
+        self.agent.client.invoke_model_with_response_stream.return_value = {'body': stream}
+        
+        # Query the LLM for tool selection
+        tools = self.agent._query_llm_for_tool_selection('Test prompt')
+        
+        # Check the result
+        assert tools == ['sentiment_analysis']
+        assert next(events)['chunk']['bytes'] == json.dumps(chunks[-1]).encode()
+        stream.close.assert_called_once()
@@ -2,13 +2,19 @@
 Tests for the Tool Agent Module
 """
 
+import asyncio
 import json
+import logging
+import threading
+import time
 import unittest
-from unittest.mock import patch, MagicMock
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock, AsyncMock
 
 import pytest
 
 from src.agents.tool_agent import ToolAgent
+from src.tools.base_llm_tool import LIGHT_MODELS
 
 
 class TestToolAgent:
@@ -18,6 +24,7 @@ class TestToolAgent:
         """Set up the test environment."""
         # Create mock objects
         self.mock_tool_factory = MagicMock()
+        self.mock_tool_factory.close_async_clients = AsyncMock()
         self.mock_cache_manager = MagicMock()
         self.mock_sentiment_tool = MagicMock()
         self.mock_summarization_tool = MagicMock()
@@ -55,7 +62,7 @@ class TestToolAgent:
         # Create the tool agent with the mock objects
         with patch('src.tools.tool_factory.ToolFactory', return_value=self.mock_tool_factory):
             with patch('src.cache.cache_manager.CacheManager', return_value=self.mock_cache_manager):
-                self.agent = ToolAgent(provider='openai', model='gpt-4')
+                self.agent = ToolAgent(provider='openai', model='gpt-4', api_key='test-key')
                 self.agent.tool_factory = self.mock_tool_factory
                 self.agent.cache_manager = self.mock_cache_manager
 
@@ -91,6 +98,149 @@ class TestToolAgent:
         # Check that the cache was checked and set
         self.mock_cache_manager.get.assert_called_once()
         self.mock_cache_manager.set.assert_called_once()
+        
+        # Check that the asynchronous clients were closed before the event loop of the request ended
+        self.mock_tool_factory.close_async_clients.assert_awaited_once()
+
+    def test_process_request_within_running_event_loop(self):
+        """Test that process_request can be called while an event loop is running."""
+        self.mock_cache_manager.get.return_value = None
+        input_data = {'feedback_id': '12345', 'feedback_text': 'The delivery was delayed.'}
+        
+        async def call_from_running_loop():
+            return self.agent.process_request(input_data, ['sentiment_analysis'])
+        
+        # Process the request from a coroutine, as a notebook or an asynchronous handler would
+        result = asyncio.run(call_from_running_loop())
+        
+        # Check that the request was processed and the clients of its loop closed
+        assert result['results']['sentiment_analysis']['overall_sentiment'] == 'positive'
+        self.mock_sentiment_tool.execute.assert_called_once_with(input_data)
+        self.mock_tool_factory.close_async_clients.assert_awaited_once()
+
+    def test_process_request_with_tool_error(self):
+        """Test that a failing tool does not prevent the other tools from running."""
+        # Configure the cache manager to return None (cache miss)
+        self.mock_cache_manager.get.return_value = None
+        
+        # Configure the sentiment tool to fail
+        self.mock_sentiment_tool.execute.side_effect = ValueError('LLM unavailable')
+        
+        # Create a test input
+        input_data = {
+            'feedback_id': '12345',
+            'feedback_text': 'The product is great, but the delivery was delayed.'
+        }
+        
+        # Process the request
+        result = self.agent.process_request(input_data, ['sentiment_analysis', 'summarization'])
+        
+        # Check the result
+        assert list(result['results']) == ['sentiment_analysis', 'summarization']
+        assert result['results']['sentiment_analysis'] == {'error': 'LLM unavailable'}
+        assert 'summary' in result['results']['summarization']
+
+    def test_process_request_combines_keywords_and_sentiment(self):
+        """Test that keywords and sentiment are requested from the combined analysis tool."""
+        self.mock_cache_manager.get.return_value = None
+        mock_combined_tool = MagicMock()
+        mock_combined_tool.execute.return_value = {
+            'keywords': [{'keyword': 'delivery', 'relevance': 0.9, 'context': 'Late delivery.'}],
+            'sentiment': {'overall_sentiment': 'negative'}
+        }
+        self.mock_tool_factory.create_tool.side_effect = lambda tool_type: {
+            'combined_analysis': mock_combined_tool,
+            'summarization': self.mock_summarization_tool
+        }.get(tool_type)
+        
+        # Process a request for keywords, sentiment, and a summary
+        input_data = {'feedback_id': '12345', 'feedback_text': 'The delivery was late.'}
+        tools = ['keyword_contextualization', 'summarization', 'sentiment_analysis']
+        result = self.agent.process_request(input_data, tools)
+        
+        # Check that one combined query provided both results, in the requested order
+        mock_combined_tool.execute.assert_called_once_with(input_data)
+        assert list(result['results']) == tools
+        keywords = result['results']['keyword_contextualization']['keywords']
+        assert keywords[0]['keyword'] == 'delivery'
+        assert result['results']['sentiment_analysis'] == {'overall_sentiment': 'negative'}
+
+    def test_process_request_fuses_all_analyses(self):
+        """Test that all four analyses are requested from the fused analysis tool."""
+        self.mock_cache_manager.get.return_value = None
+        mock_fused_tool = MagicMock()
+        mock_fused_tool.execute.return_value = {
+            'keywords': [{'keyword': 'delivery', 'relevance': 0.9, 'context': 'Late delivery.'}],
+            'sentiment': {'overall_sentiment': 'negative'},
+            'topics': {'primary_topic': 'Delivery', 'topics': {'Delivery': 0.9},
+                       'explanation': 'Late delivery.'},
+            'summary': 'The delivery was late.',
+            'recommendations': ['Ship faster'],
+            'key_points': ['Late delivery']
+        }
+        self.mock_tool_factory.create_tool.side_effect = lambda tool_type: {
+            'fused_analysis': mock_fused_tool
+        }.get(tool_type)
+        
+        # Process a request for every analysis
+        input_data = {'feedback_id': '12345', 'feedback_text': 'The delivery was late.'}
+        tools = ['summarization', 'sentiment_analysis', 'topic_categorization',
+                 'keyword_contextualization']
+        result = self.agent.process_request(input_data, tools)
+        
+        # Check that one fused query provided every result, in the requested order
+        mock_fused_tool.execute.assert_called_once_with(input_data)
+        assert list(result['results']) == tools
+        assert result['results']['summarization'] == {
+            'summary': 'The delivery was late.',
+            'recommendations': ['Ship faster'],
+            'key_points': ['Late delivery']
+        }
+        assert result['results']['topic_categorization']['primary_topic'] == 'Delivery'
+        assert result['results']['sentiment_analysis'] == {'overall_sentiment': 'negative'}
+        keywords = result['results']['keyword_contextualization']['keywords']
+        assert keywords[0]['keyword'] == 'delivery'
+
+    def test_process_request_coalesces_identical_requests(self, caplog):
+        """Test that concurrent identical requests execute the tools only once."""
+        # Configure the cache manager to return None (cache miss)
+        self.mock_cache_manager.get.return_value = None
+        
+        # Block the sentiment tool until both requests have been submitted
+        started = threading.Event()
+        release = threading.Event()
+        
+        def execute(input_data):
+            started.set()
+            release.wait(5)
+            return {'overall_sentiment': 'positive'}
+        
+        self.mock_sentiment_tool.execute.side_effect = execute
+        
+        # Create a test input
+        input_data = {
+            'feedback_id': '12345',
+            'feedback_text': 'The product is great, but the delivery was delayed.'
+        }
+        
+        # Process the same request from two threads
+        caplog.set_level(logging.DEBUG)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(self.agent.process_request, input_data, ['sentiment_analysis'])
+            started.wait(5)
+            second = executor.submit(self.agent.process_request, input_data, ['sentiment_analysis'])
+            
+            # Wait until the second request is waiting on the first one
+            while 'Waiting for in-flight request' not in caplog.text:
+                time.sleep(0.01)
+            release.set()
+            
+            results = [first.result(5), second.result(5)]
+        
+        # Check that the tool was executed once and both requests got the result
+        self.mock_sentiment_tool.execute.assert_called_once_with(input_data)
+        assert results[0] == results[1]
+        assert results[0]['results']['sentiment_analysis'] == {'overall_sentiment': 'positive'}
 
     def test_process_request_with_cache(self):
         """Test the process_request method with cache."""
@@ -146,6 +296,30 @@ class TestToolAgent:
         self.mock_cache_manager.get.assert_called_once()
         self.mock_cache_manager.set.assert_not_called()
 
+    def test_process_requests_batches_cache_access(self):
+        """Test that a batch of requests is looked up and cached together."""
+        requests = [
+            ({'feedback_id': '1', 'feedback_text': 'Great product.'}, ['sentiment_analysis']),
+            ({'feedback_id': '2', 'feedback_text': 'Late delivery.'}, ['summarization'])
+        ]
+        cached_key = self.agent._generate_cache_key(*requests[0])
+        missed_key = self.agent._generate_cache_key(*requests[1])
+        cached_result = {'feedback_id': '1',
+                         'results': {'sentiment_analysis': {'overall_sentiment': 'positive'}}}
+        self.mock_cache_manager.get_many.return_value = {cached_key: cached_result}
+        
+        # Process the batch
+        results = self.agent.process_requests(requests)
+        
+        # Check that only the miss was executed and cached in one batch
+        assert results[0] == cached_result
+        summary = self.mock_summarization_tool.execute.return_value
+        assert results[1]['results']['summarization'] == summary
+        self.mock_sentiment_tool.execute.assert_not_called()
+        self.mock_cache_manager.get.assert_not_called()
+        self.mock_cache_manager.get_many.assert_called_once_with([cached_key, missed_key])
+        self.mock_cache_manager.set_many.assert_called_once_with({missed_key: results[1]})
+
     def test_generate_cache_key(self):
         """Test the _generate_cache_key method."""
         # Create a test input
@@ -176,3 +350,27 @@ class TestToolAgent:
         
         # Check that the keys are different
         assert key1 != key3
+
+    def test_tools_cascade_only_without_explicit_model(self):
+        """Test that the tools of the agent analyze short texts with a lighter model by default."""
+        # Create agents with the default model and with an explicitly chosen one
+        with patch('src.agents.tool_agent.get_llm_client'), \
+                patch('src.tools.base_llm_tool.get_llm_client'):
+            default_agent = ToolAgent(provider='openai', use_cache=False)
+            explicit_agent = ToolAgent(provider='openai', model='gpt-4o', use_cache=False)
+            default_tool = default_agent.tool_factory.create_tool('summarization')
+            explicit_tool = explicit_agent.tool_factory.create_tool('summarization')
+        
+        # Check that only the tool of the default agent cascades short texts
+        assert default_agent.model == 'gpt-4o'
+        assert default_tool._select_model(['Too expensive.']) == LIGHT_MODELS['openai']
+        assert default_tool._select_model(['x' * 2000]) == 'gpt-4o'
+        assert explicit_tool._select_model(['Too expensive.']) == 'gpt-4o'
+
+    def test_generate_cache_key_with_null_fields(self):
+        """Test that null input fields hash like missing ones."""
+        key = self.agent._generate_cache_key({'feedback_text': None, 'instructions': None},
+                                             ['sentiment_analysis'])
+        
+        # Check that the key matches that of an input without the fields
+        assert key == self.agent._generate_cache_key({}, ['sentiment_analysis'])
@@ -8,6 +8,7 @@ import unittest
 from unittest.mock import patch, MagicMock, call
 
 import boto3
+import orjson
 import pytest
 from botocore.exceptions import ClientError
 
@@ -25,7 +26,7 @@ class TestCloudWatchLogger:
         
         # Create the CloudWatch logger with the mock clients
         with patch('boto3.client') as mock_boto3_client:
-            mock_boto3_client.side_effect = lambda service, region_name: {
+            mock_boto3_client.side_effect = lambda service, **kwargs: {
                 'cloudwatch': self.mock_cloudwatch,
                 'logs': self.mock_logs
             }.get(service)
@@ -86,6 +87,26 @@ class TestCloudWatchLogger:
             logStreamName=self.logger.log_stream
         )
 
+    def test_ensure_log_destination_exists_once(self):
+        """Test that the log group and stream are created once for all loggers."""
+        with patch('boto3.client', return_value=self.mock_logs):
+            loggers = [CloudWatchLogger(log_group='/test/once', log_stream='stream')
+                       for _ in range(2)]
+        
+        # Check that creating the loggers made no API calls
+        self.mock_logs.create_log_group.assert_not_called()
+        
+        # Ensure the destination exists from both loggers
+        for cloudwatch_logger in loggers:
+            cloudwatch_logger._ensure_log_destination_exists()
+        
+        # Check that the log group and stream were only created once
+        self.mock_logs.create_log_group.assert_called_once_with(logGroupName='/test/once')
+        self.mock_logs.create_log_stream.assert_called_once_with(
+            logGroupName='/test/once',
+            logStreamName='stream'
+        )
+
     def test_log_metric(self):
         """Test the log_metric method."""
         # Create test data
@@ -97,6 +118,10 @@ class TestCloudWatchLogger:
         # Call the method
         self.logger.log_metric(metric_name, value, dimensions, unit)
         
+        # Check that the metric is buffered until flushed
+        self.mock_cloudwatch.put_metric_data.assert_not_called()
+        self.logger.flush()
+        
         # Check that the CloudWatch client was called
         self.mock_cloudwatch.put_metric_data.assert_called_once()
         
@@ -109,26 +134,32 @@ class TestCloudWatchLogger:
         assert call_args['MetricData'][0]['Unit'] == unit
         assert call_args['MetricData'][0]['Dimensions'] == dimensions
 
+    def test_log_metric_flushes_full_batch(self):
+        """Test that log_metric sends the buffered metrics once the batch is full."""
+        # Fill the batch
+        for i in range(self.logger.metric_batch_size):
+            self.logger.log_metric('TestMetric', float(i))
+        
+        # Check that the batch was sent in a single request
+        self.mock_cloudwatch.put_metric_data.assert_called_once()
+        call_args = self.mock_cloudwatch.put_metric_data.call_args[1]
+        assert len(call_args['MetricData']) == self.logger.metric_batch_size
+
     def test_log_event(self):
         """Test the log_event method."""
         # Create test data
         event_data = {'test': 'data'}
         log_level = 'INFO'
         
-        # Configure the mock to return a sequence token
-        self.mock_logs.describe_log_streams.return_value = {
-            'logStreams': [{'uploadSequenceToken': '123456'}]
-        }
-        
         # Call the method
         self.logger.log_event(event_data, log_level)
         
-        # Check that the logs client was called
-        self.mock_logs.describe_log_streams.assert_called_once_with(
-            logGroupName=self.logger.log_group,
-            logStreamNamePrefix=self.logger.log_stream
-        )
+        # Check that the event is buffered until flushed
+        self.mock_logs.put_log_events.assert_not_called()
+        self.logger.flush()
         
+        # Check that the logs client was called without a sequence token
+        self.mock_logs.describe_log_streams.assert_not_called()
         self.mock_logs.put_log_events.assert_called_once()
         
         # Check the arguments
@@ -136,38 +167,42 @@ class TestCloudWatchLogger:
         assert call_args['logGroupName'] == self.logger.log_group
         assert call_args['logStreamName'] == self.logger.log_stream
         assert len(call_args['logEvents']) == 1
-        assert call_args['logEvents'][0]['message'] == f"[{log_level}] {json.dumps(event_data)}"
-        assert call_args['sequenceToken'] == '123456'
+        message = f"[{log_level}] {orjson.dumps(event_data).decode()}"
+        assert call_args['logEvents'][0]['message'] == message
+        assert 'sequenceToken' not in call_args
 
-    def test_log_event_no_sequence_token(self):
-        """Test the log_event method when there is no sequence token."""
-        # Create test data
-        event_data = {'test': 'data'}
-        log_level = 'INFO'
-        
-        # Configure the mock to return no sequence token
-        self.mock_logs.describe_log_streams.return_value = {
-            'logStreams': [{}]
-        }
-        
-        # Call the method
-        self.logger.log_event(event_data, log_level)
-        
-        # Check that the logs client was called
-        self.mock_logs.describe_log_streams.assert_called_once_with(
-            logGroupName=self.logger.log_group,
-            logStreamNamePrefix=self.logger.log_stream
-        )
+    def test_log_event_batches_events(self):
+        """Test that buffered events are sent in a single request."""
+        # Log several events
+        self.logger.log_event({'test': 'data1'})
+        self.logger.log_event({'test': 'data2'}, 'ERROR')
+        self.logger.flush()
         
+        # Check that both events were sent together
         self.mock_logs.put_log_events.assert_called_once()
+        log_events = self.mock_logs.put_log_events.call_args[1]['logEvents']
+        assert [event['message'] for event in log_events] == [
+            f"[INFO] {orjson.dumps({'test': 'data1'}).decode()}",
+            f"[ERROR] {orjson.dumps({'test': 'data2'}).decode()}"
+        ]
+
+    def test_log_event_missing_log_stream(self):
+        """Test that the log stream is recreated when it is missing."""
+        # Configure the mock to fail once with a ResourceNotFoundException
+        self.mock_logs.put_log_events.side_effect = [
+            ClientError({'Error': {'Code': 'ResourceNotFoundException'}}, 'PutLogEvents'),
+            {}
+        ]
+        self.logger._ensure_log_destination_exists()
+        self.mock_logs.create_log_stream.reset_mock()
         
-        # Check the arguments
-        call_args = self.mock_logs.put_log_events.call_args[1]
-        assert call_args['logGroupName'] == self.logger.log_group
-        assert call_args['logStreamName'] == self.logger.log_stream
-        assert len(call_args['logEvents']) == 1
-        assert call_args['logEvents'][0]['message'] == f"[{log_level}] {json.dumps(event_data)}"
-        assert 'sequenceToken' not in call_args
+        # Log an event
+        self.logger.log_event({'test': 'data'})
+        self.logger.flush()
+        
+        # Check that the stream was created and the events were sent again
+        self.mock_logs.create_log_stream.assert_called_once()
+        assert self.mock_logs.put_log_events.call_count == 2
 
     def test_log_cache_metrics(self):
         """Test the log_cache_metrics method."""
@@ -181,15 +216,16 @@ class TestCloudWatchLogger:
         
         # Call the method
         self.logger.log_cache_metrics(cache_metrics)
+        self.logger.flush()
         
-        # Check that the CloudWatch client was called
-        assert self.mock_cloudwatch.put_metric_data.call_count == 5  # 4 metrics + hit ratio
+        # Check that the CloudWatch client was called once for all metrics
+        self.mock_cloudwatch.put_metric_data.assert_called_once()
+        metric_data = self.mock_cloudwatch.put_metric_data.call_args[1]['MetricData']
+        assert len(metric_data) == 5  # 4 metrics + hit ratio
         
         # Check that the hit ratio was calculated correctly
-        hit_ratio_call = self.mock_cloudwatch.put_metric_data.call_args_list[4]
-        hit_ratio_args = hit_ratio_call[1]
-        assert hit_ratio_args['MetricData'][0]['MetricName'] == 'CacheHitRatio'
-        assert hit_ratio_args['MetricData'][0]['Value'] == 10 / (10 + 5)  # hits / (hits + misses)
+        assert metric_data[4]['MetricName'] == 'CacheHitRatio'
+        assert metric_data[4]['Value'] == 10 / (10 + 5)  # hits / (hits + misses)
 
     def test_log_tool_execution(self):
         """Test the log_tool_execution method."""
@@ -200,24 +236,23 @@ class TestCloudWatchLogger:
         
         # Call the method
         self.logger.log_tool_execution(tool_name, execution_time, success)
+        self.logger.flush()
         
-        # Check that the CloudWatch client was called
-        assert self.mock_cloudwatch.put_metric_data.call_count == 2
+        # Check that the CloudWatch client was called once for both metrics
+        self.mock_cloudwatch.put_metric_data.assert_called_once()
+        metric_data = self.mock_cloudwatch.put_metric_data.call_args[1]['MetricData']
+        assert len(metric_data) == 2
         
         # Check the execution time metric
-        execution_time_call = self.mock_cloudwatch.put_metric_data.call_args_list[0]
-        execution_time_args = execution_time_call[1]
-        assert execution_time_args['MetricData'][0]['MetricName'] == 'ToolExecutionTime'
-        assert execution_time_args['MetricData'][0]['Value'] == execution_time
-        assert execution_time_args['MetricData'][0]['Unit'] == 'Seconds'
-        assert execution_time_args['MetricData'][0]['Dimensions'] == [{'Name': 'ToolName', 'Value': tool_name}]
+        assert metric_data[0]['MetricName'] == 'ToolExecutionTime'
+        assert metric_data[0]['Value'] == execution_time
+        assert metric_data[0]['Unit'] == 'Seconds'
+        assert metric_data[0]['Dimensions'] == [{'Name': 'ToolName', 'Value': tool_name}]
         
         # Check the success metric
-        success_call = self.mock_cloudwatch.put_metric_data.call_args_list[1]
-        success_args = success_call[1]
-        assert success_args['MetricData'][0]['MetricName'] == 'ToolExecutionSuccess'
-        assert success_args['MetricData'][0]['Value'] == 1.0
-        assert success_args['MetricData'][0]['Dimensions'] == [{'Name': 'ToolName', 'Value': tool_name}]
+        assert metric_data[1]['MetricName'] == 'ToolExecutionSuccess'
+        assert metric_data[1]['Value'] == 1.0
+        assert metric_data[1]['Dimensions'] == [{'Name': 'ToolName', 'Value': tool_name}]
 
     def test_log_llm_decision(self):
         """Test the log_llm_decision method."""
@@ -228,9 +263,10 @@ class TestCloudWatchLogger:
         
         # Call the method
         self.logger.log_llm_decision(decision_type, decision, confidence)
+        self.logger.flush()
         
         # Check that the logs client was called
-        self.mock_logs.describe_log_streams.assert_called_once()
+        self.mock_logs.describe_log_streams.assert_not_called()
         self.mock_logs.put_log_events.assert_called_once()
         
         # Check that the CloudWatch client was called
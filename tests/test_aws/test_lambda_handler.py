@@ -8,7 +8,9 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
-from src.aws.lambda_handler import lambda_handler
+from src.aws.lambda_handler import (
+    lambda_handler, lambda_url_handler, get_agents, process_single_feedback, process_feedback_batch
+)
 
 
 class TestLambdaHandler:
@@ -199,3 +201,171 @@ class TestLambdaHandler:
         # Check that the interaction agent was called but not the tool agent
         self.mock_interaction_agent.process_input.assert_called_once()
         self.mock_tool_agent.process_request.assert_not_called()
+
+    def test_get_agents_reuses_agents(self):
+        """Test that agents are only created once for the same configuration."""
+        agent_config = {'provider': 'openai', 'cache_config': {'cache_type': 'memory', 'ttl': 60}}
+        
+        with patch('src.aws.lambda_handler.AgentFactory', self.mock_agent_factory):
+            self.mock_agent_factory.create_agent.side_effect = lambda agent_type, config: {
+                'interaction': self.mock_interaction_agent,
+                'tool': self.mock_tool_agent
+            }.get(agent_type)
+            
+            first = get_agents(agent_config)
+            second = get_agents(dict(agent_config))
+        
+        # Check that the agents were created once and reused
+        assert first == second == (self.mock_interaction_agent, self.mock_tool_agent)
+        assert self.mock_agent_factory.create_agent.call_count == 2
+
+    def test_process_single_feedback_reuses_processed_feedback(self):
+        """Test that feedback with already processed content skips the agents."""
+        config = {'agent_config': {'provider': 'openai',
+                                   'cache_config': {'cache_type': 'memory', 'ttl': 61}}}
+        feedback = {
+            'feedback_id': '12345',
+            'feedback_text': 'The product is great, but the delivery was delayed.',
+            'timestamp': '2025-01-10T10:30:00Z'
+        }
+        
+        with patch('src.aws.lambda_handler.get_agents',
+                   return_value=(self.mock_interaction_agent, self.mock_tool_agent)):
+            first = process_single_feedback(feedback, config)
+            second = process_single_feedback(
+                {**feedback, 'feedback_id': '67890', 'timestamp': '2025-01-11T10:30:00Z'}, config
+            )
+        
+        # Check that the agents only ran for the first entry
+        self.mock_interaction_agent.process_input.assert_called_once()
+        self.mock_tool_agent.process_request.assert_called_once()
+        assert second['feedback_id'] == '67890'
+        assert second['results'] == first['results']
+
+    def test_lambda_url_handler_encodes_response_once(self):
+        """Test that the lambda_url_handler function processes the parsed body directly."""
+        # Create a URL event whose body has an invalid format
+        event = {'body': json.dumps({'customer_name': 'John Doe'})}
+        
+        # Call the URL handler
+        with patch('src.aws.lambda_handler.lambda_handler') as mock_lambda_handler:
+            response = lambda_url_handler(event, {})
+        
+        # Check that the main handler was bypassed and the response was encoded with headers
+        mock_lambda_handler.assert_not_called()
+        assert response['statusCode'] == 400
+        assert response['headers'] == {'Content-Type': 'application/json'}
+        assert json.loads(response['body']) == {'error': 'Invalid event format'}
+
+    def test_lambda_handler_async_fanout(self):
+        """Test that SQS records are queued for asynchronous invocations when fan-out is enabled."""
+        # Create a test event with one valid and one invalid record
+        event = {
+            'Records': [
+                {'messageId': 'm1',
+                 'body': json.dumps({'feedback_id': '12345', 'feedback_text': 'Great product!'})},
+                {'messageId': 'm2', 'body': 'not json'}
+            ]
+        }
+        context = MagicMock(function_name='feedback-processor')
+        mock_lambda_client = MagicMock()
+        
+        # Call the lambda handler with fan-out enabled
+        with patch('src.aws.lambda_handler.ASYNC_FANOUT', True), \
+             patch('src.aws.lambda_handler._get_lambda_client', return_value=mock_lambda_client):
+            response = lambda_handler(event, context)
+        
+        # Check that only the valid record was queued
+        assert response['statusCode'] == 202
+        results = json.loads(response['body'])['results']
+        assert results[0] == {'status': 'queued'}
+        assert results[1] == {'error': 'Invalid JSON in record'}
+        assert response['batchItemFailures'] == []
+        mock_lambda_client.invoke.assert_called_once()
+        call_args = mock_lambda_client.invoke.call_args[1]
+        assert call_args['FunctionName'] == 'feedback-processor'
+        assert call_args['InvocationType'] == 'Event'
+        assert json.loads(call_args['Payload'])['feedback']['feedback_id'] == '12345'
+        
+        # Check that the agents were not called
+        self.mock_interaction_agent.process_input.assert_not_called()
+
+    def test_lambda_handler_async_fanout_reports_records_not_queued(self):
+        """Test that records whose invocation failed are reported to SQS for a retry."""
+        event = {
+            'Records': [
+                {'messageId': 'm1',
+                 'body': json.dumps({'feedback_id': '12345', 'feedback_text': 'Great!'})},
+                {'messageId': 'm2',
+                 'body': json.dumps({'feedback_id': '67890', 'feedback_text': 'Late.'})}
+            ]
+        }
+        context = MagicMock(function_name='feedback-processor')
+        mock_lambda_client = MagicMock()
+        mock_lambda_client.invoke.side_effect = [None, Exception('Rate exceeded')]
+        
+        # Call the lambda handler with fan-out enabled, failing the second invocation
+        with patch('src.aws.lambda_handler.ASYNC_FANOUT', True), \
+             patch('src.aws.lambda_handler._EXECUTOR', MagicMock(map=map)), \
+             patch('src.aws.lambda_handler._get_lambda_client', return_value=mock_lambda_client):
+            response = lambda_handler(event, context)
+        
+        # Check that only the record that was not queued is retried
+        assert response['batchItemFailures'] == [{'itemIdentifier': 'm2'}]
+        results = json.loads(response['body'])['results']
+        assert results[0] == {'status': 'queued'}
+        assert 'Rate exceeded' in results[1]['error']
+        
+        # Check that a failed record without a message ID fails the whole batch
+        del event['Records'][1]['messageId']
+        mock_lambda_client.invoke.side_effect = [None, Exception('Rate exceeded')]
+        with patch('src.aws.lambda_handler.ASYNC_FANOUT', True), \
+             patch('src.aws.lambda_handler._EXECUTOR', MagicMock(map=map)), \
+             patch('src.aws.lambda_handler._get_lambda_client', return_value=mock_lambda_client), \
+             pytest.raises(RuntimeError):
+            lambda_handler(event, context)
+
+    def test_process_feedback_batch_processes_duplicate_content_once(self):
+        """Test that entries of a batch with the same content are processed once."""
+        config = {'agent_config': {'provider': 'openai',
+                                   'cache_config': {'cache_type': 'memory', 'ttl': 62}}}
+        feedback = {
+            'feedback_id': '12345',
+            'feedback_text': 'The product is great, but the delivery was delayed.',
+            'timestamp': '2025-01-10T10:30:00Z'
+        }
+        self.mock_tool_agent.process_requests.return_value = [
+            {'results': {'summarization': {'summary': 'ok'}}}
+        ]
+        
+        with patch('src.aws.lambda_handler.get_agents',
+                   return_value=(self.mock_interaction_agent, self.mock_tool_agent)):
+            results = process_feedback_batch([feedback, {**feedback, 'feedback_id': '67890'}],
+                                             config)
+        
+        # Check that the agents only ran for the first entry
+        self.mock_interaction_agent.process_input.assert_called_once()
+        assert len(self.mock_tool_agent.process_requests.call_args[0][0]) == 1
+        assert results[0]['feedback_id'] == '12345'
+        assert results[1]['feedback_id'] == '67890'
+        assert results[1]['results'] == results[0]['results']
+
+    def test_process_feedback_batch_reports_failed_agent_setup(self):
+        """Test that a failure to create the agents is reported in the result of every entry."""
+        feedback = {
+            'feedback_id': '12345',
+            'feedback_text': 'The product is great, but the delivery was delayed.',
+            'timestamp': '2025-01-10T10:30:00Z'
+        }
+        
+        with patch('src.aws.lambda_handler.get_agents',
+                   side_effect=RuntimeError('Missing credentials')):
+            response = lambda_handler(
+                {'feedback': [feedback, {**feedback, 'feedback_id': '67890'}]}, {}
+            )
+        
+        # Check that the batch still succeeded with an error result for each entry
+        assert response['statusCode'] == 200
+        results = json.loads(response['body'])['results']
+        assert [result['feedback_id'] for result in results] == ['12345', '67890']
+        assert all('Missing credentials' in json.dumps(result) for result in results)
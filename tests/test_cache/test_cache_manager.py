@@ -41,6 +41,21 @@ class TestCacheManager:
         # Check the result
         assert result == value
 
+    def test_memory_cache_evicts_least_recently_used(self):
+        """Test that the memory cache evicts the least recently used entry when full."""
+        cache_manager = CacheManager(cache_type='memory', max_entries=2)
+        
+        # Fill the cache, use the first entry, then add a third
+        cache_manager.set('key1', {'test': 'data1'})
+        cache_manager.set('key2', {'test': 'data2'})
+        cache_manager.get('key1')
+        cache_manager.set('key3', {'test': 'data3'})
+        
+        # Check that the second entry was evicted
+        assert cache_manager.get('key1') == {'test': 'data1'}
+        assert cache_manager.get('key2') is None
+        assert cache_manager.get('key3') == {'test': 'data3'}
+
     def test_memory_cache_get_nonexistent(self):
         """Test getting a nonexistent key from the memory cache."""
         # Get a nonexistent key from the cache
@@ -139,6 +154,20 @@ class TestCacheManager:
         # Check that the DynamoDB cache was called
         self.mock_dynamodb_cache.clear.assert_called_once()
 
+    def test_dynamodb_cache_get_many_and_set_many(self):
+        """Test batched gets and sets in the DynamoDB cache."""
+        self.mock_dynamodb_cache.get_many.return_value = {'key1': {'test': 'data1'}}
+        
+        # Get several keys and set the missing one
+        results = self.dynamodb_cache_manager.get_many(['key1', 'key2'])
+        self.dynamodb_cache_manager.set_many({'key2': {'test': 'data2'}})
+        
+        # Check that the DynamoDB cache was called once for each batch
+        assert results == {'key1': {'test': 'data1'}}
+        self.mock_dynamodb_cache.get_many.assert_called_once_with(['key1', 'key2'])
+        self.mock_dynamodb_cache.set_many.assert_called_once_with({'key2': {'test': 'data2'}}, 3600)
+        assert self.dynamodb_cache_manager.get_metrics() == {'hits': 1, 'misses': 1, 'sets': 1}
+
     def test_get_metrics(self):
         """Test getting cache metrics."""
         # Create a cache manager with some activity
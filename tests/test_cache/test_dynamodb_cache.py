@@ -11,7 +11,11 @@ import boto3
 import pytest
 from botocore.exceptions import ClientError
 
-from src.cache.dynamodb_cache import DynamoDBCache
+from boto3.dynamodb.types import Binary
+
+from src.cache.dynamodb_cache import (
+    DynamoDBCache, _encode_result, _decode_result, refresh_connections
+)
 
 
 class TestDynamoDBCache:
@@ -62,6 +66,45 @@ class TestDynamoDBCache:
             self.cache = DynamoDBCache(table_name='test-table')
             self.cache.table = self.mock_dynamodb
 
+    def test_table_is_shared(self):
+        """Test that caches for the same table and region share one table resource."""
+        with patch('boto3.resource') as mock_resource:
+            first = DynamoDBCache(table_name='shared-table', region='eu-west-1')
+            second = DynamoDBCache(table_name='shared-table', region='eu-west-1')
+        
+        # Check that the resource was only created once
+        mock_resource.assert_called_once_with('dynamodb', region_name='eu-west-1')
+        assert first.table is second.table
+
+    def test_result_encoding_roundtrip(self):
+        """Test that cached results are stored as compact binary values."""
+        small = {'test': 'data'}
+        large = {'text': 'data ' * 1000}
+        
+        # Check that small results are stored uncompressed and large ones compressed
+        encoded_small = _encode_result(small)
+        encoded_large = _encode_result(large)
+        assert encoded_small[:1] == b'\x01'
+        assert encoded_large[:1] == b'\x02'
+        assert len(encoded_large) < len(json.dumps(large))
+        
+        # Check that binary attributes and legacy JSON text both decode
+        assert _decode_result(Binary(encoded_small)) == small
+        assert _decode_result(Binary(encoded_large)) == large
+        assert _decode_result(json.dumps(small)) == small
+
+    def test_refresh_connections(self):
+        """Test that the shared tables are touched to reopen their connections."""
+        mock_table = MagicMock()
+        
+        # Refresh the connections of a shared table
+        with patch.dict('src.cache.dynamodb_cache._TABLES',
+                        {('refresh-table', 'us-east-1'): mock_table}, clear=True):
+            refresh_connections()
+        
+        # Check that the table was described
+        mock_table.meta.client.describe_table.assert_called_once_with(TableName='refresh-table')
+
     def test_set(self):
         """Test setting an item in the cache."""
         # Create test data
@@ -82,6 +125,24 @@ class TestDynamoDBCache:
         assert json.loads(call_args['Item']['value']['S']) == value
         assert call_args['Item']['feedback_id']['S'] == feedback_id
 
+    def test_set_skips_live_entries(self):
+        """Test that set writes conditionally and ignores entries already stored."""
+        self.mock_dynamodb.put_item.side_effect = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'exists'}}, 'PutItem'
+        )
+        
+        # Set the data in the cache
+        with patch('src.cache.dynamodb_cache.logger') as mock_logger:
+            self.cache.set('test_key', {'test': 'data'})
+        
+        # Check that the write was conditional and the failed condition was not an error
+        call_args = self.mock_dynamodb.put_item.call_args[1]
+        assert call_args['ConditionExpression'] == (
+            'attribute_not_exists(cache_key) OR expiry < :now'
+        )
+        assert call_args['ExpressionAttributeValues'][':now'] == call_args['Item']['last_updated']
+        mock_logger.error.assert_not_called()
+
     def test_get_existing(self):
         """Test getting an existing item from the cache."""
         # Create test data
@@ -130,10 +191,8 @@ class TestDynamoDBCache:
         # Check the result
         assert result is None
         
-        # Check that the item was deleted
-        self.mock_dynamodb.delete_item.assert_called_once_with(
-            Key={'cache_key': {'S': 'expired_key'}}
-        )
+        # Check that the item was left for DynamoDB TTL to delete
+        self.mock_dynamodb.delete_item.assert_not_called()
 
     def test_delete(self):
         """Test deleting an item from the cache."""
@@ -157,6 +216,28 @@ class TestDynamoDBCache:
         self.mock_dynamodb.scan.assert_called_once()
         assert self.mock_dynamodb.delete_item.call_count == 2
 
+    def test_clear_scans_segments_in_parallel(self):
+        """Test that clearing the cache deletes the keys found in every scan segment."""
+        mock_client = self.mock_dynamodb.meta.client
+        mock_client.get_paginator.return_value.paginate.side_effect = lambda **kwargs: [
+            {'Items': [{'cache_key': {'S': f"key{kwargs['Segment']}"}}]}
+        ]
+        mock_client.batch_write_item.return_value = {'UnprocessedItems': {}}
+        
+        # Clear the cache
+        self.cache.clear()
+        
+        # Check that each segment was scanned for keys only and its keys deleted
+        paginate_calls = mock_client.get_paginator.return_value.paginate.call_args_list
+        assert sorted(call[1]['Segment'] for call in paginate_calls) == list(range(8))
+        assert all(call[1]['ProjectionExpression'] == 'cache_key' for call in paginate_calls)
+        deleted_keys = sorted(
+            request['DeleteRequest']['Key']['cache_key']['S']
+            for call in mock_client.batch_write_item.call_args_list
+            for request in call[1]['RequestItems']['test-table']
+        )
+        assert deleted_keys == [f'key{segment}' for segment in range(8)]
+
     def test_get_by_feedback_id(self):
         """Test getting items by feedback ID."""
         # Create test data
@@ -0,0 +1,45 @@
+"""
+Tests for the Memory Cache Module
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.cache.memory_cache import MemoryCache
+
+
+class TestMemoryCache:
+    """Tests for the MemoryCache class."""
+
+    def setup_method(self):
+        """Set up the test environment."""
+        self.cache = MemoryCache(max_entries=2)
+
+    def test_set_and_get(self):
+        """Test setting and getting a value."""
+        self.cache.set('key1', {'test': 'data'}, ttl=60)
+        
+        # Check the result
+        assert self.cache.get('key1') == {'test': 'data'}
+        assert self.cache.get('missing') is None
+
+    def test_get_expired(self):
+        """Test that expired entries are removed."""
+        with patch('src.cache.memory_cache.time.monotonic', return_value=100.0):
+            self.cache.set('key1', {'test': 'data'}, ttl=10)
+        
+        # Get the entry after it expired
+        with patch('src.cache.memory_cache.time.monotonic', return_value=110.0):
+            result = self.cache.get('key1')
+        
+        # Check that the entry was removed
+        assert result is None
+        assert 'key1' not in self.cache.entries
+
+    def test_get_many_and_set_many(self):
+        """Test batched gets and sets, evicting beyond the size limit."""
+        self.cache.set_many({'key1': {'n': 1}, 'key2': {'n': 2}, 'key3': {'n': 3}}, ttl=60)
+        
+        # Check that the oldest entry was evicted
+        assert self.cache.get_many(['key1', 'key2', 'key3']) == {'key2': {'n': 2}, 'key3': {'n': 3}}
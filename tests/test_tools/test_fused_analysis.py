@@ -0,0 +1,128 @@
+"""
+Tests for the Fused Analysis Tool Module
+"""
+
+from unittest.mock import patch, MagicMock
+
+from src.tools.fused_analysis import FusedAnalysisTool, split_fused_result
+from src.tools.topic_categorization import TopicCategorizationTool
+
+
+class TestFusedAnalysisTool:
+    """Tests for the FusedAnalysisTool class and the splitting of its results."""
+
+    def setup_method(self):
+        """Set up the test environment."""
+        # Create a mock client for the LLM
+        self.mock_client = MagicMock()
+        
+        # Create the fused analysis tool with the mock client
+        self.topics = ['Delivery', 'Pricing', 'Other']
+        with patch('src.tools.base_llm_tool.get_llm_client', return_value=self.mock_client):
+            self.tool = FusedAnalysisTool(provider='anthropic', model='claude-3-haiku-20240307',
+                                          max_keywords=5, max_summary_length=100,
+                                          max_recommendations=2, predefined_topics=self.topics)
+        
+        # Create a fused result scoring every predefined topic, as the schema requires
+        self.fused_result = {
+            'keywords': [{'keyword': 'late delivery', 'relevance': 0.9,
+                          'context': 'The order arrived late.'}],
+            'sentiment': {
+                'overall_sentiment': 'negative',
+                'scores': {'positive': 0.1, 'negative': 0.8, 'neutral': 0.1},
+                'explanation': 'The customer is unhappy about the delay.'
+            },
+            'topics': {
+                'primary_topic': 'Delivery',
+                'topics': {'Delivery': 0.9, 'Pricing': 0.0, 'Other': 0.2},
+                'explanation': 'The text is about a late delivery.'
+            },
+            'summary': 'The order arrived late.',
+            'recommendations': ['Improve delivery times'],
+            'key_points': ['Delivery was late']
+        }
+
+    def test_create_prompt_fills_in_settings(self):
+        """Test that the prompts hold the settings of the tool and the texts."""
+        prompt = self.tool._create_prompt('The order arrived late.')
+        batch_prompt = self.tool._create_batch_prompt(['The order arrived late.', 'Too expensive.'])
+        
+        # Check that both prompts ask for the configured limits and topics
+        for text in (prompt, batch_prompt):
+            assert 'at most 5 keywords' in text
+            assert 'these topics: Delivery, Pricing, Other' in text
+            assert 'at most 100 characters with at most 2 recommendations' in text
+        
+        # Check that the single text is delimited and the batched texts are numbered
+        assert prompt.endswith('Text: """The order arrived late."""')
+        assert batch_prompt.endswith('Texts:\n1. "The order arrived late."\n2. "Too expensive."')
+        assert '{"results": [...]}' in batch_prompt
+
+    def test_result_tool_uses_topic_categorization_schema(self):
+        """Test that the fused topics are constrained like the results of the topic tool."""
+        with patch('src.tools.base_llm_tool.get_llm_client', return_value=MagicMock()):
+            topic_tool = TopicCategorizationTool(provider='anthropic',
+                                                 predefined_topics=self.topics)
+        
+        # Check that the single and batched results share the schema of the topic tool
+        properties = self.tool.result_tool['input_schema']['properties']
+        assert properties['topics'] == topic_tool.result_schema
+        assert properties['results']['items']['properties']['topics'] == topic_tool.result_schema
+        assert properties['topics']['properties']['primary_topic']['enum'] == self.topics
+        assert properties['topics']['properties']['topics']['required'] == self.topics
+
+    def test_execute_forces_result_tool(self):
+        """Test that Anthropic models are forced to record the analysis with the result tool."""
+        self.mock_client.messages.create.return_value = MagicMock(
+            content=[MagicMock(type='tool_use', input=self.fused_result)]
+        )
+        
+        # Analyze a text
+        result = self.tool.execute({'feedback_text': 'The order arrived late.'})
+        
+        # Check that the tool was forced and its input returned
+        call_args = self.mock_client.messages.create.call_args[1]
+        assert call_args['tools'] == [self.tool.result_tool]
+        assert call_args['tool_choice'] == {"type": "tool", "name": "record_fused_analysis"}
+        assert result == self.fused_result
+
+    def test_split_fused_result(self):
+        """Test that a fused result is split into results shaped like those of each tool."""
+        results = split_fused_result(self.fused_result)
+        
+        # Check the result of each tool, where the topics scored 0.0 are dropped
+        assert results['keyword_contextualization'] == {'keywords': self.fused_result['keywords']}
+        assert results['sentiment_analysis'] == self.fused_result['sentiment']
+        assert results['topic_categorization'] == {
+            'primary_topic': 'Delivery',
+            'topics': {'Delivery': 0.9, 'Other': 0.2},
+            'explanation': 'The text is about a late delivery.'
+        }
+        assert results['summarization'] == {
+            'summary': 'The order arrived late.',
+            'recommendations': ['Improve delivery times'],
+            'key_points': ['Delivery was late']
+        }
+        assert all('error' not in result for result in results.values())
+        
+        # Check that the fused result was not modified
+        assert self.fused_result['topics']['topics']['Pricing'] == 0.0
+
+    def test_split_fused_result_reports_error_in_every_result(self):
+        """Test that the error of a failed query is reported in the result of every tool."""
+        error_result = self.tool._error_result(ValueError('LLM unavailable'))
+        
+        results = split_fused_result(error_result)
+        
+        # Check that every tool reports the error next to its empty result
+        assert set(results) == {'keyword_contextualization', 'sentiment_analysis',
+                                'topic_categorization', 'summarization'}
+        assert all(result['error'] == 'LLM unavailable' for result in results.values())
+        assert results['keyword_contextualization']['keywords'] == []
+        assert results['sentiment_analysis']['overall_sentiment'] == 'unknown'
+        assert results['topic_categorization']['topics'] == {}
+        assert results['summarization']['recommendations'] == []
+        
+        # Check that the error was not added to the nested results of the fused result
+        assert 'error' not in error_result['sentiment']
+        assert 'error' not in error_result['topics']
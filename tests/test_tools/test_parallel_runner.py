@@ -0,0 +1,78 @@
+"""
+Tests for the Parallel Runner Module
+"""
+
+import asyncio
+from unittest.mock import patch, MagicMock, AsyncMock
+
+import pytest
+
+from src.tools.parallel_runner import ParallelToolRunner
+
+
+class TestParallelToolRunner:
+    """Tests for the ParallelToolRunner class."""
+
+    def setup_method(self):
+        """Set up the test environment."""
+        # Create a mock tool echoing the text of its input
+        self.mock_tool = MagicMock()
+        self.mock_tool.result_max_tokens = 100
+        self.mock_tool.execute_async = AsyncMock(
+            side_effect=lambda input_data: {'text': input_data['feedback_text']}
+        )
+        
+        self.runner = ParallelToolRunner(max_requests_per_minute=600, max_tokens_per_minute=60000)
+
+    def test_run_returns_results_in_order(self):
+        """Test that the results are returned in the order of the inputs."""
+        inputs = [{'feedback_text': f'Feedback {number}'} for number in range(5)]
+        
+        # Run the tool on the inputs
+        results = asyncio.run(self.runner.run(self.mock_tool, inputs))
+        
+        # Check that every input was executed once
+        assert results == [{'text': f'Feedback {number}'} for number in range(5)]
+        assert self.mock_tool.execute_async.await_count == 5
+
+    def test_run_retries_rate_limited_executions(self):
+        """Test that rate limited and failed executions are retried up to max_attempts."""
+        responses = iter([{'error': 'Error code: 429 - Rate limit reached'},
+                          RuntimeError('Connection reset'),
+                          {'text': 'Feedback'}])
+        
+        def execute(input_data):
+            response = next(responses)
+            if isinstance(response, Exception):
+                raise response
+            return response
+        
+        self.mock_tool.execute_async = AsyncMock(side_effect=execute)
+        
+        # Run the tool without backoff delays
+        with patch('src.tools.parallel_runner.RETRY_BASE_DELAY', 0):
+            results = asyncio.run(self.runner.run(self.mock_tool, [{'feedback_text': 'Feedback'}]))
+        
+        # Check that the third attempt succeeded
+        assert results == [{'text': 'Feedback'}]
+        assert self.mock_tool.execute_async.await_count == 3
+
+    def test_run_waits_for_request_budget(self):
+        """Test that executions beyond the request budget wait for it to refill."""
+        runner = ParallelToolRunner(max_requests_per_minute=600, max_tokens_per_minute=60000)
+        runner._available_requests = 1
+        
+        # Run the tool on two inputs, where the second needs 0.1s of refill
+        with patch('src.tools.parallel_runner.CAPACITY_POLL_INTERVAL', 0.01):
+            inputs = [{'feedback_text': 'a'}, {'feedback_text': 'b'}]
+            start = asyncio.run(self._timed_run(runner, inputs))
+        
+        # Check that the second execution was delayed by the budget
+        assert start >= 0.09
+
+    async def _timed_run(self, runner, inputs):
+        """Run the tool and return the elapsed time in seconds."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await runner.run(self.mock_tool, inputs)
+        return loop.time() - started
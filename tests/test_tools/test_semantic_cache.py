@@ -0,0 +1,42 @@
+"""
+Tests for the Semantic Cache Module
+"""
+
+import pytest
+
+from src.tools.semantic_cache import SemanticCache, ngram_embedding
+
+
+class TestSemanticCache:
+    """Tests for the SemanticCache class."""
+
+    def setup_method(self):
+        """Set up the test environment."""
+        self.cache = SemanticCache(threshold=0.9, max_entries=2)
+        self.result = {'summary': 'The order arrived damaged.'}
+
+    def test_get_returns_result_of_near_duplicate(self):
+        """Test that a text differing only in its numbers and spacing reuses the cached result."""
+        self.cache.set('Order 12345 arrived late and the box was damaged.', self.result)
+        
+        # Look up a near-duplicate and an unrelated text
+        assert self.cache.get('order 98765 arrived late and  the box was damaged.') == self.result
+        assert self.cache.get('The support team was very helpful.') is None
+
+    def test_set_evicts_least_recently_used_text(self):
+        """Test that the least recently used text is evicted beyond max_entries."""
+        self.cache.set('The delivery was late.', {'summary': 'Late delivery.'})
+        self.cache.set('The product is great.', {'summary': 'Great product.'})
+        self.cache.get('The delivery was late.')
+        self.cache.set('The support was helpful.', {'summary': 'Helpful support.'})
+        
+        # Check that only the text that was not looked up again was evicted
+        assert self.cache.get('The delivery was late.') == {'summary': 'Late delivery.'}
+        assert self.cache.get('The product is great.') is None
+        assert all(len(entry_ids) <= 2 for entry_ids in self.cache._index.values())
+
+    def test_ngram_embedding_has_unit_length(self):
+        """Test that the default embedding is a unit vector."""
+        vector = ngram_embedding('The product is great.')
+        
+        assert sum(weight * weight for weight in vector.values()) == pytest.approx(1.0)
@@ -2,13 +2,15 @@
 Tests for the Sentiment Analysis Tool Module
 """
 
+import asyncio
 import json
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 import pytest
 
-from src.tools.sentiment_analysis import SentimentAnalysisTool
+from src.tools.base_llm_tool import JSON_RESPONSE_FORMAT
+from src.tools.sentiment_analysis import SentimentAnalysisTool, SENTIMENT_MAX_TOKENS, SENTIMENT_TOOL
 
 
 class TestSentimentAnalysisTool:
@@ -67,6 +69,140 @@ class TestSentimentAnalysisTool:
         assert call_args['messages'][1]['role'] == 'user'
         assert 'The product is great, but the delivery was delayed.' in call_args['messages'][1]['content']
 
+    def test_execute_reuses_response_for_repeated_text(self):
+        """Test that the LLM is only queried once for the same text."""
+        input_data = {'feedback_id': '12345', 'feedback_text': 'The product is great.'}
+        
+        # Execute the tool twice with the same text
+        first = self.tool.execute(input_data)
+        second = self.tool.execute({**input_data, 'feedback_id': '67890'})
+        
+        # Check that the second result came from the cache
+        assert second == first
+        self.tool.client.chat.completions.create.assert_called_once()
+
+    def test_execute_answers_text_without_words_directly(self):
+        """Test that a text made only of punctuation is analyzed without the LLM."""
+        result = self.tool.execute({'feedback_text': '?!...'})
+        
+        # Check that the text is neutral and the LLM was not queried
+        assert result['overall_sentiment'] == 'neutral'
+        assert result['scores']['neutral'] == 1.0
+        self.tool.client.chat.completions.create.assert_not_called()
+
+    def test_execute_truncates_long_text(self):
+        """Test that only the beginning of a very long text is sent to the LLM."""
+        self.tool.max_text_length = 100
+        
+        # Execute the tool with a long text
+        self.tool.execute({'feedback_text': 'Great product. ' * 100})
+        
+        # Check that the prompt holds the truncated text
+        prompt = self.tool.client.chat.completions.create.call_args[1]['messages'][1]['content']
+        assert ('Great product. ' * 100)[:100] + '"""' in prompt
+        assert len(prompt) < 200
+
+    def test_analyze_texts_batches_texts(self):
+        """Test that several texts are analyzed with one LLM call."""
+        results = [
+            {"overall_sentiment": "positive",
+             "scores": {"positive": 0.9, "negative": 0.05, "neutral": 0.05}},
+            {"overall_sentiment": "negative",
+             "scores": {"positive": 0.1, "negative": 0.8, "neutral": 0.1}}
+        ]
+        self.mock_response.choices[0].message.content = json.dumps({"results": results})
+        
+        # Analyze two texts
+        batch_results = self.tool._analyze_texts(['I love it.', 'It broke.'])
+        
+        # Check that both texts were sent in one call, with room for both results
+        assert batch_results == results
+        self.tool.client.chat.completions.create.assert_called_once()
+        call_args = self.tool.client.chat.completions.create.call_args[1]
+        assert '1. "I love it."' in call_args['messages'][1]['content']
+        assert '2. "It broke."' in call_args['messages'][1]['content']
+        assert call_args['max_tokens'] == 2 * SENTIMENT_MAX_TOKENS
+
+    def test_execute_async_with_async_client(self):
+        """Test that execute_async queries the LLM with an asynchronous client in async mode."""
+        mock_async_client = MagicMock()
+        mock_async_client.chat.completions.create = AsyncMock(return_value=self.mock_response)
+        self.tool.async_mode = True
+        
+        # Execute the tool asynchronously
+        with patch('src.tools.base_llm_tool.create_async_llm_client',
+                   return_value=mock_async_client):
+            result = asyncio.run(self.tool.execute_async(
+                {'feedback_text': 'The product is great.'}))
+        
+        # Check that the asynchronous client was used instead of the synchronous one
+        assert result['overall_sentiment'] == 'positive'
+        mock_async_client.chat.completions.create.assert_awaited_once()
+        self.tool.client.chat.completions.create.assert_not_called()
+
+    def test_execute_async_races_providers(self):
+        """Test that the response of the race provider is used when the configured one fails."""
+        failing_client = MagicMock()
+        failing_client.chat.completions.create = AsyncMock(
+            side_effect=TimeoutError('Request timed out'))
+        race_client = MagicMock()
+        race_client.chat.completions.create = AsyncMock(return_value=self.mock_response)
+        clients = {'openai': failing_client, 'groq': race_client}
+        with patch('openai.OpenAI', return_value=self.mock_client):
+            tool = SentimentAnalysisTool(provider='openai', model='gpt-4', async_mode=True,
+                                         race_provider='groq')
+        
+        # Execute the tool asynchronously
+        with patch('src.tools.base_llm_tool.create_async_llm_client',
+                   side_effect=lambda provider, api_key: clients[provider]):
+            result = asyncio.run(tool.execute_async({'feedback_text': 'The product is great.'}))
+        
+        # Check that both providers were queried and the race provider answered
+        assert result['overall_sentiment'] == 'positive'
+        failing_client.chat.completions.create.assert_awaited_once()
+        assert race_client.chat.completions.create.call_args[1]['model'] == 'llama3-70b-8192'
+
+    def test_execute_forces_structured_output(self):
+        """Test that the providers are asked for JSON or a forced tool use."""
+        sentiment = {
+            "overall_sentiment": "negative",
+            "scores": {"positive": 0.1, "negative": 0.8, "neutral": 0.1},
+            "explanation": "The product broke."
+        }
+        mock_anthropic = MagicMock()
+        mock_anthropic.messages.create.return_value = MagicMock(
+            content=[MagicMock(type='tool_use', input=sentiment)]
+        )
+        with patch('anthropic.Anthropic', return_value=mock_anthropic):
+            tool = SentimentAnalysisTool(provider='anthropic', model='claude-3-opus')
+            tool.client = mock_anthropic
+        
+        # Execute the tools
+        self.tool.execute({'feedback_text': 'The product is great.'})
+        result = tool.execute({'feedback_text': 'It broke.'})
+        
+        # Check that OpenAI was asked for a JSON object and Anthropic for the tool input
+        openai_call_args = self.tool.client.chat.completions.create.call_args[1]
+        assert openai_call_args['response_format'] == JSON_RESPONSE_FORMAT
+        call_args = mock_anthropic.messages.create.call_args[1]
+        assert call_args['tools'] == [SENTIMENT_TOOL]
+        assert call_args['tool_choice'] == {"type": "tool", "name": "record_sentiment"}
+        assert call_args['system'][0]['cache_control'] == {"type": "ephemeral"}
+        assert result == sentiment
+
+    def test_select_model_cascades_short_texts(self):
+        """Test that short texts use the lighter model when no model was chosen."""
+        with patch('openai.OpenAI', return_value=self.mock_client):
+            tool = SentimentAnalysisTool(provider='openai')
+        
+        # Check that the default model accepts the JSON response format
+        assert tool.model == 'gpt-4o'
+        
+        # Check that only short texts are routed to the lighter model
+        assert tool._select_model(['The product is great.']) == 'gpt-4o-mini'
+        assert tool._select_model(['The product is great.', 'word ' * 200]) == tool.model
+        assert self.tool._select_model(['The product is great.']) == 'gpt-4'
+
     def test_execute_with_empty_feedback(self):
         """Test the execute method with empty feedback."""
         # Create a test input with empty feedback
@@ -2,13 +2,15 @@
 Tests for the Summarization Tool Module
 """
 
+import asyncio
 import json
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 import pytest
 
 from src.tools.summarization import SummarizationTool
+from src.tools.tool_factory import execute_batch
 
 
 class TestSummarizationTool:
@@ -65,11 +67,241 @@ class TestSummarizationTool:
         self.tool.client.chat.completions.create.assert_called_once()
         call_args = self.tool.client.chat.completions.create.call_args[1]
         assert call_args['model'] == 'gpt-4'
+        assert call_args['max_tokens'] == 400
         assert len(call_args['messages']) == 2
         assert call_args['messages'][0]['role'] == 'system'
         assert call_args['messages'][1]['role'] == 'user'
         assert 'The product is great, but the delivery was delayed.' in call_args['messages'][1]['content']
 
+    def test_execute_truncates_long_text_and_reuses_its_response(self):
+        """Test that long texts are truncated and the response reused for the same text."""
+        text = 'The delivery was late. ' * 1000
+        
+        # Summarize the same long text twice
+        first = self.tool.execute({'feedback_text': text})
+        second = self.tool.execute({'feedback_text': text})
+        
+        # Check that the LLM was queried once with the beginning of the text
+        assert second == first
+        self.mock_client.chat.completions.create.assert_called_once()
+        prompt = self.mock_client.chat.completions.create.call_args[1]['messages'][1]['content']
+        assert text[:self.tool.max_text_length] + '"""' in prompt
+        assert len(prompt) < len(text)
+
+    def test_execute_batch_with_async_client(self):
+        """Test that several texts are summarized concurrently with an asynchronous client."""
+        mock_async_client = MagicMock()
+        mock_async_client.chat.completions.create = AsyncMock(return_value=self.mock_response)
+        self.tool.async_mode = True
+        inputs = [{'feedback_text': 'The product is great.'},
+                  {'feedback_text': 'The delivery was late.'}]
+        
+        # Execute the tool on both inputs
+        with patch('src.tools.base_llm_tool.create_async_llm_client',
+                   return_value=mock_async_client):
+            results = asyncio.run(execute_batch(self.tool, inputs))
+        
+        # Check that each text was summarized with the asynchronous client
+        assert len(results) == 2
+        assert results[0]['recommendations'][0] == 'Improve delivery logistics to reduce delays'
+        assert mock_async_client.chat.completions.create.await_count == 2
+        self.tool.client.chat.completions.create.assert_not_called()
+
+    def test_execute_async_with_async_bedrock_client(self):
+        """Test that Bedrock is queried without a worker thread with an asynchronous client."""
+        summary = json.loads(self.mock_response.choices[0].message.content)
+        response_body = MagicMock()
+        response_body.read = AsyncMock(return_value=json.dumps({
+            'content': [{'type': 'tool_use', 'name': 'record_summary', 'input': summary}]
+        }).encode())
+        mock_bedrock = MagicMock()
+        mock_bedrock.invoke_model = AsyncMock(return_value={'body': response_body})
+        
+        with patch('src.tools.base_llm_tool.get_llm_client', return_value=MagicMock()):
+            tool = SummarizationTool(provider='bedrock', async_mode=True)
+        
+        # Summarize a text with the asynchronous Bedrock client
+        with patch('src.tools.base_llm_tool.create_async_bedrock_client',
+                   AsyncMock(return_value=mock_bedrock)):
+            result = asyncio.run(tool.execute_async({'feedback_text': 'The delivery was late.'}))
+        
+        # Check that the tool use input was read from the awaited response
+        assert result == summary
+        payload = json.loads(mock_bedrock.invoke_model.await_args[1]['body'])
+        assert payload['tool_choice'] == {"type": "tool", "name": "record_summary"}
+        tool.client.invoke_model.assert_not_called()
+
+    def test_execute_stream_yields_partial_results(self):
+        """Test that partial results are yielded as the streamed response completes them."""
+        content = self.mock_response.choices[0].message.content
+        chunks = [MagicMock(choices=[MagicMock()]) for _ in range(0, len(content), 7)]
+        for chunk, start in zip(chunks, range(0, len(content), 7)):
+            chunk.choices[0].delta.content = content[start:start + 7]
+        
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+        
+        mock_async_client = MagicMock()
+        mock_async_client.chat.completions.create = AsyncMock(return_value=stream())
+        
+        async def collect():
+            input_data = {'feedback_text': 'The delivery was late.'}
+            return [result async for result in self.tool.execute_stream(input_data)]
+        
+        # Stream the summarization of the text
+        with patch('src.tools.base_llm_tool.create_async_llm_client',
+                   return_value=mock_async_client):
+            results = asyncio.run(collect())
+        
+        # Check that the summary came first, then each item, and the last result is complete
+        assert list(results[0]) == ['summary']
+        assert results[1]['recommendations'] == ['Improve delivery logistics to reduce delays']
+        assert results[-1] == json.loads(content)
+        assert mock_async_client.chat.completions.create.await_args[1]['stream'] is True
+
+    def test_execute_many_analyzes_texts_with_one_prompt(self):
+        """Test that several texts are summarized with one prompt holding the numbered texts."""
+        summary = json.loads(self.mock_response.choices[0].message.content)
+        batch_response = MagicMock()
+        batch_response.choices = [MagicMock()]
+        batch_response.choices[0].message.content = json.dumps({'results': [
+            {**summary, 'summary': 'Great product.'},
+            {**summary, 'summary': 'Late delivery.'},
+            {**summary, 'summary': 'Helpful support.'}
+        ]})
+        self.mock_client.chat.completions.create.return_value = batch_response
+        
+        # Summarize three texts and an empty one
+        inputs = [{'feedback_text': 'The product is great.'},
+                  {'feedback_text': 'The delivery was late.'},
+                  {'feedback_text': 'The support was helpful.'}, {'feedback_text': ''}]
+        results = self.tool.execute_many(inputs)
+        
+        # Check that the results were matched in order and the LLM queried once
+        assert [result['summary'] for result in results[:3]] == [
+            'Great product.', 'Late delivery.', 'Helpful support.'
+        ]
+        assert results[3] == {'error': 'No text provided for summarization'}
+        self.mock_client.chat.completions.create.assert_called_once()
+        prompt = self.mock_client.chat.completions.create.call_args[1]['messages'][1]['content']
+        assert prompt.endswith('3. "The support was helpful."')
+        assert '{"results": [...]}' in prompt
+
+    def test_execute_many_accepts_bare_list_of_results(self):
+        """Test that a batched response holding a bare list of results is matched to the texts."""
+        summary = json.loads(self.mock_response.choices[0].message.content)
+        batch_response = MagicMock()
+        batch_response.choices = [MagicMock()]
+        batch_response.choices[0].message.content = json.dumps([
+            {**summary, 'summary': 'Great product.'},
+            {**summary, 'summary': 'Late delivery.'}
+        ])
+        self.mock_client.chat.completions.create.return_value = batch_response
+        
+        # Summarize two texts
+        results = self.tool.execute_many([{'feedback_text': 'The product is great.'},
+                                          {'feedback_text': 'The delivery was late.'}])
+        
+        # Check that the results were matched in order without querying the texts separately
+        assert [result['summary'] for result in results] == ['Great product.', 'Late delivery.']
+        self.mock_client.chat.completions.create.assert_called_once()
+
+    def test_batch_execute_with_openai_batch_api(self):
+        """Test that several texts are summarized with one OpenAI batch."""
+        self.mock_client.files.create.return_value = MagicMock(id='file-in')
+        self.mock_client.batches.create.return_value = MagicMock(
+            id='batch-1', status='completed', output_file_id='file-out', error_file_id=None
+        )
+        content = self.mock_response.choices[0].message.content
+        self.mock_client.files.content.return_value = MagicMock(text='\n'.join(
+            json.dumps({'custom_id': custom_id, 'response': {
+                'status_code': 200, 'body': {'choices': [{'message': {'content': content}}]}
+            }}) for custom_id in ('1', '0')
+        ))
+        
+        # Summarize two texts and an empty one
+        inputs = [{'feedback_text': 'The product is great.'},
+                  {'feedback_text': 'The delivery was late.'}, {'feedback_text': ''}]
+        results = self.tool.batch_execute(inputs)
+        
+        # Check that both texts were uploaded in one batch file
+        batch_file = self.mock_client.files.create.call_args[1]['file'][1]
+        assert len(batch_file.splitlines()) == 2
+        assert self.mock_client.batches.create.call_args[1]['endpoint'] == '/v1/chat/completions'
+        assert results[0]['summary'] == results[1]['summary'] == json.loads(content)['summary']
+        assert results[2] == {'error': 'No text provided for summarization'}
+        self.mock_client.chat.completions.create.assert_not_called()
+
+    def test_execute_keeps_instructions_in_cached_system_message(self):
+        """Test that the instructions are sent as a system message shared by every text."""
+        mock_anthropic = MagicMock()
+        mock_anthropic.messages.create.return_value = MagicMock(
+            content=[MagicMock(type='tool_use',
+                               input=json.loads(self.mock_response.choices[0].message.content))]
+        )
+        with patch('anthropic.Anthropic', return_value=mock_anthropic):
+            tool = SummarizationTool(provider='anthropic', model='claude-3-opus')
+            tool.client = mock_anthropic
+        
+        # Summarize two texts
+        result = tool.execute({'feedback_text': 'The product is great.'})
+        tool.execute({'feedback_text': 'The delivery was late.'})
+        
+        # Check that only the user message changed and the system message is marked for caching
+        first, second = (call[1] for call in mock_anthropic.messages.create.call_args_list)
+        assert first['system'] == second['system']
+        assert first['system'][0]['cache_control'] == {"type": "ephemeral"}
+        assert 'actionable recommendations' in first['system'][0]['text']
+        assert first['messages'] == [{"role": "user", "content": (
+            'Summarize the text and provide actionable recommendations.\n'
+            'Text: """The product is great."""'
+        )}]
+        assert first['max_tokens'] == 400
+        
+        # Check that the result was read from the forced tool use
+        assert first['tool_choice'] == {"type": "tool", "name": "record_summary"}
+        assert result == json.loads(self.mock_response.choices[0].message.content)
+
+    def test_execute_constrains_output_to_schema(self):
+        """Test that the response is constrained to the summary schema and not scraped."""
+        self.mock_response.choices[0].message.content = "Summary: Product is good."
+        with patch('src.tools.base_llm_tool.get_llm_client', return_value=self.mock_client):
+            tool = SummarizationTool(provider='openai', model='gpt-4o')
+        
+        # Summarize a text whose response is not valid JSON
+        result = tool.execute({'feedback_text': 'The product is great.'})
+        
+        # Check that the schema was requested and the invalid response reported as an error
+        response_format = self.mock_client.chat.completions.create.call_args[1]['response_format']
+        assert response_format['type'] == 'json_schema'
+        assert response_format['json_schema']['strict'] is True
+        assert set(response_format['json_schema']['schema']['required']) == {
+            'summary', 'recommendations', 'key_points'
+        }
+        assert 'error' in result
+        assert result['recommendations'] == []
+
+    def test_execute_falls_back_to_json_mode_without_structured_outputs(self):
+        """Test that models rejecting JSON schemas are only asked for a JSON object."""
+        mock_groq = MagicMock()
+        mock_groq.chat.completions.create.return_value = self.mock_response
+        with patch('src.tools.base_llm_tool.get_llm_client', return_value=mock_groq):
+            tool = SummarizationTool(provider='groq')
+        
+        # Summarize texts with the default Groq model and a legacy OpenAI model
+        result = tool.execute({'feedback_text': 'The product is great.'})
+        tool.execute_many([{'feedback_text': 'The product is great.'},
+                           {'feedback_text': 'It was late.'}])
+        self.tool.execute({'feedback_text': 'The product is great.'})
+        
+        # Check that every query asked for JSON mode rather than the schema
+        summary = json.loads(self.mock_response.choices[0].message.content)['summary']
+        assert result['summary'] == summary
+        for call in [*mock_groq.chat.completions.create.call_args_list,
+                     self.mock_client.chat.completions.create.call_args]:
+            assert call[1]['response_format'] == {"type": "json_object"}
+
     def test_execute_with_empty_feedback(self):
         """Test the execute method with empty feedback."""
         # Create a test input with empty feedback
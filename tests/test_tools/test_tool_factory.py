@@ -2,8 +2,9 @@
 Tests for the Tool Factory Module
 """
 
+import asyncio
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 import pytest
 
@@ -88,3 +89,56 @@ class TestToolFactory:
         assert tool.model == 'gpt-4'
         assert tool.temperature == 0.5
         assert tool.max_tokens == 500
+
+    def test_create_tool_reuses_tool(self):
+        """Test that the factory returns the same tool for the same type."""
+        with patch('openai.OpenAI'):
+            first = self.tool_factory.create_tool('sentiment_analysis')
+            second = self.tool_factory.create_tool('sentiment_analysis')
+            other = self.tool_factory.create_tool('summarization')
+        
+        # Check that the tool was only created once
+        assert first is second
+        assert first is not other
+
+    def test_create_tool_shares_llm_client(self):
+        """Test that tools of different types share the LLM client of the provider."""
+        tool_factory = ToolFactory(provider='openai', model='gpt-4', api_key='test-key')
+        
+        # Create tools of different types
+        with tool_factory:
+            tool_types = ('sentiment_analysis', 'summarization', 'topic_categorization')
+            tools = [tool_factory.create_tool(tool_type) for tool_type in tool_types]
+        
+        # Check that the tools use one client
+        assert tools[0].client is tools[1].client is tools[2].client
+        assert tool_factory.create_tool('summarization') is not tools[1]
+
+    def test_aclose_closes_async_clients_of_tools(self):
+        """Test that closing the factory closes the asynchronous clients its tools created."""
+        tool_factory = ToolFactory(provider='openai', model='gpt-4o', api_key='test-key',
+                                   async_mode=True)
+        mock_async_client = MagicMock()
+        mock_async_client.close = AsyncMock()
+        content = '{"summary": "Late delivery.", "recommendations": [], "key_points": []}'
+        mock_async_client.chat.completions.create = AsyncMock(return_value=MagicMock(
+            choices=[MagicMock(message=MagicMock(content=content))]
+        ))
+        
+        async def summarize_and_close():
+            result = await tool_factory.create_tool('summarization').execute_async(
+                {'feedback_text': 'The delivery was late.'}
+            )
+            await tool_factory.aclose()
+            return result
+        
+        # Summarize a text with an asynchronous client, then close the factory on the same
+        # event loop
+        with patch('src.tools.base_llm_tool.create_async_llm_client',
+                   return_value=mock_async_client):
+            result = asyncio.run(summarize_and_close())
+        
+        # Check that the client was closed and the tools released
+        assert result['summary'] == 'Late delivery.'
+        mock_async_client.close.assert_awaited_once()
+        assert tool_factory._tools == {}
@@ -0,0 +1,177 @@
+"""
+Tests for the Topic Categorization Tool Module
+"""
+
+import asyncio
+import json
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from src.tools.topic_categorization import TopicCategorizationTool, DEFAULT_TOPICS
+
+
+class TestTopicCategorizationTool:
+    """Tests for the TopicCategorizationTool class."""
+
+    def setup_method(self):
+        """Set up the test environment."""
+        # Create a mock client for the LLM
+        self.mock_client = MagicMock()
+        
+        # Create a mock response for the LLM, scoring every predefined topic
+        self.topics = dict.fromkeys(DEFAULT_TOPICS, 0.0)
+        self.topics.update({'Delivery': 0.9, 'Customer Support': 0.3})
+        self.mock_response = self._response({
+            "primary_topic": "Delivery",
+            "topics": self.topics,
+            "explanation": "The text primarily discusses a late delivery."
+        })
+        
+        # Create the topic categorization tool with the mock client
+        with patch('src.tools.base_llm_tool.get_llm_client', return_value=self.mock_client):
+            self.tool = TopicCategorizationTool(provider='openai', model='gpt-4o')
+        self.mock_client.chat.completions.create.return_value = self.mock_response
+
+    @staticmethod
+    def _response(content):
+        """Create a chat completion response holding the content as JSON."""
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = json.dumps(content)
+        return response
+
+    def test_execute_drops_irrelevant_topics(self):
+        """Test that the topics scored 0.0 by the strict schema are dropped from the result."""
+        result = self.tool.execute({'feedback_text': 'The delivery was late.'})
+        
+        # Check the result holds only the relevant topics
+        assert result['primary_topic'] == 'Delivery'
+        assert result['topics'] == {'Delivery': 0.9, 'Customer Support': 0.3}
+        
+        # Check that the response was constrained to the predefined topics
+        response_format = self.mock_client.chat.completions.create.call_args[1]['response_format']
+        schema = response_format['json_schema']['schema']
+        assert schema['properties']['primary_topic']['enum'] == DEFAULT_TOPICS
+        assert schema['properties']['topics']['required'] == DEFAULT_TOPICS
+
+    def test_execute_many_analyzes_texts_separately_when_results_do_not_match(self):
+        """Test that the texts are analyzed separately when the batched response misses some."""
+        row = json.loads(self.mock_response.choices[0].message.content)
+        self.mock_client.chat.completions.create.side_effect = [
+            self._response({'results': [row, {**row, 'primary_topic': 'Pricing'}]}),
+            self.mock_response,
+            self._response({**row, 'primary_topic': 'Pricing'}),
+            self.mock_response
+        ]
+        
+        # Categorize three texts, of which the batched response covers two
+        inputs = [{'feedback_text': 'The delivery was late.'},
+                  {'feedback_text': 'It is too expensive.'},
+                  {'feedback_text': 'The support was helpful.'}, {'feedback_text': ''}]
+        results = self.tool.execute_many(inputs)
+        
+        # Check that each text was then categorized with its own prompt
+        assert [result.get('primary_topic') for result in results[:3]] == [
+            'Delivery', 'Pricing', 'Delivery'
+        ]
+        assert results[1]['topics'] == {'Delivery': 0.9, 'Customer Support': 0.3}
+        assert results[3] == {'error': 'No text provided for topic categorization'}
+        calls = self.mock_client.chat.completions.create.call_args_list
+        assert calls[0][1]['response_format']['json_schema']['name'] == 'topics_results'
+        assert calls[1][1]['response_format']['json_schema']['name'] == 'topics'
+        assert len(calls) == 4
+
+    def test_batch_execute_with_anthropic_batch_api(self):
+        """Test that several texts are categorized with one Anthropic message batch."""
+        row = json.loads(self.mock_response.choices[0].message.content)
+        mock_anthropic = MagicMock()
+        mock_anthropic.messages.batches.create.return_value = MagicMock(
+            id='batch-1', processing_status='ended')
+        mock_anthropic.messages.batches.results.return_value = [
+            MagicMock(custom_id=custom_id, result=MagicMock(
+                type='succeeded', message=MagicMock(content=[MagicMock(type='tool_use', input=row)])
+            ))
+            for custom_id in ('0', '1')
+        ]
+        with patch('src.tools.base_llm_tool.get_llm_client', return_value=mock_anthropic):
+            tool = TopicCategorizationTool(provider='anthropic', model='claude-3-haiku-20240307')
+        
+        # Categorize two texts
+        results = tool.batch_execute([{'feedback_text': 'The delivery was late.'},
+                                      {'feedback_text': 'The support was helpful.'}])
+        
+        # Check that both texts were sent in one batch forcing the topics tool
+        requests = mock_anthropic.messages.batches.create.call_args[1]['requests']
+        assert len(requests) == 2
+        assert requests[0]['params']['tool_choice'] == {"type": "tool", "name": "record_topics"}
+        assert [result['topics'] for result in results] == [
+            {'Delivery': 0.9, 'Customer Support': 0.3}
+        ] * 2
+        mock_anthropic.messages.create.assert_not_called()
+
+    def test_execute_stream_yields_relevant_topics_last(self):
+        """Test that partial results are streamed and the last holds only the relevant topics."""
+        content = self.mock_response.choices[0].message.content
+        chunks = [MagicMock(choices=[MagicMock()]) for _ in range(0, len(content), 11)]
+        for chunk, start in zip(chunks, range(0, len(content), 11)):
+            chunk.choices[0].delta.content = content[start:start + 11]
+        
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+        
+        mock_async_client = MagicMock()
+        mock_async_client.chat.completions.create = AsyncMock(return_value=stream())
+        
+        async def collect():
+            input_data = {'feedback_text': 'The delivery was late.'}
+            return [result async for result in self.tool.execute_stream(input_data)]
+        
+        # Stream the topic categorization of the text
+        with patch('src.tools.base_llm_tool.create_async_llm_client',
+                   return_value=mock_async_client):
+            results = asyncio.run(collect())
+        
+        # Check that the primary topic came first and the last result dropped the irrelevant topics
+        assert results[0] == {'primary_topic': 'Delivery'}
+        assert results[-2]['topics'] == self.topics
+        assert results[-1]['topics'] == {'Delivery': 0.9, 'Customer Support': 0.3}
+
+    def test_execute_reuses_result_of_near_duplicate_text(self):
+        """Test that a near-duplicate text reuses the result with the semantic cache enabled."""
+        with patch('src.tools.base_llm_tool.get_llm_client', return_value=self.mock_client):
+            tool = TopicCategorizationTool(provider='openai', model='gpt-4o',
+                                           semantic_cache_threshold=0.9)
+        
+        # Categorize a text and a near-duplicate of it
+        first = tool.execute({'feedback_text': 'Order 12345 arrived late.'})
+        second = tool.execute({'feedback_text': 'Order 67890 arrived late.'})
+        
+        # Check that the LLM was queried only once
+        assert second == first
+        self.mock_client.chat.completions.create.assert_called_once()
+
+    def test_execute_async_with_async_bedrock_client(self):
+        """Test that Bedrock is queried without a worker thread with an asynchronous client."""
+        row = json.loads(self.mock_response.choices[0].message.content)
+        response_body = MagicMock()
+        response_body.read = AsyncMock(return_value=json.dumps({
+            'content': [{'type': 'tool_use', 'name': 'record_topics', 'input': row}]
+        }).encode())
+        mock_bedrock = MagicMock()
+        mock_bedrock.invoke_model = AsyncMock(return_value={'body': response_body})
+        
+        with patch('src.tools.base_llm_tool.get_llm_client', return_value=MagicMock()):
+            tool = TopicCategorizationTool(provider='bedrock', async_mode=True)
+        
+        # Categorize a text with the asynchronous Bedrock client
+        with patch('src.tools.base_llm_tool.create_async_bedrock_client',
+                   AsyncMock(return_value=mock_bedrock)):
+            result = asyncio.run(tool.execute_async({'feedback_text': 'The delivery was late.'}))
+        
+        # Check that the tool use input was read from the awaited response
+        assert result['topics'] == {'Delivery': 0.9, 'Customer Support': 0.3}
+        payload = json.loads(mock_bedrock.invoke_model.await_args[1]['body'])
+        assert payload['tool_choice'] == {"type": "tool", "name": "record_topics"}
+        properties = payload['tools'][0]['input_schema']['properties']
+        assert properties['primary_topic']['enum'] == DEFAULT_TOPICS
+        tool.client.invoke_model.assert_not_called()
@@ -0,0 +1,97 @@
+"""
+Tests for the Dynamic Batcher Module
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.dynamic_batcher import DynamicBatcher
+
+
+class TestDynamicBatcher:
+    """Tests for the DynamicBatcher class."""
+
+    def setup_method(self):
+        """Set up the test environment."""
+        self.batches = []
+        self.release = threading.Event()
+        
+        def process_batch(items):
+            self.batches.append(list(items))
+            if len(self.batches) == 1:
+                # Hold the first batch in flight so the following items are collected
+                self.release.wait(1)
+            return [item * 2 for item in items]
+        
+        self.batcher = DynamicBatcher(process_batch, max_batch_size=3, max_latency=1)
+
+    def test_submit_single_item(self):
+        """Test that an item is processed right away when no batch is in flight."""
+        self.release.set()
+        
+        # Check the result
+        assert self.batcher.submit(1) == 2
+        assert self.batches == [[1]]
+
+    def test_submit_coalesces_items_while_batch_in_flight(self):
+        """Test that items submitted while a batch is in flight are processed together."""
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(self.batcher.submit, 1)
+            while not self.batches:
+                time.sleep(0.001)
+            
+            # Submit items while the first batch is in flight
+            others = [executor.submit(self.batcher.submit, item) for item in (2, 3, 4)]
+            time.sleep(0.05)
+            self.release.set()
+            
+            # Check the results
+            assert first.result() == 2
+            assert [future.result() for future in others] == [4, 6, 8]
+        
+        # Check that the waiting items were processed in one batch
+        assert self.batches[0] == [1]
+        assert sorted(self.batches[1]) == [2, 3, 4]
+
+    def test_submit_propagates_errors(self):
+        """Test that an error processing a batch is raised to the caller."""
+        batcher = DynamicBatcher(lambda items: [])
+        
+        with pytest.raises(ValueError, match="Expected 1 batch results, got 0"):
+            batcher.submit(1)
+
+    def test_submit_fails_waiting_items_when_interrupted(self):
+        """Test that the waiting items fail when processing their batch is interrupted."""
+        class Interrupted(BaseException):
+            pass
+        
+        def process_batch(items):
+            self.batches.append(list(items))
+            if len(self.batches) == 1:
+                self.release.wait(1)
+                return [item * 2 for item in items]
+            raise Interrupted()
+        
+        batcher = DynamicBatcher(process_batch, max_batch_size=3, max_latency=1)
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            first = executor.submit(batcher.submit, 1)
+            while not self.batches:
+                time.sleep(0.001)
+            
+            # Submit items while the first batch is in flight, then interrupt their batch
+            others = [executor.submit(batcher.submit, item) for item in (2, 3, 4)]
+            time.sleep(0.05)
+            self.release.set()
+            
+            # Check that the caller processing the batch is interrupted and the others fail
+            assert first.result() == 2
+            errors = [type(future.exception(timeout=1)) for future in others]
+        
+        assert sorted(error.__name__ for error in errors) == [
+            'Interrupted', 'RuntimeError', 'RuntimeError'
+        ]
@@ -0,0 +1,46 @@
+"""
+Tests for the JSON Stream Module
+"""
+
+import unittest
+
+import pytest
+
+from src.utils.json_stream import JsonArrayStream
+
+
+class TestJsonArrayStream:
+    """Tests for the JsonArrayStream class."""
+
+    def setup_method(self):
+        """Set up the test environment."""
+        self.stream = JsonArrayStream('keywords')
+
+    def test_feed_yields_items_as_they_complete(self):
+        """Test that items are parsed as soon as they are complete."""
+        # Feed the first item and the start of the second
+        items = self.stream.feed('{"keywords": [{"keyword": "delivery", "relevance": 0.9}, '
+                                 '{"keyword": "pro')
+        
+        # Check that only the first item was parsed
+        assert items == [{'keyword': 'delivery', 'relevance': 0.9}]
+        assert not self.stream.done
+        
+        # Feed the rest of the text
+        items = self.stream.feed('duct", "relevance": 0.7}]}')
+        
+        # Check the result
+        assert items == [{'keyword': 'product', 'relevance': 0.7}]
+        assert self.stream.done
+
+    def test_feed_ignores_brackets_in_strings(self):
+        """Test that brackets and escaped quotes inside strings do not end an item."""
+        text = '{"keywords": [{"keyword": "a } \\" ]", "tags": [1, 2]}]}'
+        
+        # Feed the text one character at a time
+        items = []
+        for char in text:
+            items.extend(self.stream.feed(char))
+        
+        # Check the result
+        assert items == [{'keyword': 'a } " ]', 'tags': [1, 2]}]
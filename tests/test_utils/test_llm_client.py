@@ -0,0 +1,47 @@
+"""
+Tests for the LLM Client Module
+"""
+
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+import anthropic
+
+from src.utils.llm_client import create_async_llm_client, get_llm_client
+
+
+class TestLLMClient:
+    """Tests for the LLM client functions."""
+
+    def test_get_llm_client_reuses_client(self):
+        """Test that get_llm_client returns the same client for the same API key."""
+        # Get clients for the same and a different API key
+        first = get_llm_client('openai', 'test-key')
+        second = get_llm_client('openai', 'test-key')
+        other = get_llm_client('openai', 'other-key')
+        
+        # Check the result
+        assert first is second
+        assert first is not other
+        assert first._client is other._client
+
+    def test_anthropic_clients_keep_sdk_default_timeout(self):
+        """Test that the Anthropic clients keep the SDK default timeout on the shared pool."""
+        with patch('anthropic.Anthropic') as mock_anthropic, \
+                patch('anthropic.AsyncAnthropic') as mock_async_anthropic:
+            get_llm_client('anthropic', 'timeout-test-key')
+            create_async_llm_client('anthropic', 'timeout-test-key')
+        
+        # Check that both clients replace the shorter timeout of the shared pool they use
+        openai_client = get_llm_client('openai', 'test-key')
+        call_kwargs = mock_anthropic.call_args[1]
+        assert call_kwargs['timeout'] == anthropic.DEFAULT_TIMEOUT
+        assert call_kwargs['http_client'] is openai_client._client
+        assert mock_async_anthropic.call_args[1]['timeout'] == anthropic.DEFAULT_TIMEOUT
+
+    def test_get_llm_client_unsupported_provider(self):
+        """Test get_llm_client with an unsupported provider."""
+        with pytest.raises(ValueError, match="Unsupported provider: unknown"):
+            get_llm_client('unknown', 'test-key')